@@ -7,6 +7,7 @@ from pathlib import Path
 
 from src.entrypoints.uvicorn_host import uvicorn_main
 from src.entrypoints.command_line import cmd_main
+from src.entrypoints.prefork_host import prefork_main
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,13 @@ def parse_args():
         action="store_true",
         help="启动时进入命令行模式"
     )
+    parser.add_argument(
+        "-W",
+        "--workers",
+        type=int,
+        default=1,
+        help="worker 进程数，大于 1 时使用 prefork 多进程模式（仅 Linux/macOS）"
+    )
     return parser.parse_args()
 
 if __name__ == "__main__":
@@ -28,6 +36,9 @@ if __name__ == "__main__":
         print("🚀 使用 -C 启动，进入命令行模式")
         asyncio.run(cmd_main())
         sys.exit(0)
+    elif args.workers > 1:
+        prefork_main(args.workers)
+        sys.exit(0)
     else:
         uvicorn_main()
         sys.exit(0)
@@ -6,6 +6,8 @@ from src.app.context import AppContext
 from src.adapters.cmd.registery import register_command, command_registry
 
 from src.adapters.cmd.cmd_tools.operator import *
+from src.adapters.cmd.cmd_tools.bench import *
+from src.adapters.cmd.cmd_tools.cards import *
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,172 @@
+import logging
+import time
+from pathlib import Path
+
+from src.app.context import AppContext
+from src.adapters.cmd.registery import register_command
+from src.helpers import json_codec
+
+logger = logging.getLogger(__name__)
+
+# 参与 benchmark 的 gamedata 表（与 bundle_builder 读取的表一致）
+BENCH_TABLES = [
+    "character_table",
+    "uniequip_table",
+    "battle_equip_table",
+    "handbook_team_table",
+    "item_table",
+    "range_table",
+    "skill_table",
+    "skin_table",
+    "charword_table",
+    "char_meta_table",
+]
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+@register_command("bench_json")
+async def cmd_bench_json(ctx: AppContext, args: str) -> str:
+    """
+    对比各 JSON 后端在真实 gamedata 表上的解码/编码耗时
+    用法: bench_json [重复次数]
+    例子: bench_json 5
+    """
+    repeat = int(args.strip()) if args.strip() else 3
+    excel_dir = Path(ctx.cfg.ResourcePath) / "gamedata" / "excel"
+
+    original = json_codec.backend_name()
+    lines = [f"📊 JSON 后端对比（best of {repeat}），已安装: {', '.join(json_codec.BACKENDS)}"]
+
+    try:
+        for table in BENCH_TABLES:
+            path = excel_dir / f"{table}.json"
+            if not path.exists():
+                continue
+
+            raw = path.read_bytes()
+            size_mb = len(raw) / 1024 / 1024
+            lines.append(f"\n{table} ({size_mb:.1f} MB)")
+
+            for name in json_codec.BACKENDS:
+                json_codec.select_backend(name)
+                obj = json_codec.loads(raw)
+                t_loads = _best_of(lambda: json_codec.loads(raw), repeat)
+                t_path = _best_of(lambda: json_codec.load_path(path), repeat)
+                t_dumps = _best_of(lambda: json_codec.dumps(obj), repeat)
+                lines.append(
+                    f"  {name:<8} loads {t_loads * 1000:8.1f} ms ({size_mb / t_loads:6.1f} MB/s)"
+                    f" | load_path {t_path * 1000:8.1f} ms"
+                    f" | dumps {t_dumps * 1000:8.1f} ms"
+                )
+    finally:
+        json_codec.select_backend(original)
+
+    return "\n".join(lines)
+
+
+@register_command("bench_single_flight")
+async def cmd_bench_single_flight(ctx: AppContext, args: str) -> str:
+    """
+    验证 SingleFlight 的注册表不随历史 key 增长：依次对 N 个不同 key 发起并发请求，记录内存峰值
+    用法: bench_single_flight [key 数量]
+    例子: bench_single_flight 1000000
+    """
+    import asyncio
+    import tracemalloc
+
+    from src.helpers.single_flight import SingleFlight
+
+    total = int(args.strip()) if args.strip() else 1_000_000
+    flight = SingleFlight()
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return calls
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    batch = 1000
+    for start in range(0, total, batch):
+        # 每个 key 3 个并发调用方，只应执行一次
+        await asyncio.gather(*(
+            flight.do(f"k{i}", work) for i in range(start, min(start + batch, total)) for _ in range(3)
+        ))
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (
+        f"{total} 个 key，执行 {calls} 次，耗时 {elapsed:.1f}s\n"
+        f"剩余条目 {len(flight)}，当前内存 {current / 1024:.0f}KB，峰值 {peak / 1024:.0f}KB"
+    )
+
+
+@register_command("bench_card_render")
+async def cmd_bench_card_render(ctx: AppContext, args: str) -> str:
+    """
+    对比技能卡片的原生 PNG 引擎与浏览器截图的吞吐（只渲染，不落盘）
+    两边渲染的是同一张 operator_skill 卡片：原生引擎栅格化 layout.json 模板，浏览器截图 html 模板
+    用法: bench_card_render [卡片数量]
+    例子: bench_card_render 50
+    """
+    from src.domain.services.operator import build_skill_payload
+
+    total = int(args.strip()) if args.strip() else 50
+    bundle = ctx.data_repository.get_bundle()
+    card_service = ctx.card_service
+
+    qrs = []
+    for op in bundle.operators.values():
+        payload = build_skill_payload(bundle, op, 1, 10) if op.skills else None
+        if payload is not None:
+            qrs.append(card_service._ensure_query_result(payload))
+        if len(qrs) >= total:
+            break
+    if not qrs:
+        return "❌ 没有可用的技能数据"
+
+    layouts = [card_service.layout_renderer.render("operator_skill", qr).payload for qr in qrs]
+    htmls = [card_service.html_renderer.render("operator_skill", qr).payload for qr in qrs]
+    browser_cfg = {"viewport": {"width": 720}, "full_page": True, "base_path": "operator_skill"}
+
+    lines = [f"📊 技能卡片渲染吞吐（{len(qrs)} 张，顺序渲染）"]
+
+    t0 = time.perf_counter()
+    sizes = [len(await card_service.native_png.transform(input=layout, cfg={})) for layout in layouts]
+    native = time.perf_counter() - t0
+    lines.append(
+        f"  native  {native * 1000 / len(qrs):8.1f} ms/张 | {len(qrs) / native:8.1f} 张/s"
+        f" | 平均 {sum(sizes) / len(sizes) / 1024:.0f}KB"
+    )
+
+    try:
+        # 第一张包含浏览器启动，单独计时
+        t0 = time.perf_counter()
+        await card_service.html_to_png.transform(input=htmls[0], cfg=browser_cfg)
+        warmup = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for html in htmls:
+            await card_service.html_to_png.transform(input=html, cfg=browser_cfg)
+        browser = time.perf_counter() - t0
+    except Exception as e:
+        lines.append(f"  browser 不可用：{e}")
+        return "\n".join(lines)
+
+    lines.append(
+        f"  browser {browser * 1000 / len(qrs):8.1f} ms/张 | {len(qrs) / browser:8.1f} 张/s"
+        f" | 首张（含启动） {warmup * 1000:.0f} ms"
+    )
+    lines.append(f"  native / browser 吞吐比 {browser / native:.1f}x")
+    return "\n".join(lines)
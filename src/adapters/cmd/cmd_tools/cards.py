@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+
+from src.app.context import AppContext
+from src.adapters.cmd.registery import register_command
+from src.domain.services.operator import OperatorNotFoundError, search_operator_by_name
+
+logger = logging.getLogger(__name__)
+
+
+def _fmt_bytes(n: int) -> str:
+    if n >= 1024 * 1024:
+        return f"{n / 1024 / 1024:.2f}MB"
+    if n >= 1024:
+        return f"{n / 1024:.1f}KB"
+    return f"{n}B"
+
+
+@register_command("card_report")
+async def cmd_card_report(ctx: AppContext, args: str) -> str:
+    """
+    统计卡片缓存体积，以及 webp/jpg 相对同名 png 节省的字节数
+    用法: card_report [模板名]
+    例子: card_report operator_info
+    """
+    only = args.strip()
+    report = await asyncio.to_thread(ctx.card_service.size_report)
+    if only:
+        report = {k: v for k, v in report.items() if k == only}
+    if not report:
+        return "没有找到卡片缓存。"
+
+    lines = []
+    for template, per_format in sorted(report.items()):
+        lines.append(f"[{template}]")
+        for fmt, entry in sorted(per_format.items()):
+            line = f"  {fmt:<5} {entry['count']:>5} 个  {_fmt_bytes(entry['bytes']):>10}"
+            if entry["png_bytes"]:
+                saved = entry["png_bytes"] - entry["bytes"]
+                ratio = saved / entry["png_bytes"] * 100
+                line += f"  相比 png 节省 {_fmt_bytes(saved)} ({ratio:.1f}%)"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+@register_command("card_prewarm")
+async def cmd_card_prewarm(ctx: AppContext, args: str) -> str:
+    """
+    批量预热干员卡片 png（同一浏览器页面内依次截图）
+    用法: card_prewarm [数量] [每批张数]
+    例子: card_prewarm 50 16
+    """
+    parts = args.split()
+    try:
+        limit = int(parts[0]) if parts else 0
+        batch_size = int(parts[1]) if len(parts) > 1 else 16
+    except ValueError:
+        return "❌ 参数必须是整数\n用法: card_prewarm [数量] [每批张数]"
+
+    bundle = ctx.data_repository.get_bundle()
+    bundle_version = getattr(bundle, "version", None) or getattr(bundle, "hash", None) or "v0"
+
+    names = sorted({op.name for op in bundle.operators.values()})
+    if limit > 0:
+        names = names[:limit]
+
+    items = []
+    skipped = 0
+    for name in names:
+        try:
+            items.append((f"operator:{name}:{bundle_version}", search_operator_by_name(ctx, name)))
+        except OperatorNotFoundError:
+            skipped += 1
+
+    t0 = time.perf_counter()
+    results = await ctx.card_service.prewarm(template="operator_info", items=items, batch_size=batch_size)
+    elapsed = time.perf_counter() - t0
+
+    failed = [key for key, r in results.items() if isinstance(r, BaseException)]
+    lines = [
+        f"预热 {len(items)} 张，失败 {len(failed)} 张，跳过 {skipped} 个，耗时 {elapsed:.1f}s"
+        f"（{elapsed / max(1, len(items)) * 1000:.0f}ms/张）"
+    ]
+    lines += [f"  ✗ {key}: {results[key]}" for key in failed[:10]]
+    return "\n".join(lines)
@@ -1,14 +1,19 @@
 
+import asyncio
 import logging
+import time
 
-from src.domain.services.operator import search_operator_by_name
+from src.domain.services.operator import build_operator_profile, build_operator_voices, build_skill_payload
+from src.domain.services.material_planner import MaterialPlanError, UpgradeTarget, plan_materials
+from src.domain.services.operator_query import OperatorQuery, OperatorQueryError, parse_conditions, run_query
 from src.app.context import AppContext
 from src.domain.services.operator_basic import OperatorNotFoundError
 from src.domain.models.operator import Operator
 from src.adapters.cmd.registery import register_command
 from src.helpers.bundle import get_table
-from src.helpers.card_urls import build_card_url
-from src.helpers.gamedata.search import search_source_spec, build_sources
+from src.helpers.card_urls import build_artifact_url
+from src.app.card_service import RendererUnavailableError
+from src.helpers.gamedata.search import search_source_spec, search_source_spec_many, build_sources, pick_unique_match
 
 logger = logging.getLogger(__name__)
 
@@ -65,8 +70,8 @@ async def cmd_operator(ctx: AppContext, args: str) -> str:
         
         op: Operator = name_matches[0].value
 
-        # 领域查询（保留）
-        result = search_operator_by_name(ctx, op.name)
+        # 已解析的干员直接交给领域组装，不再二次搜索
+        result = build_operator_profile(ctx, op)
 
         # 生成 payload_key：要求包含 version
         bundle = ctx.data_repository.get_bundle()
@@ -74,31 +79,28 @@ async def cmd_operator(ctx: AppContext, args: str) -> str:
 
         payload_key = f"operator:{op.name}:{bundle_version}"
 
-        text_artifact = await ctx.card_service.get(
+        text = await ctx.card_service.get_text(
             template="operator_info",
             payload_key=payload_key,
             payload=result,      # 这里直接传 QueryResult
             format="txt",
-            params=None,         # 你也可以传 viewport/full_page 等覆写配置
         )
 
-        _ = await ctx.card_service.get(
-            template="operator_info",
-            payload_key=payload_key,
-            payload=result,      # 这里直接传 QueryResult
-            format="png",
-            params=None,         # 你也可以传 viewport/full_page 等覆写配置
-        )
+        try:
+            img_artifact = await ctx.card_service.get(
+                template="operator_info",
+                payload_key=payload_key,
+                payload=result,      # 这里直接传 QueryResult
+                format="png",
+                params=None,         # 你也可以传 viewport/full_page 等覆写配置
+            )
+        except RendererUnavailableError as e:
+            return f"✅ 查询成功！\n\n{text}\n\n（图片暂不可用：{e}）"
 
-        image_url = build_card_url(
-            cfg=ctx.cfg,
-            template="operator_info",
-            payload_key=payload_key,
-            format="png",
-        )
+        image_url = build_artifact_url(cfg=ctx.cfg, artifact=img_artifact)
 
         # 目前你还没接“发图”，先返回路径（或返回 html）
-        return f"✅ 查询成功！\n\n{text_artifact.read_text()}\n\n图片链接: {image_url}"
+        return f"✅ 查询成功！\n\n{text}\n\n图片链接: {image_url}"
 
     except OperatorNotFoundError as e:
         return f"❌ {str(e)}"
@@ -149,52 +151,177 @@ async def cmd_operator_skill(ctx: AppContext, args: str) -> str:
         if not chosen:
             return f"❌ 干员{op.name}的技能“{sk.name}”无法升级到等级{level}"
         
-        SPType = get_table(bundle.tables,"sp_type",source = "local", default={})
-        SkillType = get_table(bundle.tables,"skill_type",source = "local", default={})
-        SkillLevelName = get_table(bundle.tables,"skill_level",source = "local", default={})
-
-        # 4) 文本映射与兜底
-        sp_data = getattr(chosen, "sp", None)
-        sp_type_raw = getattr(sp_data, "sp_type", "") if sp_data else ""
-        sp_type_text = SPType.get(sp_type_raw, SPType.get(str(sp_type_raw), str(sp_type_raw)))
-
-        skill_type_raw = getattr(chosen, "skill_type", "")
-        skill_type_text = SkillType.get(skill_type_raw, SkillType.get(str(skill_type_raw), str(skill_type_raw)))
-
-        level_text = SkillLevelName[str(level)] if level >= 8 else str(level)
-        
-        payload = {
-            "op": op,
-            "skill": {
-                "index": index,
-                "name": sk.name,
-            },
-            "meta": {
-                "level_text": level_text,
-                "range": getattr(chosen, "range", "") or "",
-                "sp_type_text": sp_type_text,
-                "skill_type_text": skill_type_text,
-                "sp_cost": getattr(sp_data, "sp_cost", 0) if sp_data else 0,
-                "init_sp": getattr(sp_data, "init_sp", 0) if sp_data else 0,
-                "duration": getattr(chosen, "duration", 0) or 0,
-                "description": getattr(chosen, "description", "") or "",
-            },
-        }
-        text_artifact = await ctx.card_service.get(
+        payload = build_skill_payload(bundle, op, index, level)
+        text = await ctx.card_service.get_text(
             template="operator_skill",
             payload_key=f"operator_skill:{op.name}:{index}:{level}:{bundle.version}",
             payload=payload,
             format="txt",
-            params=None,
         )
 
-        return f"✅ 查询成功！\n\n{text_artifact.read_text()}"
+        return f"✅ 查询成功！\n\n{text}"
     except OperatorNotFoundError as e:
         return f"❌ {str(e)}"
     except Exception as e:
         logger.exception("查询干员技能信息失败")
         return f"❌ 查询失败: {e}"
 
+@register_command("voice")
+async def cmd_operator_voice(ctx: AppContext, args: str) -> str:
+    """
+    查询干员语音台词（只解码该干员的记录，不加载整张 charword_table）
+    用法: voice <干员名> [标题关键字]
+    例子: voice 阿米娅 信赖
+    """
+    parts = args.split()
+    if not parts:
+        return "❌ 请提供干员名称\n用法: voice <干员名> [标题关键字]"
+
+    bundle = ctx.data_repository.get_bundle()
+    search_sources = build_sources(bundle, source_key=["name"])
+    search_results = search_source_spec(parts[0], sources=search_sources)
+    match, candidates = pick_unique_match(search_results, "name", preferred=[parts[0]]) if search_results else (None, [])
+    if match is None:
+        if candidates:
+            return f"❌ 找到多个匹配的干员名称: {', '.join(candidates)}，请提供更精确的名称。"
+        return f"❌ 未找到干员: {parts[0]}"
+
+    op: Operator = match.value
+    try:
+        voices = await asyncio.to_thread(build_operator_voices, ctx, op)
+    except Exception as e:
+        logger.exception("查询干员语音失败")
+        return f"❌ 查询失败: {e}"
+
+    keyword = parts[1] if len(parts) > 1 else ""
+    voices = [v for v in voices if keyword in v["title"]]
+    if not voices:
+        return f"❌ 干员{op.name}没有匹配的语音"
+
+    lines = [f"✅ {op.name}：{len(voices)} 条语音"]
+    for v in voices:
+        lines.append(f"【{v['title']}】{v['text']}")
+    return "\n".join(lines)
+
+@register_command("op_query")
+async def cmd_operator_query(ctx: AppContext, args: str) -> str:
+    """
+    按职业/星级/数值条件筛选干员并排序
+    用法: op_query [class=职业] [sub=子职业] [star=星级] [sort=属性] [asc] [limit=N] [phase=0|1|2] [条件...]
+    例子: op_query class=重装 star=6 sort=def limit=10
+    例子: op_query class=术师 cost<=20 sort=atk
+    """
+    bundle = ctx.data_repository.get_bundle()
+    if bundle.attribute_store is None:
+        return "❌ 属性查询不可用（未安装 numpy）"
+
+    q = OperatorQuery()
+    conditions = []
+    try:
+        for token in args.split():
+            key, sep, value = token.partition("=")
+            if sep and key in ("class", "sub", "star", "sort", "limit", "phase"):
+                values = [v for v in value.split(",") if v]
+                if key == "class":
+                    q.classes = values
+                elif key == "sub":
+                    q.sub_classes = values
+                elif key == "star":
+                    q.rarity = [int(v) for v in values]
+                elif key == "sort":
+                    q.sort_by = value
+                elif key == "limit":
+                    q.limit = int(value)
+                elif key == "phase":
+                    q.phase = int(value)
+            elif token == "asc":
+                q.descending = False
+            else:
+                conditions.append(token)
+        q.conditions = parse_conditions(",".join(conditions))
+
+        t0 = time.perf_counter()
+        out = run_query(bundle.attribute_store, q)
+        elapsed_us = (time.perf_counter() - t0) * 1e6
+    except (OperatorQueryError, ValueError) as e:
+        return f"❌ {e}"
+
+    if not out.rows:
+        return f"❌ 没有符合条件的干员（{elapsed_us:.0f}µs）"
+
+    lines = [f"✅ 命中 {out.total} 名，显示 {len(out.rows)} 名（{elapsed_us:.0f}µs）", " | ".join(out.columns)]
+    for row in out.rows:
+        lines.append(" | ".join("-" if v is None else str(v) for v in row))
+    return "\n".join(lines)
+
+@register_command("mat_plan")
+async def cmd_material_plan(ctx: AppContext, args: str) -> str:
+    """
+    汇总干员养成到目标所需的材料（从零开始，前置条件自动补齐）
+    用法: mat_plan <干员名,干员名,...> [elite=0|1|2] [skill=1~7] [mastery=0~3] [skills=1,3] [module=0~3] [detail]
+    例子: mat_plan 能天使,史尔特尔,艾雅法拉,塞雷娅 mastery=3
+    """
+    parts = args.split()
+    if not parts:
+        return "❌ 请提供干员名称\n用法: mat_plan <干员名,干员名,...> [mastery=3]"
+
+    bundle = ctx.data_repository.get_bundle()
+    if bundle.cost_vectors is None:
+        return "❌ 材料汇总不可用（未安装 numpy）"
+
+    names = [n for n in parts[0].replace("，", ",").split(",") if n]
+    target = UpgradeTarget(elite=2, skill_level=7)
+    detail = False
+    try:
+        for token in parts[1:]:
+            key, sep, value = token.partition("=")
+            if token == "detail":
+                detail = True
+            elif key == "elite":
+                target.elite = int(value)
+            elif key == "skill":
+                target.skill_level = int(value)
+            elif key == "mastery":
+                target.mastery = int(value)
+            elif key == "skills":
+                target.skills = [int(v) for v in value.split(",") if v]
+            elif key == "module":
+                target.module_level = int(value)
+            else:
+                return f"❌ 无法识别的参数: {token}"
+        target.normalized()
+    except (MaterialPlanError, ValueError) as e:
+        return f"❌ {e}"
+
+    search_sources = build_sources(bundle, source_key=["name"])
+    targets = []
+    lines: list[str] = []
+    for name, results in zip(names, search_source_spec_many(names, sources=search_sources)):
+        match, candidates = pick_unique_match(results, "name", preferred=[name]) if results else (None, [])
+        if match is None:
+            lines.append(f"❌ {name}: " + (f"有多个匹配（{', '.join(candidates)}）" if candidates else "未找到"))
+            continue
+        op: Operator = match.value
+        targets.append((op.id, op.name, target))
+
+    if not targets:
+        return "\n".join(["❌ 没有可计算的干员", *lines])
+
+    t0 = time.perf_counter()
+    plan = plan_materials(bundle.cost_vectors, targets, per_operator=detail)
+    elapsed_us = (time.perf_counter() - t0) * 1e6
+
+    lines.insert(0, f"✅ {len(targets)} 名干员，共 {len(plan.total)} 种材料（{elapsed_us:.0f}µs）")
+    for name, count in plan.total:
+        lines.append(f"  {name} x{count}")
+    for p in plan.operators:
+        lines.append(f"- {p.name}: {', '.join(p.steps) or '无'}")
+        if detail:
+            lines.append("    " + ", ".join(f"{n} x{c}" for n, c in p.items))
+        for w in p.warnings:
+            lines.append(f"    ❌ {w}")
+    return "\n".join(lines)
+
 @register_command("glossary")
 async def cmd_glossary(ctx: AppContext, args: str) -> str:
     """
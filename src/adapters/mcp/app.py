@@ -1,27 +1,59 @@
 #src/adapters/mcp/app.py
 from fastapi import FastAPI
 from mcp.server.fastmcp import FastMCP
+from starlette.applications import Starlette
 
 from src.adapters.mcp.mcp_tools.arknights_glossary import register_glossary_tool
 from src.adapters.mcp.mcp_tools.operator_basic import register_operator_basic_tool
+from src.adapters.mcp.mcp_tools.operators_basic import register_operators_basic_tool
 from src.adapters.mcp.mcp_tools.operator_skill import register_operator_skill_tool
+from src.adapters.mcp.mcp_tools.operator_skill_matrix import register_operator_skill_matrix_tool
+from src.adapters.mcp.mcp_tools.operator_query import register_operator_query_tool
+from src.adapters.mcp.mcp_tools.operator_stats import register_operator_stats_tool
+from src.adapters.mcp.mcp_tools.material_plan import register_material_plan_tool
+from src.adapters.mcp.tool_cache import ToolResultCache
 
 server_instructions = """
 本服务器是一个游戏<明日方舟>的知识库查询助手，专注于为用户提供准确的干员信息数据和游戏资料。
 你可以使用注册的工具来回答明日方舟游戏内的问题。
 """
 
-def register_asgi(app: FastAPI):
+def register_asgi(app: FastAPI) -> FastMCP:
 
-    # 挂载 FastMCP 的 SSE 应用到 FastAPI 的 /mcp 路径下
+    # 挂载 FastMCP 到 FastAPI 的 /mcp 路径下，同时提供两种传输：
+    # 1) SSE（兼容旧客户端，会话绑定在单个进程的长连接上）
     # "amiya-mcp": {
     #   "transport":"sse",
     #   "url": "http://localhost:9000/mcp/sse"
     # }
-    mcp = FastMCP("明日方舟知识库")
+    # 2) Streamable HTTP（无状态：每次工具调用都是独立请求，任意副本/worker 都可以应答，便于负载均衡）
+    # "amiya-mcp": {
+    #   "transport":"streamable_http",
+    #   "url": "http://localhost:9000/mcp/http"
+    # }
+    mcp = FastMCP(
+        "明日方舟知识库",
+        stateless_http=True,
+        json_response=True,
+        streamable_http_path="/http",
+    )
+
+    # 工具结果缓存：各工具通过 @cached_tool(app) 使用，key 含 bundle 版本
+    app.state.tool_cache = ToolResultCache(maxsize=1024, ttl=120.0)
 
     register_glossary_tool(mcp,app)
     register_operator_basic_tool(mcp,app)
+    register_operators_basic_tool(mcp,app)
     register_operator_skill_tool(mcp,app)
+    register_operator_skill_matrix_tool(mcp,app)
+    register_operator_query_tool(mcp,app)
+    register_operator_stats_tool(mcp,app)
+    register_material_plan_tool(mcp,app)
+
+    sse_app = mcp.sse_app()
+    http_app = mcp.streamable_http_app()
+    app.mount("/mcp", Starlette(routes=[*sse_app.routes, *http_app.routes]))
 
-    app.mount("/mcp", mcp.sse_app())
+    # 挂载的子应用不会执行自己的 lifespan，session_manager 由宿主应用的 lifespan 启动
+    app.state.mcp = mcp
+    return mcp
@@ -5,6 +5,7 @@ from typing import Annotated,List,Union
 from pydantic import Field
 
 from src.app.context import AppContext
+from src.adapters.mcp.tool_cache import cached_tool
 
 logger = logging.getLogger("mcp_tool")
 
@@ -12,6 +13,7 @@ def register_glossary_tool(mcp,app):
     @mcp.tool(
         description='获取明日方舟游戏数据中指定术语的解释和计算公式。例如你可以查询特定术语如"攻击力"来获取关于如何计算具体伤害的公式。',
     )
+    @cached_tool(app)
     def get_glossary(
         glossary_name: Annotated[Union[List[str], str], Field(description='要查询的术语名列表，可以是术语字符串、逗号/顿号分隔的术语字符串、或字符串数组')],
     ) -> str:
@@ -76,6 +78,7 @@ def register_glossary_tool(mcp,app):
                         changed = True
 
         # 4) 组织结果并返回 JSON 字符串（保留中文）
+        # 返回给客户端的文本固定走标准库：换 JSON 后端（orjson 不输出 ", " / ": " 分隔空格）不改变输出
         result = {t: glossary[t] for t in all_glossary_terms if t in matched}
         retVal = json.dumps(result, ensure_ascii=False)
         
@@ -0,0 +1,137 @@
+import logging
+from typing import Annotated
+
+from pydantic import Field
+
+from src.domain.models.operator import Operator
+from src.domain.services.material_planner import MaterialPlanError, UpgradeTarget, format_items, plan_materials
+from src.app.context import AppContext
+from src.adapters.mcp.tool_cache import cached_tool
+from src.helpers.gamedata.search import build_sources, pick_unique_match, search_source_spec_many
+
+logger = logging.getLogger(__name__)
+
+# 单次调用最多计算的干员数
+MAX_OPERATORS = 20
+
+tool_description = """汇总一名或多名干员养成到指定目标所需的全部材料（含龙门币），例如“这 4 名干员全部技能专三一共要多少材料”。
+从零开始计算（精零 1 级、技能 1 级），前置条件自动补齐：专精会同时计入精英二和技能 1→7，模组会计入精英二。
+龙门币含精英化与模组所需部分（不含干员升级）。不生成图片。
+
+Args:
+    operator_names (list[str]): 干员名列表（带前缀的干员直接写全名），最多 20 个
+    elite (int): 目标精英化阶段 0/1/2
+    skill_level (int): 目标技能等级 1~7
+    mastery (int): 目标专精等级 0~3
+    skills (list[int]): 专精哪些技能（技能序号从 1 开始），为空表示全部技能
+    module_level (int): 目标模组等级 0~3（0 为不计模组）
+    per_operator (bool): 是否同时给出每名干员的分项
+
+Returns:
+    dict: data.total 为 材料名 -> 数量；data.operators 为每名干员实际计入的步骤（及分项）；
+    无法识别的名字在 data.unresolved 中（名字有歧义时带 candidates）。
+"""
+
+
+def register_material_plan_tool(mcp, app):
+    @mcp.tool(description=tool_description)
+    @cached_tool(app)
+    async def plan_operator_materials(
+        operator_names: Annotated[list[str], Field(description="干员名列表")],
+        elite: Annotated[int, Field(description="目标精英化阶段 0/1/2")] = 2,
+        skill_level: Annotated[int, Field(description="目标技能等级 1~7")] = 7,
+        mastery: Annotated[int, Field(description="目标专精等级 0~3")] = 0,
+        skills: Annotated[list[int], Field(description="专精哪些技能（从 1 开始），为空表示全部")] = [],
+        module_level: Annotated[int, Field(description="目标模组等级 0~3")] = 0,
+        per_operator: Annotated[bool, Field(description="是否给出每名干员的分项")] = False,
+    ) -> dict:
+
+        logger.info(f"汇总养成材料：{operator_names} elite={elite} skill={skill_level} mastery={mastery} module={module_level}")
+
+        if not getattr(app.state, "ctx", None):
+            return {
+                "message": "未初始化数据上下文"
+            }
+
+        context: AppContext = app.state.ctx
+
+        queries = [q.strip() for q in operator_names if isinstance(q, str) and q.strip()]
+        if not queries:
+            return {
+                "message": "干员名列表为空"
+            }
+        if len(queries) > MAX_OPERATORS:
+            return {
+                "message": f"一次最多计算 {MAX_OPERATORS} 名干员（当前：{len(queries)}）"
+            }
+
+        target = UpgradeTarget(
+            elite=elite,
+            skill_level=skill_level,
+            mastery=mastery,
+            skills=skills or (),
+            module_level=module_level,
+        )
+        try:
+            target.normalized()
+        except MaterialPlanError as e:
+            return {
+                "message": str(e)
+            }
+
+        try:
+            bundle = context.data_repository.get_bundle()
+            if bundle.cost_vectors is None:
+                return {
+                    "message": "材料汇总不可用（服务端未安装 numpy）"
+                }
+
+            search_sources = build_sources(bundle, source_key=["name"])
+            all_results = search_source_spec_many(queries, sources=search_sources)
+
+            targets = []
+            unresolved = []
+            for query, search_results in zip(queries, all_results):
+                if not search_results:
+                    unresolved.append({"query": query, "message": f"未找到干员: {query}"})
+                    continue
+                match, candidates = pick_unique_match(search_results, "name", preferred=[query])
+                if match is None:
+                    unresolved.append({
+                        "query": query,
+                        "message": "找到多个匹配的干员名称，需要用户做出选择",
+                        "candidates": candidates,
+                    })
+                    continue
+                op: Operator = match.value
+                targets.append((op.id, op.name, target))
+
+            if not targets:
+                return {
+                    "message": "没有可计算的干员",
+                    "unresolved": unresolved,
+                }
+
+            plan = plan_materials(bundle.cost_vectors, targets, per_operator=per_operator)
+        except Exception:
+            logger.exception("汇总养成材料失败")
+            return {
+                "message": "汇总养成材料时发生错误."
+            }
+
+        operators = []
+        for p in plan.operators:
+            entry: dict = {"operator": p.name, "steps": p.steps}
+            if per_operator:
+                entry["items"] = format_items(p.items)
+            if p.warnings:
+                entry["warnings"] = p.warnings
+            operators.append(entry)
+
+        data: dict = {
+            "total": format_items(plan.total),
+            "operators": operators,
+        }
+        if unresolved:
+            data["unresolved"] = unresolved
+        return {"data": data}
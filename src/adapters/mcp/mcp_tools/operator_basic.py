@@ -5,10 +5,11 @@ from typing import Annotated
 from pydantic import Field
 
 from src.domain.models.operator import Operator
-from src.domain.services.operator import search_operator_by_name
-from src.helpers.card_urls import build_card_url
-from src.helpers.gamedata.search import build_sources, search_source_spec
+from src.domain.services.operator import build_operator_profile
+from src.helpers.card_urls import build_artifact_url
+from src.helpers.gamedata.search import build_sources, pick_unique_match, search_source_spec
 from src.app.context import AppContext
+from src.adapters.mcp.tool_cache import cached_tool, current_invalidator
 from src.domain.services.operator_basic import get_operator_basic_core, OperatorNotFoundError
 from src.app.renderers.types import Renderer
 
@@ -29,6 +30,9 @@ Returns:
 
 def register_operator_basic_tool(mcp, app):
     @mcp.tool(description=tool_description)
+    # 只缓存带图片的结果：熔断期间的纯文本结果不缓存，渲染器恢复后下一次调用即可拿到图片；
+    # 预定的渲染失败时撤回缓存条目，不在 TTL 内继续返回失效的 URL
+    @cached_tool(app, should_cache=lambda r: isinstance(r, dict) and "data" in r and "image_url" in r)
     async def get_operator_basic(
         operator_name: Annotated[str, Field(description='干员名')],
         operator_name_prefix: Annotated[str, Field(description='干员名的前缀，没有则为空')] = '',
@@ -54,34 +58,20 @@ def register_operator_basic_tool(mcp, app):
                     "message": f"未找到干员: {operator_name_prefix} {operator_name}"
                 }
 
-            name_matches = search_results.by_key("name")
-            if len(name_matches) != 1:
-
-                # matched_names = [m.matched_text for m in search_results.matches if m.key == "name"]
-                # return {
-                #     "message": f"找到多个匹配的干员名称，需要用户做出选择",
-                #     "candidates": matched_names
-                # }
-
-                # 改为先判断两个exact match是否存在，优先operator_combine，如果存在，则直接用它
-                exact_matches = [m for m in name_matches if m.matched_text == operator_combine]
-                if not exact_matches:
-                    exact_matches = [m for m in name_matches if m.matched_text == operator_name]
-                if len(exact_matches) == 1:
-                    name_matches = exact_matches
-                else:
-                    matched_names = [m.matched_text for m in name_matches]
-                    matched_names = list(dict.fromkeys(matched_names))
-                    return {
-                        "message": "找到多个匹配的干员名称，需要用户做出选择",
-                        "candidates": matched_names
-                    }
-
-            # 优先json_renderer,然后text_renderer,然后直接json format
-            op: Operator = name_matches[0].value
-
-            # TODO 领域查询，需要进行替换，目前该函数的目的是为了配合旧版模板
-            result = search_operator_by_name(context, op.name)
+            # 名字不唯一时，优先 operator_combine 的精确命中，其次 operator_name
+            match, candidates = pick_unique_match(
+                search_results, "name", preferred=[operator_combine, operator_name]
+            )
+            if match is None:
+                return {
+                    "message": "找到多个匹配的干员名称，需要用户做出选择",
+                    "candidates": candidates
+                }
+
+            op: Operator = match.value
+
+            # 已解析的干员直接交给领域组装，不再二次搜索
+            profile = build_operator_profile(context, op)
 
             # 生成 payload_key：要求包含 version
             bundle = context.data_repository.get_bundle()
@@ -89,34 +79,30 @@ def register_operator_basic_tool(mcp, app):
 
             payload_key = f"operator:{op.name}:{bundle_version}"
 
-            # ✅ 交给 CardService：如果磁盘已有 png，就直接命中返回；否则现场渲染
-            text_artifact = await context.card_service.get(
+            # 文本走内存快速路径：命中直接返回，未命中现场渲染，落盘在后台完成
+            text = await context.card_service.get_text(
                 template="operator_info",
                 payload_key=payload_key,
-                payload=result,
+                payload=profile,
                 format="txt",
-                params=None,
-            )
-
-            img_artifact = await context.card_service.get(
-                template="operator_info",
-                payload_key=payload_key,
-                payload=result,
-                format="png",
-                params=None,
             )
 
-            image_url = build_card_url(
-                cfg=context.cfg,
+            # 图片只预定不等待：URL 在渲染完成前即可返回，/cards 收到请求时会等待渲染
+            # 渲染器不可用（熔断）时只返回文本，不让整个查询失败
+            img_artifact = context.card_service.schedule(
                 template="operator_info",
                 payload_key=payload_key,
-                format="png",
+                payload=profile,
+                on_error=lambda _e, invalidate=current_invalidator(): invalidate(),
             )
 
             result = {
-                "data": text_artifact.read_text(),
-                "image_url": image_url,
+                "data": text,
             }
+            if img_artifact is not None:
+                result["image_url"] = build_artifact_url(cfg=context.cfg, artifact=img_artifact)
+            else:
+                logger.warning("干员图片暂不可用，仅返回文本：%s", payload_key)
         except Exception:
             logger.exception("查询失败")
             return {
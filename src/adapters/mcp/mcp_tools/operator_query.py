@@ -0,0 +1,85 @@
+import logging
+from typing import Annotated
+
+from pydantic import Field
+
+from src.app.context import AppContext
+from src.adapters.mcp.tool_cache import cached_tool
+from src.domain.services.operator_query import OperatorQuery, OperatorQueryError, parse_conditions, run_query
+
+logger = logging.getLogger(__name__)
+
+# 单次返回的最大行数
+MAX_LIMIT = 50
+
+tool_description = """按职业/子职业/星级和数值条件筛选干员，并按某项属性排序取前 N 名。
+适合“六星重装里满级防御最高的 10 个”“费用不超过 20 的术师”这类横向比较问题。不生成图片。
+
+可用属性（中英文均可）：rarity 星级、max_hp 生命、atk 攻击、def 防御、res 法抗、cost 费用、
+block 阻挡、respawn 再部署时间、attack_interval 攻击间隔（秒）。
+数值默认取各干员最高精英化阶段的满级属性（不含信赖/潜能/模组加成）。
+
+Returns:
+    dict: data.total 为命中总数；data.columns 为列名；data.rows 为按排序截取的行。
+"""
+
+
+def register_operator_query_tool(mcp, app):
+    @mcp.tool(description=tool_description)
+    @cached_tool(app)
+    async def query_operators(
+        classes: Annotated[list[str], Field(description="职业，如 [\"重装\"] 或 [\"TANK\"]，多个为“或”，不限则为空")] = [],
+        sub_classes: Annotated[list[str], Field(description="子职业，如 [\"铁卫\"]，不限则为空")] = [],
+        rarity: Annotated[list[int], Field(description="星级 1~6，如 [6]，不限则为空")] = [],
+        conditions: Annotated[str, Field(description="数值条件，逗号分隔，如 \"cost<=20, def>=500\"")] = "",
+        sort_by: Annotated[str, Field(description="排序属性，如 \"def\"；为空则按星级排列")] = "",
+        descending: Annotated[bool, Field(description="是否从高到低排序")] = True,
+        limit: Annotated[int, Field(description="返回条数，最多 50")] = 10,
+        phase: Annotated[int, Field(description="精英化阶段 0/1/2；-1 为各自的最高阶段")] = -1,
+    ) -> dict:
+        if not getattr(app.state, "ctx", None):
+            return {
+                "message": "未初始化数据上下文"
+            }
+
+        context: AppContext = app.state.ctx
+        store = context.data_repository.get_bundle().attribute_store
+        if store is None:
+            return {
+                "message": "属性查询不可用（服务端未安装 numpy）"
+            }
+
+        if phase not in (-1, 0, 1, 2):
+            return {
+                "message": f"精英化阶段 phase 必须为 -1/0/1/2（当前：{phase}）"
+            }
+
+        try:
+            q = OperatorQuery(
+                classes=classes,
+                sub_classes=sub_classes,
+                rarity=rarity,
+                conditions=parse_conditions(conditions),
+                sort_by=sort_by,
+                descending=descending,
+                limit=min(max(1, limit), MAX_LIMIT),
+                phase=phase,
+            )
+            out = run_query(store, q)
+        except OperatorQueryError as e:
+            return {
+                "message": str(e)
+            }
+        except Exception:
+            logger.exception("干员筛选失败")
+            return {
+                "message": "筛选干员时发生错误."
+            }
+
+        return {
+            "data": {
+                "total": out.total,
+                "columns": out.columns,
+                "rows": out.rows,
+            }
+        }
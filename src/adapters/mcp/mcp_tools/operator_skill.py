@@ -6,13 +6,22 @@ from pydantic import Field
 
 from src.domain.models.operator import Operator
 from src.app.context import AppContext
-from src.helpers.bundle import get_table
+from src.adapters.mcp.tool_cache import cached_tool, current_invalidator
+from src.domain.services.operator import build_skill_payload
+from src.helpers.card_urls import build_artifact_url
 from src.helpers.gamedata.search import build_sources, search_source_spec
 
 logger = logging.getLogger(__name__)
 
+tool_description = """获取干员技能数据（默认第1个技能，等级10），同时附加一张技能卡片图片。
+
+Returns:
+    dict: 文本可读的技能信息包含在 data 字段中，图片的URL包含在 image_url 字段中（渲染不可用时没有）。
+"""
+
 def register_operator_skill_tool(mcp, app):
-    @mcp.tool(description="获取干员技能数据（默认第1个技能，等级10）。不生成图片。")
+    @mcp.tool(description=tool_description)
+    @cached_tool(app, should_cache=lambda r: isinstance(r, dict) and "data" in r and "image_url" in r)
     async def get_operator_skill(
         operator_name: Annotated[str, Field(description="干员名")],
         operator_name_prefix: Annotated[str, Field(description="干员名的前缀，没有则为空")] = "",
@@ -48,10 +57,6 @@ def register_operator_skill_tool(mcp, app):
                     "message": f"未找到干员: {operator_query}"
                 }
 
-            SPType = get_table(bundle.tables,"sp_type",source = "local", default={})
-            SkillType = get_table(bundle.tables,"skill_type",source = "local", default={})
-            SkillLevelName = get_table(bundle.tables,"skill_level",source = "local", default={})
-
             name_matches = search_results.by_key("name")
             if len(name_matches) != 1:
                 matched_names = [m.matched_text for m in search_results.matches if m.key == "name"]
@@ -80,49 +85,32 @@ def register_operator_skill_tool(mcp, app):
                 return {
                     "message": f"干员{op.name}的技能“{sk.name}”无法升级到等级{level}"
                 }
-            # 4) 文本映射与兜底
-            sp_data = getattr(chosen, "sp", None)
-            sp_type_raw = getattr(sp_data, "sp_type", "") if sp_data else ""
-            sp_type_text = SPType.get(sp_type_raw, SPType.get(str(sp_type_raw), str(sp_type_raw)))
-
-            skill_type_raw = getattr(chosen, "skill_type", "")
-            skill_type_text = SkillType.get(skill_type_raw, SkillType.get(str(skill_type_raw), str(skill_type_raw)))
-
-            level_text = SkillLevelName[str(level)] if level >= 8 else str(level)
-
-            # 使用 Jinja2 模板渲染（operator_skill.txt.j2）
-            payload = {
-                "op": op,
-                "skill": {
-                    "index": index,
-                    "name": sk.name,
-                },
-                "meta": {
-                    "level_text": level_text,
-                    "range": getattr(chosen, "range", "") or "",
-                    "sp_type_text": sp_type_text,
-                    "skill_type_text": skill_type_text,
-                    "sp_cost": getattr(sp_data, "sp_cost", 0) if sp_data else 0,
-                    "init_sp": getattr(sp_data, "init_sp", 0) if sp_data else 0,
-                    "duration": getattr(chosen, "duration", 0) or 0,
-                    "description": getattr(chosen, "description", "") or "",
-                },
-            }
+            payload = build_skill_payload(bundle, op, index, level)
 
-            bundle = context.data_repository.get_bundle()
             bundle_version = getattr(bundle, "version", None) or getattr(bundle, "hash", None) or "v0"
             payload_key = f"{op.name}:skill{index}:lv{level}:{bundle_version}"
 
-            text_artifact = await context.card_service.get(
+            # 文本走 get_text：产物被外部删除时现场重新渲染，不会因为缓存失效而失败
+            text = await context.card_service.get_text(
                 template="operator_skill",
                 payload_key=payload_key,
                 payload=payload,
                 format="txt",
             )
 
+            # 技能卡片由原生引擎栅格化（不经过浏览器），只预定不等待；渲染失败时撤回缓存
+            img_artifact = context.card_service.schedule(
+                template="operator_skill",
+                payload_key=payload_key,
+                payload=payload,
+                on_error=lambda _e, invalidate=current_invalidator(): invalidate(),
+            )
+
             result = {
-                "data": text_artifact.read_text(),
+                "data": text,
             }
+            if img_artifact is not None:
+                result["image_url"] = build_artifact_url(cfg=context.cfg, artifact=img_artifact)
 
         except Exception:
             logger.exception("查询技能失败")
@@ -132,6 +120,3 @@ def register_operator_skill_tool(mcp, app):
 
         logger.info(f"查询干员技能信息成功：{json.dumps(result, ensure_ascii=False)}")
         return result
-
-
-
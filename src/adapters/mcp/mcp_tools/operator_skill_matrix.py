@@ -0,0 +1,82 @@
+import logging
+from typing import Annotated
+
+from pydantic import Field
+
+from src.domain.models.operator import Operator
+from src.app.context import AppContext
+from src.adapters.mcp.tool_cache import cached_tool
+from src.helpers.bundle import get_table
+from src.helpers.gamedata.search import build_sources, pick_unique_match, search_source_spec
+
+logger = logging.getLogger(__name__)
+
+tool_description = """一次获取干员全部技能在所有等级（1~7级与专精一~三，即等级8~10）下的数据，用于查看技能的成长曲线或比较不同等级。
+需要多个等级/多个技能的数据时，请使用本工具代替多次调用 get_operator_skill。不生成图片。
+
+Returns:
+    dict: data.skills 为每个技能一项，各字段为与 levels 一一对应的数组（全等级都相同时折叠为单个值）：
+    - sp_cost / init_sp / duration：技力消耗、初始技力、持续时间
+    - description：1级完整描述；description_diff[i]：第 i 项等级相对上一级的变化片段 [变化前, 变化后]
+    - upgrade_cost[i]：升到该等级所需材料 [材料名, 数量]
+"""
+
+
+def register_operator_skill_matrix_tool(mcp, app):
+    @mcp.tool(description=tool_description)
+    @cached_tool(app)
+    async def get_operator_skill_matrix(
+        operator_name: Annotated[str, Field(description="干员名")],
+        operator_name_prefix: Annotated[str, Field(description="干员名的前缀，没有则为空")] = "",
+    ) -> dict:
+        if not getattr(app.state, "ctx", None):
+            return {
+                "message": "未初始化数据上下文"
+            }
+
+        context: AppContext = app.state.ctx
+        operator_query = (operator_name_prefix or "") + (operator_name or "")
+
+        try:
+            bundle = context.data_repository.get_bundle()
+            search_sources = build_sources(bundle, source_key=["name"])
+            search_results = search_source_spec([operator_query, operator_name], sources=search_sources)
+
+            if not search_results:
+                return {
+                    "message": f"未找到干员: {operator_query}"
+                }
+
+            match, candidates = pick_unique_match(
+                search_results, "name", preferred=[operator_query, operator_name]
+            )
+            if match is None:
+                return {
+                    "message": "找到多个匹配的干员名称，需要用户做出选择",
+                    "candidates": candidates
+                }
+
+            op: Operator = match.value
+            matrices = bundle.skill_matrices.get(op.id) or []
+            if not matrices:
+                return {
+                    "message": f"干员{op.name}没有技能数据"
+                }
+
+            SPType = get_table(bundle.tables, "sp_type", source="local", default={})
+            SkillType = get_table(bundle.tables, "skill_type", source="local", default={})
+
+            result = {
+                "data": {
+                    "operator": op.name,
+                    "skills": [m.to_dict(sp_type_name=SPType, skill_type_name=SkillType) for m in matrices],
+                }
+            }
+        except Exception:
+            logger.exception("查询技能矩阵失败")
+            return {
+                "message": "查询干员技能信息时发生错误."
+            }
+
+        logger.info(f"查询干员技能矩阵成功：{op.name}")
+        return result
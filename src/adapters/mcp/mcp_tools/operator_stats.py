@@ -0,0 +1,154 @@
+import logging
+import math
+from typing import Annotated
+
+from pydantic import Field
+
+from src.domain.models.operator import Operator
+from src.app.context import AppContext
+from src.adapters.mcp.tool_cache import cached_tool
+from src.helpers.bundle import get_table
+from src.helpers.gamedata.search import build_sources, pick_unique_match, search_source_spec
+
+logger = logging.getLogger(__name__)
+
+tool_description = """计算干员在指定 精英化阶段/等级/信赖/潜能/模组 下的面板属性（与游戏内数值一致）。
+不传参数时为最高精英化阶段满级、信赖 100%、潜能 1、不装备模组。不生成图片。
+
+Args:
+    elite (int): 精英化阶段 0/1/2，-1 为该干员的最高阶段
+    level (int): 等级，0 为该阶段满级
+    trust (int): 信赖百分比 0~200（超过 100% 不再增加属性）
+    potential (int): 潜能 1~6
+    module (int): 第几个模组（按游戏内顺序，不含初始模组），0 为不装备；只在精英二阶段生效
+    module_level (int): 模组等级 1~3
+
+Returns:
+    dict: data.attributes 为 属性名 -> 数值；data 中同时给出实际使用的阶段、等级与可选模组列表。
+"""
+
+
+def _number(v: float):
+    if v is None or math.isnan(v):
+        return None
+    return int(v) if float(v).is_integer() else round(float(v), 3)
+
+
+def register_operator_stats_tool(mcp, app):
+    @mcp.tool(description=tool_description)
+    @cached_tool(app)
+    async def get_operator_stats(
+        operator_name: Annotated[str, Field(description="干员名")],
+        operator_name_prefix: Annotated[str, Field(description="干员名的前缀，没有则为空")] = "",
+        elite: Annotated[int, Field(description="精英化阶段 0/1/2，-1 为最高阶段")] = -1,
+        level: Annotated[int, Field(description="等级，0 为满级")] = 0,
+        trust: Annotated[int, Field(description="信赖百分比 0~200")] = 100,
+        potential: Annotated[int, Field(description="潜能 1~6")] = 1,
+        module: Annotated[int, Field(description="第几个模组，0 为不装备")] = 0,
+        module_level: Annotated[int, Field(description="模组等级 1~3")] = 3,
+    ) -> dict:
+        if not getattr(app.state, "ctx", None):
+            return {
+                "message": "未初始化数据上下文"
+            }
+
+        context: AppContext = app.state.ctx
+        operator_query = (operator_name_prefix or "") + (operator_name or "")
+
+        # 参数校验
+        if elite not in (-1, 0, 1, 2):
+            return {
+                "message": f"精英化阶段 elite 必须为 -1/0/1/2（当前：{elite}）"
+            }
+        if not 1 <= potential <= 6:
+            return {
+                "message": f"潜能 potential 必须在 1~6 之间（当前：{potential}）"
+            }
+        if not 1 <= module_level <= 3:
+            return {
+                "message": f"模组等级 module_level 必须在 1~3 之间（当前：{module_level}）"
+            }
+
+        try:
+            bundle = context.data_repository.get_bundle()
+            curves = bundle.attribute_curves
+            if curves is None:
+                return {
+                    "message": "属性计算不可用（服务端未安装 numpy）"
+                }
+
+            search_sources = build_sources(bundle, source_key=["name"])
+            search_results = search_source_spec([operator_query, operator_name], sources=search_sources)
+            if not search_results:
+                return {
+                    "message": f"未找到干员: {operator_query}"
+                }
+
+            match, candidates = pick_unique_match(
+                search_results, "name", preferred=[operator_query, operator_name]
+            )
+            if match is None:
+                return {
+                    "message": "找到多个匹配的干员名称，需要用户做出选择",
+                    "candidates": candidates
+                }
+
+            op: Operator = match.value
+            row = curves.row_of(op.id)
+            if row is None:
+                return {
+                    "message": f"干员{op.name}没有属性数据"
+                }
+
+            modules = curves.module_names[row]
+            if module > len(modules):
+                return {
+                    "message": f"干员{op.name}没有第{module}个模组（可选：{', '.join(modules) or '无'}）"
+                }
+
+            out = curves.compute(
+                elite=elite,
+                level=level,
+                trust=trust,
+                potential=potential,
+                module=module,
+                module_level=module_level,
+                rows=[row],
+            )
+            if not out["valid"][0]:
+                return {
+                    "message": f"干员{op.name}无法精英化到阶段{elite}"
+                }
+
+            attrs_map: dict[str, str] = get_table(bundle.tables, "attrs", source="local", default={})
+            attributes = {
+                attrs_map.get(key, key): _number(out[key][0])
+                for key in attrs_map
+                if key in out
+            }
+            attributes["实际攻击间隔"] = _number(out["attackInterval"][0])
+
+            e = int(out["elite"][0])
+            result = {
+                "data": {
+                    "operator": op.name,
+                    "elite": e,
+                    "level": int(out["level"][0]),
+                    "max_level": int(curves.max_level[row, e]),
+                    "trust": min(max(trust, 0), 200),
+                    "potential": potential,
+                    "module": modules[module - 1] if bool(out["module_applied"][0]) else None,
+                    "module_level": module_level if bool(out["module_applied"][0]) else None,
+                    "available_modules": modules,
+                    "attributes": attributes,
+                }
+            }
+            if module and not out["module_applied"][0]:
+                result["data"]["note"] = "模组只在精英二阶段生效，本次计算未计入模组加成"
+        except Exception:
+            logger.exception("计算干员属性失败")
+            return {
+                "message": "计算干员属性时发生错误."
+            }
+
+        return result
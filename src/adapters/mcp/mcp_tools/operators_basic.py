@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from typing import Annotated
+
+from pydantic import Field
+
+from src.domain.models.operator import Operator
+from src.domain.services.operator import build_operator_profile
+from src.helpers.card_urls import build_artifact_url
+from src.helpers.gamedata.search import build_sources, pick_unique_match, search_source_spec_many
+from src.app.context import AppContext
+from src.adapters.mcp.tool_cache import cached_tool, current_invalidator
+
+logger = logging.getLogger(__name__)
+
+# 单次调用最多查询的干员数
+MAX_OPERATORS = 20
+
+tool_description = """批量获取多名干员的基础信息和属性（对比编队、比较多名干员时使用，一次调用代替多次 get_operator_basic）。
+每名干员同时附加一张包含干员信息和立绘的图片。如果可以，请使用中文名称进行查询。
+
+Args:
+    operator_names (list[str]): 干员名列表（带前缀的干员直接写全名，如“假日威龙陈”），最多 20 个
+
+Returns:
+    dict: results 字段为与输入顺序一致的列表，每一项包含 query 字段以及：
+    - 成功：data（文本可读的干员信息）、image_url（图片 URL，渲染不可用时没有）
+    - 失败：message；名字有歧义时另有 candidates 候选名称
+    请尽可能向用户展示这些图片。
+"""
+
+
+def _complete(result) -> bool:
+    """只缓存每名找到的干员都带图片 URL 的结果：渲染暂不可用时的纯文本结果不缓存。"""
+    return isinstance(result, dict) and "results" in result and all(
+        "image_url" in item for item in result["results"] if "data" in item
+    )
+
+
+def register_operators_basic_tool(mcp, app):
+    @mcp.tool(description=tool_description)
+    @cached_tool(app, should_cache=_complete)
+    async def get_operators_basic(
+        operator_names: Annotated[list[str], Field(description="干员名列表")],
+    ) -> dict:
+
+        logger.info(f"批量查询干员基础信息：{operator_names}")
+
+        if not getattr(app.state, "ctx", None):
+            return {
+                "message": "未初始化数据上下文"
+            }
+
+        context: AppContext = app.state.ctx
+
+        queries = [q.strip() for q in operator_names if isinstance(q, str) and q.strip()]
+        if not queries:
+            return {
+                "message": "干员名列表为空"
+            }
+        if len(queries) > MAX_OPERATORS:
+            return {
+                "message": f"一次最多查询 {MAX_OPERATORS} 名干员（当前：{len(queries)}）"
+            }
+
+        try:
+            bundle = context.data_repository.get_bundle()
+            bundle_version = getattr(bundle, "version", None) or getattr(bundle, "hash", None) or "v0"
+
+            # 1) 所有名字共用一次候选集构建
+            search_sources = build_sources(bundle, source_key=["name"])
+            all_results = search_source_spec_many(queries, sources=search_sources)
+
+            items: list[dict] = []
+            resolved: dict[str, Operator] = {}  # payload_key -> Operator（重复的干员只组装一次）
+            for query, search_results in zip(queries, all_results):
+                item: dict = {"query": query}
+                items.append(item)
+
+                if not search_results:
+                    item["message"] = f"未找到干员: {query}"
+                    continue
+
+                match, candidates = pick_unique_match(search_results, "name", preferred=[query])
+                if match is None:
+                    item["message"] = "找到多个匹配的干员名称，需要用户做出选择"
+                    item["candidates"] = candidates
+                    continue
+
+                op: Operator = match.value
+                payload_key = f"operator:{op.name}:{bundle_version}"
+                item["payload_key"] = payload_key
+                resolved.setdefault(payload_key, op)
+
+            # 2) 图片只预定（后台渲染，URL 先返回，/cards 请求时等待渲染完成）；并发组装文本
+            payloads = {key: build_operator_profile(context, op) for key, op in resolved.items()}
+            images = _schedule_images(context, payloads)
+            texts = await _assemble_texts(context, payloads)
+        except Exception:
+            logger.exception("批量查询失败")
+            return {
+                "message": "查询干员信息时发生错误."
+            }
+
+        for item in items:
+            payload_key = item.pop("payload_key", None)
+            if payload_key is None:
+                continue
+            text = texts.get(payload_key)
+            if isinstance(text, BaseException):
+                logger.error("干员文本生成失败：%s", payload_key, exc_info=text)
+                item["message"] = "查询干员信息时发生错误."
+                continue
+            item["data"] = text
+            image_url = images.get(payload_key)
+            if image_url:
+                item["image_url"] = image_url
+
+        logger.info(f"批量查询干员基础信息完成：{len(items)} 项")
+        return {"results": items}
+
+
+async def _assemble_texts(context: AppContext, payloads: dict) -> dict:
+    keys = list(payloads)
+    outs = await asyncio.gather(
+        *(
+            context.card_service.get_text(template="operator_info", payload_key=k, payload=payloads[k], format="txt")
+            for k in keys
+        ),
+        return_exceptions=True,
+    )
+    return dict(zip(keys, outs))
+
+
+def _schedule_images(context: AppContext, payloads: dict) -> dict:
+    """
+    payload_key -> 图片 URL；渲染器不可用（熔断）时没有对应项，只返回文本。
+    后台渲染失败时撤回本次工具结果的缓存，下次调用重新预定。
+    """
+    invalidate = current_invalidator()
+    urls: dict[str, str] = {}
+    for payload_key, payload in payloads.items():
+        artifact = context.card_service.schedule(
+            template="operator_info",
+            payload_key=payload_key,
+            payload=payload,
+            on_error=lambda _e: invalidate(),
+        )
+        if artifact is None:
+            logger.warning(f"干员图片暂不可用，仅返回文本：{payload_key}")
+            continue
+        urls[payload_key] = build_artifact_url(cfg=context.cfg, artifact=artifact)
+    return urls
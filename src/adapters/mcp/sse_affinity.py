@@ -0,0 +1,157 @@
+# src/adapters/mcp/sse_affinity.py
+"""
+prefork 模式下 MCP SSE 会话的 worker 亲和。
+
+SSE 会话由两条连接组成：GET /mcp/sse 长连接，以及带 session_id 的 POST /mcp/messages/。
+多个 worker 共享同一个监听 socket 时，POST 可能落到不持有该会话的 worker 上。
+
+做法：
+- 持有会话的 worker 在发出 endpoint 事件时，把 session_id -> 本 worker 的 UDS 路径写到 run_dir/sessions/
+- 其他 worker 收到未知 session 的 POST 时，查表后经 UDS 原样转发给持有者
+"""
+from __future__ import annotations
+
+import logging
+import re
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+FORWARDED_HEADER = b"x-amiya-forwarded"
+
+_SESSION_RE = re.compile(rb"session_id=([0-9a-fA-F-]+)")
+_HOP_HEADERS = {b"host", b"content-length", b"connection", b"transfer-encoding"}
+
+
+class SseAffinityMiddleware:
+    def __init__(self, app, *, run_dir: Path, socket_path: Path, mount_path: str = "/mcp"):
+        self.app = app
+        self.sessions_dir = run_dir / "sessions"
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.socket_path = socket_path
+        self.sse_path = f"{mount_path}/sse"
+        self.messages_path = f"{mount_path}/messages/"
+        self._owned: set[str] = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        if scope["method"] == "GET" and path == self.sse_path:
+            await self._serve_sse(scope, receive, send)
+            return
+
+        if scope["method"] == "POST" and path == self.messages_path:
+            owner = self._remote_owner(scope)
+            if owner is not None and await self._forward(owner, scope, receive, send):
+                return
+
+        await self.app(scope, receive, send)
+
+    # ---------- SSE：记录本 worker 持有的会话 ----------
+
+    async def _serve_sse(self, scope, receive, send):
+        session_id: Optional[str] = None
+
+        async def send_wrapper(message):
+            nonlocal session_id
+            if session_id is None and message["type"] == "http.response.body":
+                m = _SESSION_RE.search(message.get("body", b""))
+                if m:
+                    session_id = m.group(1).decode("ascii")
+                    self._register(session_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if session_id is not None:
+                self._unregister(session_id)
+
+    def _register(self, session_id: str) -> None:
+        self._owned.add(session_id)
+        try:
+            (self.sessions_dir / session_id).write_text(str(self.socket_path), encoding="utf-8")
+        except OSError:
+            logger.exception("Failed to register sse session %s", session_id)
+
+    def _unregister(self, session_id: str) -> None:
+        self._owned.discard(session_id)
+        (self.sessions_dir / session_id).unlink(missing_ok=True)
+
+    # ---------- messages：转发给持有者 ----------
+
+    def _remote_owner(self, scope) -> Optional[Path]:
+        if any(k == FORWARDED_HEADER for k, _ in scope.get("headers", [])):
+            return None
+
+        qs = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        session_id = (qs.get("session_id") or [""])[0]
+        if not session_id or session_id in self._owned:
+            return None
+        if not re.fullmatch(r"[0-9a-fA-F-]+", session_id):
+            return None
+
+        try:
+            owner = Path((self.sessions_dir / session_id).read_text(encoding="utf-8").strip())
+        except OSError:
+            return None
+        if owner == self.socket_path or not owner.exists():
+            return None
+        return owner
+
+    async def _forward(self, owner: Path, scope, receive, send) -> bool:
+        import httpx
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        headers = [(k, v) for k, v in scope["headers"] if k.lower() not in _HOP_HEADERS]
+        headers.append((FORWARDED_HEADER, b"1"))
+
+        url = f"http://worker{scope.get('root_path', '')}{scope['path']}"
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+
+        try:
+            transport = httpx.AsyncHTTPTransport(uds=str(owner))
+            async with httpx.AsyncClient(transport=transport, timeout=30) as client:
+                resp = await client.post(url, content=body, headers=headers)
+        except httpx.HTTPError:
+            logger.exception("Failed to forward sse message to %s", owner)
+            # 转发失败时把请求体还给本地 app 处理（通常返回 404，客户端会重连）
+            await self.app(scope, _replay(body), send)
+            return True
+
+        await send({
+            "type": "http.response.start",
+            "status": resp.status_code,
+            "headers": [
+                # resp.content 已解压，content-encoding 不能原样透传
+                (k.lower(), v) for k, v in resp.headers.raw
+                if k.lower() not in _HOP_HEADERS and k.lower() != b"content-encoding"
+            ],
+        })
+        await send({"type": "http.response.body", "body": resp.content})
+        return True
+
+
+def _replay(body: bytes):
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return receive
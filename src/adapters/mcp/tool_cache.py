@@ -0,0 +1,181 @@
+# src/adapters/mcp/tool_cache.py
+"""
+MCP 工具级结果缓存。
+
+LLM 客户端经常在几秒内重试/重复同样的调用，每次都要重新搜索、组装领域对象、读取产物。
+这里按 (工具名, 规范化参数, bundle 版本) 缓存工具返回值：
+- TTL + LRU 限制条目数与存活时间；bundle 版本变化后旧结果自然不再命中
+- 并发的相同调用经 SingleFlight 合并为一次执行
+- 结果依赖后台任务（如预定的图片渲染）时，工具可以用 current_invalidator() 拿到本次调用的失效回调，
+  后台任务失败时把条目移除，避免在 TTL 内一直返回失效的结果
+
+用法（装饰器放在 @mcp.tool 下面）：
+
+    @mcp.tool(description=...)
+    @cached_tool(app)
+    async def get_xxx(...): ...
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from src.helpers.single_flight import SingleFlight
+
+
+# 当前正在执行的工具调用对应的 (缓存, key)；由 cached_tool 设置，供工具内部取失效回调
+_current_entry: ContextVar[Optional[tuple["ToolResultCache", str]]] = ContextVar("tool_cache_entry", default=None)
+
+
+def _is_success(result: Any) -> bool:
+    """默认只缓存成功结果：{"message": ...} 形式的提示/错误（没有 data）不缓存。"""
+    return not (isinstance(result, dict) and "data" not in result)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+
+class ToolResultCache:
+    def __init__(self, *, maxsize: int = 1024, ttl: float = 120.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._flight = SingleFlight()
+        # 执行期间被 invalidate 的 key：执行结束时不写入缓存
+        self._stale: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_call(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        *,
+        should_cache: Callable[[Any], bool] = _is_success,
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+
+        async def produce() -> Any:
+            value = fn()
+            if inspect.isawaitable(value):
+                value = await value
+            if key in self._stale:
+                self._stale.discard(key)
+            elif should_cache(value):
+                self._put(key, value)
+            return value
+
+        try:
+            return await self._flight.do(key, produce)
+        finally:
+            if not self._flight.in_flight(key):
+                self._stale.discard(key)
+
+    def invalidate(self, key: str) -> None:
+        """移除 key 的缓存结果；key 正在执行时，本次执行的结果也不会写入缓存。"""
+        self.invalidations += 1
+        self._entries.pop(key, None)
+        if self._flight.in_flight(key):
+            self._stale.add(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    def _put(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def _bundle_version(app) -> Optional[str]:
+    ctx = getattr(app.state, "ctx", None)
+    repo = getattr(ctx, "data_repository", None) if ctx is not None else None
+    if repo is None:
+        return None
+    try:
+        bundle = repo.get_bundle()
+    except Exception:
+        return None
+    return getattr(bundle, "version", None) or getattr(bundle, "hash", None)
+
+
+def current_invalidator() -> Callable[[], None]:
+    """
+    在 cached_tool 包装的工具内部调用：返回使本次调用的缓存结果失效的回调
+    （例如交给后台渲染的失败回调）。不在缓存调用中时返回空操作。
+    """
+    entry = _current_entry.get()
+    if entry is None:
+        return lambda: None
+    cache, key = entry
+    return lambda: cache.invalidate(key)
+
+
+def cached_tool(app, *, should_cache: Callable[[Any], bool] = _is_success):
+    """
+    工具结果缓存装饰器。缓存实例取自 app.state.tool_cache（register_asgi 中创建）；
+    缓存不存在或数据上下文未就绪时直接调用原函数。
+    functools.wraps 保留原函数签名，FastMCP 据此生成工具参数 schema。
+    """
+
+    def decorator(fn: Callable[..., Any]):
+        signature = inspect.signature(fn)
+        name = fn.__qualname__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            cache: Optional[ToolResultCache] = getattr(app.state, "tool_cache", None)
+            version = _bundle_version(app)
+            if cache is None or version is None:
+                result = fn(*args, **kwargs)
+                return await result if inspect.isawaitable(result) else result
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            normalized = json.dumps(
+                _normalize(dict(bound.arguments)),
+                sort_keys=True,
+                ensure_ascii=False,
+                default=str,
+            )
+            key = f"{name}|{version}|{normalized}"
+            token = _current_entry.set((cache, key))
+            try:
+                return await cache.get_or_call(key, lambda: fn(*args, **kwargs), should_cache=should_cache)
+            finally:
+                _current_entry.reset(token)
+
+        return wrapper
+
+    return decorator
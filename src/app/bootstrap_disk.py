@@ -17,7 +17,14 @@ async def build_context_from_disk(cfg) -> AppContext:
     )
     await data_repo.startup_prepare(True)
 
-    card_service = CardService(cfg)
+    return build_context_from_repository(cfg, data_repo)
+
+
+def build_context_from_repository(cfg, data_repo: DataRepository) -> AppContext:
+    """
+    用已经加载好 bundle 的 DataRepository 构造上下文（prefork worker 使用：bundle 由父进程加载）。
+    """
+    card_service = CardService(cfg, optimize_png=cfg.OptimizePng, fsync=cfg.FsyncCards)
 
     ctx = AppContext(
         cfg=cfg,
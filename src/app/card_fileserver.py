@@ -0,0 +1,251 @@
+# src/app/card_fileserver.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastapi import FastAPI
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from src.app.card_manifest import MEDIA_TYPES, PRECOMPRESS_SUFFIXES, PRECOMPRESSED_ENCODINGS, content_etag
+from src.app.card_service import CardService
+from src.app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 可以由同名 png 现场转码得到的扩展名
+NEGOTIABLE_SUFFIXES = {".webp", ".jpg", ".jpeg"}
+
+# 带模板版本号的路径（<template>/<payload_key>/<revision>/artifact.*）内容永不变化
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=300"
+_REVISION_RE = re.compile(r"[0-9a-f]{12}")
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 比较（弱比较：忽略 W/ 前缀）。"""
+    if header.strip() == "*":
+        return True
+    candidates = [c.strip() for c in header.split(",")]
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    解析单段 Range，返回闭区间 (start, end)；多段或格式不支持时返回 None（按完整内容响应），
+    范围不可满足时抛 ValueError。
+    """
+    m = _RANGE_RE.fullmatch(header.strip())
+    if not m:
+        return None
+    first, last = m.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N：最后 N 个字节
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    """Accept-Encoding 中可接受的编码（排除 q=0）。"""
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(name)
+    return accepted
+
+
+def _respond(request: Request, data: bytes, status: int, headers: dict, media_type: str) -> Response:
+    if request.method == "HEAD":
+        # HEAD 只返回头部，Content-Length 仍是实体长度
+        return Response(b"", status_code=status, headers={**headers, "Content-Length": str(len(data))}, media_type=media_type)
+    return Response(data, status_code=status, headers=headers, media_type=media_type)
+
+
+class CardFileServer:
+    """
+    /cards 专用的文件服务：
+    - 强 ETag（内容哈希，写入时记录在产物清单中）+ If-None-Match → 304
+    - 带版本号的路径返回 Cache-Control: immutable
+    - 单段 Range / If-Range → 206 / 416
+    - 文本产物按 Accept-Encoding 返回写入时生成的 .br/.gz 预压缩副本
+    - 请求的产物正在渲染时等待渲染完成，而不是直接 404
+    - webp/jpg 缺失时由同名 png 现场转码
+    """
+
+    def __init__(self, cache_root: Path, get_card_service: Callable[[], Optional[CardService]]):
+        self.cache_root = cache_root
+        self.root = cache_root.resolve()
+        self.get_card_service = get_card_service
+
+    def asgi(self) -> Starlette:
+        return Starlette(routes=[Route("/{path:path}", self.serve, methods=["GET", "HEAD"])])
+
+    async def serve(self, request: Request) -> Response:
+        rel = request.path_params["path"]
+        resolved = (self.root / rel).resolve()
+        if not resolved.is_relative_to(self.root) or resolved == self.root:
+            return Response(status_code=404)
+        # 清单按 cache_root 下的相对路径记录，这里沿用未 resolve 的路径
+        target = self.cache_root / resolved.relative_to(self.root)
+
+        suffix = target.suffix.lower()
+        media_type = MEDIA_TYPES.get(suffix)
+        if media_type is None:
+            return Response(status_code=404)
+
+        card_service = self.get_card_service()
+        if not await self._ensure_available(card_service, target):
+            return Response(status_code=404)
+
+        etag = await self._etag(card_service, target)
+        headers = {
+            "ETag": f'"{etag}"',
+            "Cache-Control": self._cache_control(target),
+            "Accept-Ranges": "bytes",
+        }
+
+        # 预压缩副本（Range 请求只对原始内容生效）
+        encoding = None
+        body_path = target
+        if suffix in PRECOMPRESS_SUFFIXES:
+            headers["Vary"] = "Accept-Encoding"
+            if "range" not in request.headers:
+                encoding, body_path = self._negotiate_encoding(card_service, target, request)
+                if encoding:
+                    headers["Content-Encoding"] = encoding
+                    # 不同编码是不同的表示，ETag 必须区分
+                    headers["ETag"] = f'"{etag}-{encoding}"'
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        try:
+            data = await asyncio.to_thread(body_path.read_bytes)
+        except FileNotFoundError:
+            if card_service is not None:
+                card_service.manifest.discard(body_path)
+            return Response(status_code=404)
+
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and encoding is None and (not if_range or if_range.strip() == headers["ETag"]):
+            try:
+                span = _parse_range(range_header, len(data))
+            except ValueError:
+                headers["Content-Range"] = f"bytes */{len(data)}"
+                return Response(status_code=416, headers=headers)
+            if span is not None:
+                start, end = span
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+                return _respond(request, data[start:end + 1], 206, headers, media_type)
+
+        return _respond(request, data, 200, headers, media_type)
+
+    # ---------- internal ----------
+
+    async def _ensure_available(self, card_service: Optional[CardService], target: Path) -> bool:
+        if card_service is None:
+            return target.is_file()
+
+        if card_service.manifest.has(target):
+            return True
+
+        # 正在渲染：等渲染结束再判断
+        await card_service.wait_for_render(target)
+        if card_service.manifest.has(target):
+            return True
+
+        if target.suffix.lower() in NEGOTIABLE_SUFFIXES:
+            try:
+                return await card_service.encode_sibling(target) is not None
+            except Exception:
+                logger.exception("Failed to encode card image: %s", target)
+                return False
+
+        # 其他进程写入的产物：回退到磁盘检查一次
+        return card_service.is_cached(target)
+
+    async def _etag(self, card_service: Optional[CardService], target: Path) -> str:
+        entry = card_service.manifest.get(target) if card_service is not None else None
+        if entry is not None and entry.etag:
+            return entry.etag
+
+        # 扫描得到的条目没有内容哈希：补算一次并记下
+        data = await asyncio.to_thread(target.read_bytes)
+        etag = content_etag(data)
+        if card_service is not None and entry is not None:
+            card_service.manifest.record(target, entry.size, entry.mtime_ns, etag)
+        return etag
+
+    def _negotiate_encoding(
+        self,
+        card_service: Optional[CardService],
+        target: Path,
+        request: Request,
+    ) -> tuple[Optional[str], Path]:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            candidate = target.with_name(target.name + suffix)
+            exists = card_service.manifest.has(candidate) if card_service is not None else candidate.is_file()
+            if exists:
+                return encoding, candidate
+        return None, target
+
+    @staticmethod
+    def _cache_control(target: Path) -> str:
+        if _REVISION_RE.fullmatch(target.parent.name):
+            return IMMUTABLE_CACHE_CONTROL
+        return DEFAULT_CACHE_CONTROL
+
+
+def register_cardserver_asgi(app: FastAPI, *, cfg: Config) -> None:
+    """
+    访问规则：
+      GET {mount_path}/{template}/{payload_key}/{revision}/artifact.png
+      GET {mount_path}/{template}/{payload_key}/{revision}/artifact.html
+      ...
+    请求 artifact[.<variant>].webp / .jpg 而磁盘上只有同名 png 时，现场转码后返回，
+    客户端只需把 png 链接换个扩展名即可拿到更小的图。
+    """
+    mount_path = "/cards"
+
+    cache_root: Path = cfg.ResourcePath / "cache" / "cards"
+    cache_root.mkdir(parents=True, exist_ok=True)
+
+    def get_card_service() -> Optional[CardService]:
+        return getattr(getattr(app.state, "ctx", None), "card_service", None)
+
+    server = CardFileServer(cache_root, get_card_service)
+    app.mount(mount_path, server.asgi(), name="cards")
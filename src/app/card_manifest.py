@@ -0,0 +1,326 @@
+# src/app/card_manifest.py
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows：没有 prefork 模式，不需要跨进程锁
+    fcntl = None
+
+from src.helpers import json_codec
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 2
+
+# 落盘的最小间隔（秒）；关闭时总会再保存一次
+SAVE_INTERVAL_SECONDS = 30.0
+
+# 加载持久化清单时抽查的条目数：任何一个在磁盘上不存在就整体重扫
+VERIFY_SAMPLE_SIZE = 64
+
+# 删除记录（墓碑）在清单文件中保留的时长（秒）：足够让所有 worker 都至少保存一次
+TOMBSTONE_TTL_SECONDS = 24 * 3600
+
+MEDIA_TYPES = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".svg": "image/svg+xml",
+    ".html": "text/html; charset=utf-8",
+    ".txt": "text/plain; charset=utf-8",
+    ".json": "application/json",
+}
+
+
+# 写入时额外生成预压缩副本的文本产物，以及副本的 (Content-Encoding, 后缀)，按优先级排列
+PRECOMPRESS_SUFFIXES = {".html", ".txt", ".json", ".svg"}
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def content_etag(data: bytes) -> str:
+    """强 ETag 使用的内容哈希。"""
+    return hashlib.sha256(data).hexdigest()[:20]
+
+
+@dataclass(frozen=True, slots=True)
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    mime: str
+    revision: str
+    etag: str = ""
+    """内容哈希（写入时计算；扫描得到的条目为空，首次对外提供时补算）"""
+
+
+class CardManifest:
+    """
+    卡片缓存清单：相对 cache_root 的路径 -> (size, mtime, mime, 模板版本号, 内容哈希)。
+
+    - 启动时优先读取持久化的清单文件，没有（或格式不符）时扫描一次 cache/cards
+    - 持久化的清单与磁盘对不上时（cache/cards 被清空/重建、抽查到的产物已不存在）同样重扫：
+      清单同时记录 cache_root 目录本身的 (inode, mtime)，加载时再抽查一部分条目
+    - 每次原子写入后更新，命中判断只是一次 dict 查询，不再 stat 磁盘
+    - 清单文件放在 cache/ 下、cards/ 之外，不会被 /cards 对外提供
+    - 读取时发现文件已被外部删除，由调用方 discard 掉对应条目
+
+    写入发生在 IO 线程池中，修改与快照都在锁内进行。
+
+    prefork 模式下多个 worker 共用同一个清单文件：保存时持有跨进程文件锁，
+    先读入磁盘上的清单与自己的条目合并，再经每个进程独立的 tmp 文件原子替换，
+    不会互相覆盖对方新增的条目，也不会交错写坏同一个 tmp 文件。
+    删除以墓碑（相对路径 -> 删除时间 ns）的形式一起落盘：任何 worker 合并时都不会把
+    已删除的产物再写回去，并据此移除自己内存中的同名旧条目；删除之后重新生成的产物（mtime 更新）不受影响。
+    """
+
+    def __init__(self, cache_root: Path, manifest_path: Path):
+        self.cache_root = cache_root
+        self.manifest_path = manifest_path
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._removed: Dict[str, int] = {}
+        """上次保存以来删除的条目 -> 删除时间（time_ns），保存时作为墓碑落盘"""
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+
+    # ---------- 加载 ----------
+
+    def load(self) -> int:
+        """加载清单，返回条目数。"""
+        if not self._load_persisted():
+            self.rescan()
+        return len(self._entries)
+
+    def rescan(self) -> int:
+        """全量扫描 cache_root 重建清单（修复外部改动）。"""
+        entries: Dict[str, ManifestEntry] = {}
+        if self.cache_root.exists():
+            for p in self.cache_root.rglob("artifact*"):
+                if p.suffix == ".tmp" or not p.is_file():
+                    continue
+                st = p.stat()
+                if st.st_size <= 0:
+                    continue
+                entries[self._rel(p)] = self._entry(p, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            self._entries = entries
+            self._removed.clear()
+            self._dirty = True
+        logger.info("Card manifest rebuilt from disk: %d artifacts", len(entries))
+        return len(entries)
+
+    def _read_persisted(
+        self, *, check_root: bool = True
+    ) -> tuple[Dict[str, ManifestEntry], Dict[str, int]] | None:
+        """
+        读取清单文件，返回 (条目, 墓碑)；不存在、格式/根目录不符时返回 None。
+        check_root 时 cache_root 的 (inode, mtime) 与保存时不同也返回 None
+        （运行中合并其他 worker 的清单时不检查：新建模板目录同样会改动 mtime）。
+        """
+        if not self.manifest_path.is_file():
+            return None
+        try:
+            data = json_codec.loads(self.manifest_path.read_bytes())
+            if data.get("format") != MANIFEST_FORMAT or data.get("root") != str(self.cache_root):
+                return None
+            if check_root and data.get("root_stat") != self._root_stat():
+                logger.info("Card cache directory changed since the manifest was saved")
+                return None
+            entries = {rel: ManifestEntry(*row) for rel, row in (data.get("entries") or {}).items()}
+            return entries, {rel: int(t) for rel, t in (data.get("removed") or {}).items()}
+        except Exception:
+            logger.exception("Invalid card manifest: %s", self.manifest_path)
+            return None
+
+    def _load_persisted(self) -> bool:
+        persisted = self._read_persisted()
+        if persisted is None:
+            return False
+        entries, _ = persisted
+
+        missing = self._first_missing(entries)
+        if missing is not None:
+            logger.info("Card manifest is stale (%s is gone), rescanning", missing)
+            return False
+
+        with self._lock:
+            self._entries = entries
+            self._dirty = False
+        logger.info("Card manifest loaded: %d artifacts", len(entries))
+        return True
+
+    # ---------- 查询 / 更新 ----------
+
+    def has(self, path: Path) -> bool:
+        return self._rel(path) in self._entries
+
+    def get(self, path: Path) -> ManifestEntry | None:
+        return self._entries.get(self._rel(path))
+
+    def record(self, path: Path, size: int, mtime_ns: int, etag: str = "") -> None:
+        entry = self._entry(path, size, mtime_ns, etag)
+        rel = self._rel(path)
+        with self._lock:
+            self._entries[rel] = entry
+            self._removed.pop(rel, None)
+            self._dirty = True
+
+    def discard(self, path: Path) -> None:
+        rel = self._rel(path)
+        with self._lock:
+            self._removed[rel] = time.time_ns()
+            if self._entries.pop(rel, None) is not None:
+                self._dirty = True
+
+    def discard_tree(self, directory: Path) -> None:
+        """目录被删除时移除其下所有条目。"""
+        prefix = self._rel(directory) + "/"
+        with self._lock:
+            stale = [rel for rel in self._entries if rel.startswith(prefix)]
+            for rel in stale:
+                del self._entries[rel]
+            now = time.time_ns()
+            self._removed.update((rel, now) for rel in stale)
+            if stale:
+                self._dirty = True
+
+    def items(self) -> Iterator[Tuple[str, ManifestEntry]]:
+        """条目快照（供体积统计/淘汰决策使用）。"""
+        with self._lock:
+            snapshot = list(self._entries.items())
+        return iter(snapshot)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- 持久化 ----------
+
+    def maybe_save(self) -> None:
+        if self._dirty and time.monotonic() - self._last_save >= SAVE_INTERVAL_SECONDS:
+            self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        tmp = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+        removed: Dict[str, int] = {}
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._file_lock():
+                on_disk, tombstones = self._read_persisted(check_root=False) or ({}, {})
+                with self._lock:
+                    removed = dict(self._removed)
+                    self._removed.clear()
+                    rows, tombstones = self._merge(on_disk, tombstones, removed)
+
+                data = {
+                    "format": MANIFEST_FORMAT,
+                    "root": str(self.cache_root),
+                    "root_stat": self._root_stat(),
+                    "entries": rows,
+                    "removed": tombstones,
+                }
+                tmp.write_text(json_codec.dumps(data), encoding="utf-8")
+                os.replace(tmp, self.manifest_path)
+        except OSError:
+            logger.exception("Failed to persist card manifest")
+            tmp.unlink(missing_ok=True)
+            with self._lock:
+                for rel, t in removed.items():
+                    self._removed.setdefault(rel, t)
+                self._dirty = True
+
+    def _merge(
+        self,
+        on_disk: Dict[str, ManifestEntry],
+        tombstones: Dict[str, int],
+        removed: Dict[str, int],
+    ) -> tuple[Dict[str, list], Dict[str, int]]:
+        """
+        在锁内调用：把其他进程保存的条目与墓碑合并进内存，返回要落盘的 (条目行, 墓碑)。
+        条目的 mtime 不晚于墓碑时间即视为已删除；自己的条目优先于磁盘上的同名条目。
+        """
+        cutoff = time.time_ns() - int(TOMBSTONE_TTL_SECONDS * 1e9)
+        merged = {rel: t for rel, t in tombstones.items() if t >= cutoff}
+        for rel, t in removed.items():
+            merged[rel] = max(t, merged.get(rel, 0))
+
+        def deleted(rel: str, entry: ManifestEntry) -> bool:
+            t = merged.get(rel)
+            return t is not None and entry.mtime_ns <= t
+
+        # 其他 worker 删除的产物：自己内存里的旧条目一并移除
+        for rel in [rel for rel in merged if rel in self._entries]:
+            if deleted(rel, self._entries[rel]):
+                del self._entries[rel]
+        for rel, entry in on_disk.items():
+            if rel not in self._entries and not deleted(rel, entry):
+                self._entries[rel] = entry
+
+        rows = {rel: [e.size, e.mtime_ns, e.mime, e.revision, e.etag] for rel, e in self._entries.items()}
+        return rows, merged
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """跨进程互斥（flock）；没有 fcntl 的平台只有单进程，直接放行。"""
+        if fcntl is None:
+            yield
+            return
+        lock_path = self.manifest_path.with_name(self.manifest_path.name + ".lock")
+        with open(lock_path, "a+b") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # ---------- internal ----------
+
+    def _root_stat(self) -> list[int] | None:
+        """cache_root 的 (inode, mtime)：目录被删除重建、其下的模板目录增删时都会变化。"""
+        try:
+            st = self.cache_root.stat()
+        except OSError:
+            return None
+        return [st.st_ino, st.st_mtime_ns]
+
+    def _first_missing(self, entries: Dict[str, ManifestEntry]) -> str | None:
+        """均匀抽查最多 VERIFY_SAMPLE_SIZE 个条目，返回第一个在磁盘上不存在的相对路径。"""
+        rels = list(entries)
+        step = max(1, len(rels) // VERIFY_SAMPLE_SIZE)
+        for rel in rels[::step][:VERIFY_SAMPLE_SIZE]:
+            if not (self.cache_root / rel).is_file():
+                return rel
+        return None
+
+    def _rel(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.cache_root).as_posix()
+        except ValueError:
+            # 不在缓存目录下的路径不会命中任何条目
+            return path.as_posix()
+
+    def _entry(self, path: Path, size: int, mtime_ns: int, etag: str = "") -> ManifestEntry:
+        # 目录布局：<template>/<payload_key>/<revision>/artifact.*
+        return ManifestEntry(
+            size=size,
+            mtime_ns=mtime_ns,
+            mime=MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream"),
+            revision=path.parent.name,
+            etag=etag,
+        )
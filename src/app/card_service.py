@@ -1,35 +1,70 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import gzip
+import hashlib
 import json
 import os
+import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, TypeVar
+from urllib.parse import quote
 
 import logging
 from jinja2 import TemplateNotFound
 
+from src.app.card_manifest import PRECOMPRESS_SUFFIXES, CardManifest, content_etag
 from src.app.config import Config
 from src.app.renderers.jinja_html_renderer import JinjaHtmlRenderer
 from src.app.renderers.jinja_json_renderer import JinjaJsonRenderer
+from src.app.renderers.jinja_layout_renderer import JinjaLayoutRenderer
+from src.app.renderers.jinja_svg_renderer import JinjaSvgRenderer
 from src.app.renderers.jinja_template_loader import JinjaTemplateLoader
 from src.app.renderers.jinja_text_renderer import JinjaTextRenderer
 from src.app.renderers.types import Renderer
 from src.app.transformers.types import Transformer
 from src.app.transformers.html_to_png_transformer import HTMLToPNGTransformer
+from src.app.transformers.native_png_transformer import NativePNGTransformer
+from src.app.transformers.image_encode_transformer import IMAGE_FORMATS, ImageEncodeTransformer
+from src.app.transformers.png_optimize_transformer import PNGOptimizeTransformer
+from src.app.transformers.png_resize_transformer import PNGResizeTransformer
 from src.domain.types import QueryResult
+from src.helpers import json_codec
+from src.helpers.circuit_breaker import CircuitBreaker
+from src.helpers.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# 文本产物的内存缓存条目数（get_text 快速路径）
+TEXT_CACHE_SIZE = 256
+
+# 关闭时等待后台落盘/渲染任务的最长时间（秒）
+BACKGROUND_DRAIN_TIMEOUT = 10.0
+
 
 @dataclass(frozen=True)
 class CardArtifact:
     template: str
     payload_key: str
-    format: str  # "png" | "html" | "txt" | "json"
+    format: str  # "png" | "webp" | "jpg" | "svg" | "html" | "txt" | "json"
     path: Path
     mime: str | None = None
+    revision: str = ""  # 模板内容版本号，产物位于 <template>/<payload_key>/<revision>/ 下
+
+    @property
+    def url_path(self) -> str:
+        """相对 /cards 挂载点的 URL 路径（payload_key 已转义）"""
+        parts = [self.template, quote(self.payload_key, safe="")]
+        if self.revision:
+            parts.append(self.revision)
+        parts.append(self.path.name)
+        return "/".join(parts)
 
     def exists(self) -> bool:
         return self.path.exists()
@@ -41,6 +76,10 @@ class CardArtifact:
         return self.path.read_text(encoding=encoding)
 
 
+class RendererUnavailableError(RuntimeError):
+    """浏览器渲染超时、失败或处于熔断状态；调用方应退化为纯文本结果。"""
+
+
 def _deep_merge(base: dict, override: dict) -> dict:
     """
     深合并配置：用于 viewport 等嵌套 dict 的覆写。
@@ -55,35 +94,202 @@ def _deep_merge(base: dict, override: dict) -> dict:
     return out
 
 
+def _canonical(v: Any) -> Any:
+    # 2.0 与 2 视为同一个参数，避免同一配置因数字写法不同生成两个变体
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    if isinstance(v, dict):
+        return {str(k): _canonical(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_canonical(x) for x in v]
+    return v
+
+
+def _precompress(content: bytes) -> list[tuple[str, bytes]]:
+    """文本产物的预压缩副本：[(后缀, 数据)]。brotli 为可选依赖，未安装时只生成 gzip。"""
+    # mtime=0：同样的内容得到同样的字节
+    out = [(".gz", gzip.compress(content, compresslevel=9, mtime=0))]
+    try:
+        import brotli
+    except ImportError:
+        return out
+    out.append((".br", brotli.compress(content, quality=11)))
+    return out
+
+
+def _variant_key(params: dict) -> str:
+    """
+    渲染参数的规范化哈希；空参数返回 ""（沿用默认文件名 artifact.png）。
+
+    模板默认渲染配置（json 模板）只由 模板版本 + payload 决定，二者已体现在目录中，
+    因此用请求参数的哈希即可唯一确定合并后的渲染配置。
+    """
+    if not params:
+        return ""
+    text = json.dumps(_canonical(params), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:10]
+
+
 class CardService:
     """
     需求对齐版（使用 HTMLToPNGTransformer）：
 
-    1) PNG 必须由 HTML 渲染而来；缺 html 模板 => png 必须报错。
-    2) 产物统一落盘：png/html/txt/json 都是磁盘缓存产物。
+    1) PNG 默认由 HTML 渲染而来；缺 html 模板 => png 必须报错。
+       例外：模板元数据（<template>/template.json）声明 {"png_engine": "native"} 时，
+       png 由 <template>.layout.json.j2 布局经 Pillow 直接栅格化，不经过浏览器，也不需要 html 模板。
+    2) 产物统一落盘：png/svg/html/txt/json 都是磁盘缓存产物（svg 由模板直接输出文本，不经过浏览器）。
        - 请求 png 时，会同时确保 html artifact 生成并落盘（复用缓存，避免重复渲染）。
+       - 产物路径带模板内容版本号：<template>/<payload_key>/<revision>/artifact.<ext>，
+         模板（含 css 等资源）改动后只有该模板的产物失效，旧版本目录在写入新版本时顺带清理。
     3) 模板不一定同时具备所有格式：
        - 只有当用户请求某个格式时，才要求对应模板存在；
        - 未请求的格式，即使模板缺失，也绝不报错、绝不尝试加载。
-       - 例外：请求 png 等价于“也请求 html”，因为 png 依赖 html。
+       - 例外：请求 png 等价于“也请求 html”，因为 png 依赖 html（原生引擎的模板除外）。
     4) 未知 format 直接报错。
+    5) png 的请求参数（viewport / full_page / deviceScaleFactor ...）参与产物命名：
+       artifact.<variant>.png，不同参数不会互相覆盖。
+       params["derive"] 声明派生图（如缩略图）：先得到不含 derive 的基础截图，
+       再用 Pillow 缩小生成，不需要第二次浏览器渲染。
+         {"derive": {"width": 360}}  /  {"derive": {"scale": 0.5}}
+       webp / jpg 由 png 截图转码得到（params["quality"] 控制质量），同样不需要再次渲染；
+       可选的无损 PNG 优化在进程池中执行。
+    6) 所有阻塞操作（模板渲染、文件读写、rename、fsync）都在独立的有界线程池中执行，
+       不占用事件循环；线程池大小即并发渲染/IO 的上限。
+    7) 快速路径：get_text() 直接返回文本内容（内存命中或内存渲染，落盘在后台完成）；
+       schedule() 立即返回 png 的最终路径并在后台渲染，调用方不必等待截图即可给出 URL。
     """
 
-    def __init__(self, cfg: Config, *, html_to_png: Transformer | None = None):
+    def __init__(
+        self,
+        cfg: Config,
+        *,
+        html_to_png: Transformer | None = None,
+        native_png: Transformer | None = None,
+        png_resizer: Transformer | None = None,
+        image_encoder: Transformer | None = None,
+        png_optimizer: Transformer | None = None,
+        optimize_png: bool = False,
+        io_workers: int = 4,
+        fsync: bool = False,
+        render_timeout: float = 60.0,
+        breaker: CircuitBreaker | None = None,
+    ):
+        # 模板渲染、原生 png 栅格化与文件读写共用的有界 IO 线程池
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="card-io")
+        self._fsync = fsync
+
         templates_root = cfg.ProjectRoot / "data" / "templates"
-        loader = JinjaTemplateLoader(str(templates_root))
+        loader = JinjaTemplateLoader(
+            str(templates_root),
+            bytecode_cache_dir=cfg.ResourcePath / "cache" / "jinja",
+            auto_reload=cfg.DevMode,
+        )
 
         self.text_renderer: Renderer = JinjaTextRenderer(loader)
         self.json_renderer: Renderer = JinjaJsonRenderer(loader)
         self.html_renderer: Renderer = JinjaHtmlRenderer(loader)
+        self.layout_renderer: Renderer = JinjaLayoutRenderer(loader)
+        self.svg_renderer: Renderer = JinjaSvgRenderer(loader)
+        self.loader = loader
 
-        self.html_to_png: Transformer = html_to_png or HTMLToPNGTransformer()
+        self.html_to_png: Transformer = html_to_png or HTMLToPNGTransformer(
+            templates_root, memoize_assets=not cfg.DevMode
+        )
+        self.native_png: Transformer = native_png or NativePNGTransformer(
+            templates_root, font=cfg.CardFont, executor=self._io_pool
+        )
+        self.png_resizer: Transformer = png_resizer or PNGResizeTransformer()
+        self.image_encoder: Transformer = image_encoder or ImageEncodeTransformer()
+        self.png_optimizer: Transformer | None = png_optimizer or (PNGOptimizeTransformer() if optimize_png else None)
 
         self.cache_root: Path = cfg.ResourcePath / "cache" / "cards"
         self.cache_root.mkdir(parents=True, exist_ok=True)
 
-        self._locks: dict[str, asyncio.Lock] = {}
-        self._locks_guard = asyncio.Lock()
+        # 产物清单：命中判断只查内存，不再 stat 磁盘
+        self.manifest = CardManifest(self.cache_root, cfg.ResourcePath / "cache" / "cards-manifest.json")
+        self.manifest.load()
+
+        # 按产物路径合并并发渲染；条目只在渲染期间存在
+        self._flight = SingleFlight()
+
+        # 后台任务（文本落盘 / 预定的 png 渲染），key 为产物路径；/cards 会等待对应任务
+        self._background: dict[str, asyncio.Task] = {}
+        self._texts: OrderedDict[str, str] = OrderedDict()
+
+        # 浏览器渲染的整体期限与熔断：浏览器不健康时快速失败，不让请求堆积在锁上
+        self.render_timeout = render_timeout
+        self.render_breaker = breaker or CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+        self.render_stats: dict[str, int] = {"errors": 0, "timeouts": 0, "rejected": 0}
+
+    async def aclose(self) -> None:
+        """等待后台任务收尾，关闭常驻浏览器等异步资源，再释放线程池/进程池。"""
+        if self._background:
+            _, not_done = await asyncio.wait(list(self._background.values()), timeout=BACKGROUND_DRAIN_TIMEOUT)
+            for task in not_done:
+                task.cancel()
+        closer = getattr(self.html_to_png, "close", None)
+        if callable(closer):
+            try:
+                await closer()
+            except Exception:
+                logger.exception("Failed to close html_to_png transformer")
+        self.close()
+
+    def close(self) -> None:
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        self.manifest.save()
+        closer = getattr(self.png_optimizer, "close", None)
+        if callable(closer):
+            closer()
+
+    def is_cached(self, path: Path) -> bool:
+        """
+        命中判断：先查清单（一次 dict 查询）。未命中时再 stat 一次，
+        用来接住其他进程（prefork worker）或清单加载之后写入的产物；未命中本来就要渲染，这点开销可以忽略。
+        """
+        if self.manifest.has(path):
+            return True
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return False
+        if st.st_size <= 0:
+            return False
+        self.manifest.record(path, st.st_size, st.st_mtime_ns)
+        return True
+
+    async def wait_for_render(self, path: Path) -> None:
+        """若 path 正在渲染/编码/后台落盘中则等待其完成（失败也返回，由调用方再检查是否存在）。"""
+        await self._wait_background(str(path))
+        try:
+            await self._flight.wait(str(path))
+        except Exception:
+            pass
+
+    def render_status(self) -> dict[str, Any]:
+        """渲染健康状况与计数，供 /rest/status 导出。"""
+        return {
+            "breaker": self.render_breaker.state,
+            "consecutive_failures": self.render_breaker.failures,
+            **self.render_stats,
+            "browser": dict(getattr(self.html_to_png, "stats", {}) or {}),
+        }
+
+    async def read_text(self, artifact: CardArtifact, encoding: str = "utf-8") -> str:
+        """在 IO 线程池中读取产物文本（给 async 调用方使用，避免阻塞事件循环）"""
+        try:
+            return await self._run_blocking(artifact.read_text, encoding)
+        except FileNotFoundError:
+            # 文件被外部删除：清单条目作废，下次请求重新生成
+            self.manifest.discard(artifact.path)
+            raise
+
+    async def read_bytes(self, artifact: CardArtifact) -> bytes:
+        try:
+            return await self._run_blocking(artifact.read_bytes)
+        except FileNotFoundError:
+            self.manifest.discard(artifact.path)
+            raise
 
     async def get(
         self,
@@ -93,29 +299,79 @@ class CardService:
         payload: object,
         params: dict | None = None,
         format: str = "png",
+    ) -> CardArtifact:
+        """
+        取得（必要时生成）产物。清单认为已缓存、实际文件却已被外部删除时，
+        中间产物读取会抛 FileNotFoundError 并作废对应条目；这里重新生成一次，而不是让首个请求失败。
+        """
+        try:
+            return await self._get(
+                template=template, payload_key=payload_key, payload=payload, params=params, format=format
+            )
+        except FileNotFoundError as e:
+            logger.warning("Cached card artifact vanished, re-rendering: %s", e.filename or e)
+            return await self._get(
+                template=template, payload_key=payload_key, payload=payload, params=params, format=format
+            )
+
+    async def _get(
+        self,
+        *,
+        template: str,
+        payload_key: str,
+        payload: object,
+        params: dict | None = None,
+        format: str = "png",
     ) -> CardArtifact:
         fmt = format.lower().strip().lstrip(".")
-        allowed = ("png", "html", "txt", "json")
+        if fmt == "jpeg":
+            fmt = "jpg"
+        allowed = ("png", "webp", "jpg", "svg", "html", "txt", "json")
         if fmt not in allowed:
             raise ValueError(f"Unsupported format: {format}. Must be one of {allowed}")
 
         params = params or {}
         qr = self._ensure_query_result(payload)
+        await self._refresh_templates()
 
-        # png：先确保 html 落盘并复用
-        if fmt == "png":
-            html_artifact = await self.get(
+        # webp / jpg：由 png 截图转码
+        if fmt in IMAGE_FORMATS:
+            png_artifact = await self.get(
                 template=template,
                 payload_key=payload_key,
                 payload=qr,
+                params={k: v for k, v in params.items() if k != "quality"},
+                format="png",
+            )
+            return await self._get_encoded_image(
+                png_artifact=png_artifact,
+                format=fmt,
                 params=params,
-                format="html",
             )
-            return await self._get_png_from_html(
+
+        # png：浏览器引擎先确保 html 落盘并复用；原生引擎直接由布局栅格化
+        if fmt == "png":
+            base_params = {k: v for k, v in params.items() if k != "derive"}
+            html_artifact = None
+            if not self._uses_native_png(template):
+                html_artifact = await self.get(
+                    template=template,
+                    payload_key=payload_key,
+                    payload=qr,
+                    params=base_params,
+                    format="html",
+                )
+            base_artifact = await self._get_base_png(
                 template=template,
                 payload_key=payload_key,
                 html_artifact=html_artifact,
                 qr=qr,
+                params=base_params,
+            )
+            if not params.get("derive"):
+                return base_artifact
+            return await self._get_png_derivative(
+                base_artifact=base_artifact,
                 params=params,
             )
 
@@ -126,6 +382,108 @@ class CardService:
             format=fmt,
         )
 
+    async def get_text(
+        self,
+        *,
+        template: str,
+        payload_key: str,
+        payload: object,
+        format: str = "txt",
+    ) -> str:
+        """
+        文本产物（txt/html/json/svg）的快速路径，返回内容而不是产物：
+        - 最近用过的内容直接从内存返回，不触碰磁盘
+        - 清单中已有时在 IO 线程池读取一次
+        - 尚未生成时在内存中渲染后立即返回，落盘交给后台任务（产物路径与 get() 相同）
+        """
+        fmt = format.lower().strip().lstrip(".")
+        if fmt not in ("txt", "html", "json", "svg"):
+            raise ValueError(f"Unsupported text format: {format}")
+
+        await self._refresh_templates()
+        revision = self.loader.template_hash(template)
+        out_path = self.cache_root / template / payload_key / revision / f"artifact.{fmt}"
+        key = str(out_path)
+
+        text = self._texts.get(key)
+        if text is not None:
+            self._texts.move_to_end(key)
+            return text
+
+        if self.manifest.has(out_path):
+            try:
+                text = await self.read_text(CardArtifact(template, payload_key, fmt, out_path, revision=revision))
+            except FileNotFoundError:
+                text = None
+
+        if text is None:
+            qr = self._ensure_query_result(payload)
+
+            async def produce() -> str:
+                rendered, _ = await self._render_text(template, qr, fmt)
+                return rendered
+
+            text = await self._flight.do(key + "#render", produce)
+
+            async def write() -> None:
+                await self._run_blocking(self._prepare_revision_dir, out_path.parent)
+                await self._atomic_write_text(out_path, text, encoding="utf-8")
+
+            if not self.manifest.has(out_path):
+                self._spawn(key, write)
+
+        self._texts[key] = text
+        self._texts.move_to_end(key)
+        while len(self._texts) > TEXT_CACHE_SIZE:
+            self._texts.popitem(last=False)
+        return text
+
+    def schedule(
+        self,
+        *,
+        template: str,
+        payload_key: str,
+        payload: object,
+        params: dict | None = None,
+        on_error: Callable[[BaseException], None] | None = None,
+    ) -> CardArtifact | None:
+        """
+        预定一张 png：立即返回它的最终产物（路径由模板版本 + 参数确定），渲染在后台进行。
+        URL 可以先交给客户端，/cards 收到请求时会等待这次渲染完成。
+        已缓存时不再调度；浏览器引擎处于熔断状态时返回 None（调用方退化为纯文本）。
+        后台渲染失败（或被取消）时调用 on_error，调用方可据此撤回已经交出去的 URL（如工具结果缓存）。
+        不支持 derive 派生图。
+        """
+        params = params or {}
+        if params.get("derive"):
+            raise ValueError("schedule() does not support derived images")
+
+        if self.loader.reload_due():
+            # 同步接口不能等待：本次沿用当前版本号，目录重扫交给 IO 线程池
+            self._io_pool.submit(self.loader.check_reload)
+        revision = self.loader.template_hash(template)
+        variant = _variant_key(params)
+        out_path = self.cache_root / template / payload_key / revision / (
+            f"artifact.{variant}.png" if variant else "artifact.png"
+        )
+        artifact = CardArtifact(template, payload_key, "png", out_path, mime="image/png", revision=revision)
+
+        if self.manifest.has(out_path):
+            return artifact
+        if str(out_path) in self._background:
+            self._watch_background(str(out_path), on_error)
+            return artifact
+        if not self._uses_native_png(template) and self.render_breaker.state == CircuitBreaker.OPEN:
+            return None
+
+        qr = self._ensure_query_result(payload)
+        self._spawn(
+            str(out_path),
+            lambda: self.get(template=template, payload_key=payload_key, payload=qr, params=params, format="png"),
+        )
+        self._watch_background(str(out_path), on_error)
+        return artifact
+
     async def get_many(
         self,
         *,
@@ -147,6 +505,157 @@ class CardService:
             )
         return out
 
+    async def prewarm(
+        self,
+        *,
+        template: str,
+        items: list[tuple[str, object]],
+        params: dict | None = None,
+        batch_size: int = 16,
+    ) -> dict[str, CardArtifact | BaseException]:
+        """
+        批量预热 png：items 为 [(payload_key, payload), ...]。
+        已缓存的直接命中；其余先并发生成 html，再按合并后的渲染配置分组，
+        每组交给 html_to_png.transform_many 在同一个 page 里依次截图。
+        每张卡片与 get()/schedule() 共用同一个 single-flight key（产物路径）：
+        已在渲染中的卡片直接等待那次渲染，本批次占下的卡片在各自的 flight 内落盘。
+        返回 payload_key -> CardArtifact，单张失败时为异常对象，不影响其他卡片。
+        """
+        params = params or {}
+        base_params = {k: v for k, v in params.items() if k != "derive"}
+        results: dict[str, CardArtifact | BaseException] = {}
+        await self._refresh_templates()
+
+        # 原生引擎不经过浏览器，没有同页批量截图可省；不支持批量的 transformer 同样逐张渲染
+        if self._uses_native_png(template) or not hasattr(self.html_to_png, "transform_many"):
+            outs = await asyncio.gather(
+                *(
+                    self.get(template=template, payload_key=key, payload=payload, params=params, format="png")
+                    for key, payload in items
+                ),
+                return_exceptions=True,
+            )
+            return {key: out for (key, _), out in zip(items, outs)}
+
+        revision = self.loader.template_hash(template)
+        variant = _variant_key(base_params)
+        filename = f"artifact.{variant}.png" if variant else "artifact.png"
+
+        def png_artifact(key: str, out_path: Path) -> CardArtifact:
+            return CardArtifact(template, key, "png", out_path, mime="image/png", revision=revision)
+
+        pending: list[tuple[str, object, Path]] = []
+        for key, payload in items:
+            out_path = self.cache_root / template / key / revision / filename
+            if self.is_cached(out_path):
+                results[key] = png_artifact(key, out_path)
+            else:
+                pending.append((key, payload, out_path))
+
+        async def prepare(key: str, payload: object) -> tuple[CardArtifact, dict]:
+            qr = self._ensure_query_result(payload)
+            html_artifact, render_cfg = await asyncio.gather(
+                self.get(template=template, payload_key=key, payload=qr, params=base_params, format="html"),
+                self._run_blocking(self._load_png_render_cfg_optional, template, qr),
+            )
+            return html_artifact, render_cfg
+
+        prepared = await asyncio.gather(
+            *(prepare(key, payload) for key, payload, _ in pending),
+            return_exceptions=True,
+        )
+
+        # 合并后的渲染配置 -> [(payload_key, html_artifact, out_path)]
+        groups: dict[str, tuple[dict, list[tuple[str, CardArtifact, Path]]]] = {}
+        for (key, _, out_path), prep in zip(pending, prepared):
+            if isinstance(prep, BaseException):
+                logger.warning("Prewarm %s:%s failed before render: %s", template, key, prep)
+                results[key] = prep
+                continue
+            html_artifact, render_cfg = prep
+            merged_cfg = _deep_merge(render_cfg, base_params)
+            merged_cfg.setdefault("base_path", template)
+            group_key = json.dumps(_canonical(merged_cfg), sort_keys=True, ensure_ascii=False)
+            groups.setdefault(group_key, (merged_cfg, []))[1].append((key, html_artifact, out_path))
+
+        for merged_cfg, members in groups.values():
+            for i in range(0, len(members), max(1, batch_size)):
+                chunk = members[i:i + batch_size]
+                outs = await self._prewarm_chunk(chunk, merged_cfg, png_artifact)
+                results.update(zip((key for key, _, _ in chunk), outs))
+
+        if params.get("derive"):
+            for key, artifact in list(results.items()):
+                if isinstance(artifact, CardArtifact):
+                    try:
+                        results[key] = await self._get_png_derivative(base_artifact=artifact, params=params)
+                    except Exception as e:
+                        results[key] = e
+
+        return results
+
+    async def _prewarm_chunk(
+        self,
+        chunk: list[tuple[str, CardArtifact, Path]],
+        merged_cfg: dict,
+        png_artifact: Callable[[str, Path], CardArtifact],
+    ) -> list[CardArtifact | BaseException]:
+        """
+        先同步占下 chunk 中每张卡片的 single-flight key，再对自己占到的卡片做一次 transform_many；
+        其余（已被 get()/schedule() 占住或刚好落盘）直接等待已有的结果。
+        """
+        loop = asyncio.get_running_loop()
+        slots: dict[str, asyncio.Future] = {}
+        tasks: list[asyncio.Task] = []
+        owned: list[tuple[str, CardArtifact]] = []
+
+        for key, html_artifact, out_path in chunk:
+            flight_key = str(out_path)
+            if self.is_cached(out_path):
+                done = loop.create_future()
+                done.set_result(png_artifact(key, out_path))
+                tasks.append(done)
+                continue
+            if not self._flight.in_flight(flight_key):
+                slots[flight_key] = loop.create_future()
+                owned.append((flight_key, html_artifact))
+
+            async def produce(key=key, out_path=out_path, slot=slots.get(flight_key)) -> CardArtifact:
+                png_bytes = await slot
+                png_bytes = await self._optimize_png(bytes(png_bytes))
+                await self._run_blocking(self._prepare_revision_dir, out_path.parent)
+                await self._atomic_write_bytes(out_path, png_bytes)
+                return png_artifact(key, out_path)
+
+            tasks.append(self._flight.start(flight_key, produce))
+
+        try:
+            if owned:
+                try:
+                    htmls = await asyncio.gather(*(self.read_text(a) for _, a in owned))
+                    outs = await self._browser_render(
+                        lambda: self.html_to_png.transform_many(inputs=list(htmls), cfg=merged_cfg),
+                        timeout=self.render_timeout * len(owned),
+                    )
+                except Exception as e:
+                    outs = [e] * len(owned)
+                for (flight_key, _), out in zip(owned, outs):
+                    if isinstance(out, BaseException):
+                        slots[flight_key].set_exception(out)
+                    else:
+                        slots[flight_key].set_result(out)
+        finally:
+            # 被取消时，占下的 flight 不能一直挂着
+            for slot in slots.values():
+                if not slot.done():
+                    slot.cancel()
+
+        outs = await asyncio.gather(*(asyncio.shield(t) for t in tasks), return_exceptions=True)
+        for (key, _, _), out in zip(chunk, outs):
+            if isinstance(out, BaseException):
+                logger.warning("Prewarm %s failed: %s", key, out)
+        return list(outs)
+
     # ----------------- core implementations -----------------
 
     async def _get_single_non_png(
@@ -155,110 +664,320 @@ class CardService:
         template: str,
         payload_key: str,
         qr: QueryResult,
-        format: str,  # "html" | "txt" | "json"
+        format: str,  # "html" | "txt" | "json" | "svg"
     ) -> CardArtifact:
-        out_dir = self.cache_root / template / payload_key
+        revision = self.loader.template_hash(template)
+        out_dir = self.cache_root / template / payload_key / revision
         out_path = out_dir / f"artifact.{format}"
 
         # 快速命中
-        if out_path.exists():
-            try:
-                if out_path.stat().st_size > 0:
-                    return CardArtifact(template, payload_key, format, out_path)
-            except FileNotFoundError:
-                pass
+        if self.is_cached(out_path):
+            return CardArtifact(template, payload_key, format, out_path, revision=revision)
 
-        lock_key = f"{template}:{payload_key}:{format}"
-        lock = await self._get_lock(lock_key)
+        async def produce() -> CardArtifact:
+            # get_text 的后台落盘可能正在进行
+            await self._wait_background(str(out_path))
+            # double-check：前一次执行可能刚刚落盘
+            if self.is_cached(out_path):
+                return CardArtifact(template, payload_key, format, out_path, revision=revision)
 
-        async with lock:
-            # double-check
-            if out_path.exists():
-                try:
-                    if out_path.stat().st_size > 0:
-                        return CardArtifact(template, payload_key, format, out_path)
-                except FileNotFoundError:
-                    pass
-
-            out_dir.mkdir(parents=True, exist_ok=True)
-
-            if format == "html":
-                ro = self.html_renderer.render(template, qr)  # 缺模板 => TemplateNotFound（请求才要求存在）
-                await self._atomic_write_text(out_path, ro.payload, encoding="utf-8")
-                return CardArtifact(template, payload_key, format, out_path, mime=ro.mime)
-
-            if format == "txt":
-                ro = self.text_renderer.render(template, qr)
-                await self._atomic_write_text(out_path, ro.payload, encoding="utf-8")
-                return CardArtifact(template, payload_key, format, out_path, mime=ro.mime)
-
-            if format == "json":
-                ro = self.json_renderer.render(template, qr)
-                # 注意：你的 JinjaJsonRenderer 返回 payload 为 dict/list（不是字符串）
-                json_text = json.dumps(ro.payload, ensure_ascii=False, indent=2)
-                await self._atomic_write_text(out_path, json_text, encoding="utf-8")
-                return CardArtifact(template, payload_key, format, out_path, mime=ro.mime)
+            await self._run_blocking(self._prepare_revision_dir, out_dir)
 
-            raise ValueError(f"Unsupported non-png format: {format}")
+            # 缺模板 => TemplateNotFound（请求才要求存在）
+            text, mime = await self._render_text(template, qr, format)
+            await self._atomic_write_text(out_path, text, encoding="utf-8")
+            return CardArtifact(template, payload_key, format, out_path, mime=mime, revision=revision)
+
+        return await self._flight.do(str(out_path), produce)
 
-    async def _get_png_from_html(
+    async def _get_base_png(
         self,
         *,
         template: str,
         payload_key: str,
-        html_artifact: CardArtifact,
+        html_artifact: CardArtifact | None,
         qr: QueryResult,
         params: dict,
     ) -> CardArtifact:
-        out_dir = self.cache_root / template / payload_key
-        out_path = out_dir / "artifact.png"
+        """html_artifact 为 None 时走原生引擎（模板元数据 png_engine=native）。"""
+        revision = self.loader.template_hash(template)
+        variant = _variant_key(params)
+        out_dir = self.cache_root / template / payload_key / revision
+        out_path = out_dir / (f"artifact.{variant}.png" if variant else "artifact.png")
 
         # 快速命中
-        if out_path.exists():
-            try:
-                if out_path.stat().st_size > 0:
-                    return CardArtifact(template, payload_key, "png", out_path, mime="image/png")
-            except FileNotFoundError:
-                pass
-
-        lock_key = f"{template}:{payload_key}:png"
-        lock = await self._get_lock(lock_key)
+        if self.is_cached(out_path):
+            return CardArtifact(template, payload_key, "png", out_path, mime="image/png", revision=revision)
 
-        async with lock:
-            # double-check
-            if out_path.exists():
-                try:
-                    if out_path.stat().st_size > 0:
-                        return CardArtifact(template, payload_key, "png", out_path, mime="image/png")
-                except FileNotFoundError:
-                    pass
+        async def produce() -> CardArtifact:
+            # double-check：前一次执行可能刚刚落盘
+            if self.is_cached(out_path):
+                return CardArtifact(template, payload_key, "png", out_path, mime="image/png", revision=revision)
 
-            out_dir.mkdir(parents=True, exist_ok=True)
+            await self._run_blocking(self._prepare_revision_dir, out_dir)
 
             # png 配置：json 模板可选，缺失静默
-            render_cfg = self._load_png_render_cfg_optional(template, qr)
+            render_cfg = await self._run_blocking(self._load_png_render_cfg_optional, template, qr)
             merged_cfg = _deep_merge(render_cfg, params or {})
 
-            html = html_artifact.read_text(encoding="utf-8")
-
-            png_bytes = await self.html_to_png.transform(input=html, cfg=merged_cfg)
+            if html_artifact is None:
+                layout = await self._run_blocking(self.layout_renderer.render, template, qr)
+                png_bytes = await self.native_png.transform(input=layout.payload, cfg=merged_cfg)
+            else:
+                # 模板里的相对资源路径以模板目录为基准
+                merged_cfg.setdefault("base_path", template)
+                html = await self.read_text(html_artifact)
+                png_bytes = await self._browser_render(
+                    lambda: self.html_to_png.transform(input=html, cfg=merged_cfg),
+                    timeout=self.render_timeout,
+                )
             if not isinstance(png_bytes, (bytes, bytearray)):
                 raise TypeError(
-                    f"HTMLToPNGTransformer must return bytes, got {type(png_bytes)}"
+                    f"PNG transformer must return bytes, got {type(png_bytes)}"
                 )
+            png_bytes = await self._optimize_png(bytes(png_bytes))
+
+            await self._atomic_write_bytes(out_path, bytes(png_bytes))
+            return CardArtifact(template, payload_key, "png", out_path, mime="image/png", revision=revision)
+
+        return await self._flight.do(str(out_path), produce)
+
+    async def _get_png_derivative(
+        self,
+        *,
+        base_artifact: CardArtifact,
+        params: dict,
+    ) -> CardArtifact:
+        """由基础截图缩小得到派生图（缩略图 / 低分辨率），与基础截图位于同一版本目录。"""
+        variant = _variant_key(params)
+        out_path = base_artifact.path.parent / f"artifact.{variant}.png"
 
+        def artifact() -> CardArtifact:
+            return CardArtifact(
+                base_artifact.template,
+                base_artifact.payload_key,
+                "png",
+                out_path,
+                mime="image/png",
+                revision=base_artifact.revision,
+            )
+
+        if self.is_cached(out_path):
+            return artifact()
+
+        async def produce() -> CardArtifact:
+            if self.is_cached(out_path):
+                return artifact()
+
+            base_bytes = await self.read_bytes(base_artifact)
+            png_bytes = await self.png_resizer.transform(input=base_bytes, cfg=params.get("derive") or {})
+            png_bytes = await self._optimize_png(bytes(png_bytes))
             await self._atomic_write_bytes(out_path, bytes(png_bytes))
-            return CardArtifact(template, payload_key, "png", out_path, mime="image/png")
+            return artifact()
+
+        return await self._flight.do(str(out_path), produce)
+
+    async def _get_encoded_image(
+        self,
+        *,
+        png_artifact: CardArtifact,
+        format: str,  # "webp" | "jpg"
+        params: dict,
+    ) -> CardArtifact:
+        """
+        png -> webp/jpg。未指定 quality 时与 png 同名换扩展名（artifact[.<variant>].webp），
+        这样 /cards 下可以直接按扩展名协商；指定 quality 时按完整参数另起变体名。
+        """
+        if "quality" in params:
+            out_path = png_artifact.path.parent / f"artifact.{_variant_key(params)}.{format}"
+        else:
+            out_path = png_artifact.path.with_suffix(f".{format}")
+
+        encoded = await self._encode_from_png(
+            png_path=png_artifact.path,
+            out_path=out_path,
+            format=format,
+            quality=params.get("quality"),
+        )
+        return CardArtifact(
+            png_artifact.template,
+            png_artifact.payload_key,
+            format,
+            encoded,
+            mime=IMAGE_FORMATS[format][1],
+            revision=png_artifact.revision,
+        )
+
+    async def encode_sibling(self, path: Path) -> Path | None:
+        """
+        /cards 按扩展名协商用：请求 artifact[.<variant>].webp/jpg 而磁盘上只有同名 png 时，
+        现场转码并落盘；没有可用的 png 返回 None。
+        """
+        format = path.suffix.lstrip(".").lower()
+        if format == "jpeg":
+            format = "jpg"
+        if format not in IMAGE_FORMATS:
+            return None
+
+        png_path = path.with_suffix(".png")
+        if not self.is_cached(png_path):
+            return None
+        return await self._encode_from_png(png_path=png_path, out_path=path, format=format, quality=None)
+
+    async def _encode_from_png(self, *, png_path: Path, out_path: Path, format: str, quality: Any) -> Path:
+        if self.is_cached(out_path):
+            return out_path
+
+        async def produce() -> Path:
+            if self.is_cached(out_path):
+                return out_path
+
+            try:
+                png_bytes = await self._run_blocking(png_path.read_bytes)
+            except FileNotFoundError:
+                self.manifest.discard(png_path)
+                raise
+            cfg: dict[str, Any] = {"format": format}
+            if quality is not None:
+                cfg["quality"] = quality
+            data = await self.image_encoder.transform(input=png_bytes, cfg=cfg)
+            await self._atomic_write_bytes(out_path, bytes(data))
+            return out_path
+
+        return await self._flight.do(str(out_path), produce)
+
+    async def _optimize_png(self, png_bytes: bytes) -> bytes:
+        if self.png_optimizer is None:
+            return png_bytes
+        try:
+            return bytes(await self.png_optimizer.transform(input=png_bytes))
+        except Exception:
+            # 优化是锦上添花，失败时落盘原图
+            logger.exception("PNG optimization failed, keeping original")
+            return png_bytes
+
+    def size_report(self) -> dict[str, dict[str, dict[str, int]]]:
+        """
+        统计缓存产物体积：template -> format -> {"count", "bytes", "png_bytes"}。
+        png_bytes 为与该产物同名的 png 的体积之和，用来计算 webp/jpg 相对 png 节省的字节数。
+        数据来自产物清单，不扫描磁盘。
+        """
+        report: dict[str, dict[str, dict[str, int]]] = {}
+        for rel, item in self.manifest.items():
+            path = self.cache_root / rel
+            per_format = report.setdefault(rel.split("/", 1)[0], {})
+            fmt = path.suffix.lstrip(".")
+            entry = per_format.setdefault(fmt, {"count": 0, "bytes": 0, "png_bytes": 0})
+            entry["count"] += 1
+            entry["bytes"] += item.size
+            if fmt in IMAGE_FORMATS:
+                png = self.manifest.get(path.with_suffix(".png"))
+                if png is not None:
+                    entry["png_bytes"] += png.size
+        return report
 
     # ----------------- internals -----------------
 
-    async def _get_lock(self, key: str) -> asyncio.Lock:
-        async with self._locks_guard:
-            lock = self._locks.get(key)
-            if lock is None:
-                lock = asyncio.Lock()
-                self._locks[key] = lock
-            return lock
+    async def _run_blocking(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, functools.partial(fn, *args))
+
+    async def _refresh_templates(self) -> None:
+        """dev 模式：到了检查间隔时在 IO 线程池里重扫模板目录，再在事件循环上取版本号。"""
+        if self.loader.reload_due():
+            await self._run_blocking(self.loader.check_reload)
+
+    async def _browser_render(self, call, *, timeout: float):
+        """
+        经熔断器和整体期限调用浏览器渲染。超时时 asyncio 会取消内部等待，
+        所在的 single-flight 执行随之结束并移除，后续请求会重新发起渲染而不是一直等待。
+        """
+        if not self.render_breaker.allow():
+            self.render_stats["rejected"] += 1
+            raise RendererUnavailableError("渲染器暂不可用（熔断中）")
+
+        try:
+            async with asyncio.timeout(timeout):
+                out = await call()
+        except asyncio.CancelledError:
+            self.render_breaker.release()
+            raise
+        except TimeoutError as e:
+            self.render_stats["timeouts"] += 1
+            self.render_breaker.record_failure()
+            raise RendererUnavailableError(f"渲染超时：{e or timeout}") from e
+        except Exception as e:
+            self.render_stats["errors"] += 1
+            self.render_breaker.record_failure()
+            raise RendererUnavailableError(f"渲染失败：{e}") from e
+
+        self.render_breaker.record_success()
+        return out
+
+    async def _render(self, renderer: Renderer, template: str, qr: QueryResult):
+        return await self._run_blocking(renderer.render, template, qr)
+
+    async def _render_text(self, template: str, qr: QueryResult, format: str) -> tuple[str, str | None]:
+        """渲染文本类产物，返回 (文本, mime)。svg 由模板直接输出，不需要浏览器截图。"""
+        renderers = {
+            "html": self.html_renderer,
+            "txt": self.text_renderer,
+            "svg": self.svg_renderer,
+            "json": self.json_renderer,
+        }
+        if format not in renderers:
+            raise ValueError(f"Unsupported non-png format: {format}")
+
+        ro = await self._render(renderers[format], template, qr)
+        if format == "json":
+            # JinjaJsonRenderer 返回的 payload 为 dict/list（不是字符串）
+            return json_codec.dumps(ro.payload, pretty=True), ro.mime
+        return ro.payload, ro.mime
+
+    def _spawn(self, key: str, fn: Callable[[], Any]) -> None:
+        """在后台执行 fn（同一 key 同时只有一个）；失败只记录日志。"""
+        if key in self._background:
+            return
+        task = asyncio.ensure_future(fn())
+        self._background[key] = task
+        task.add_done_callback(lambda t, k=key: self._background_done(k, t))
+
+    def _watch_background(self, key: str, on_error: Callable[[BaseException], None] | None) -> None:
+        """后台任务 key 失败或被取消时调用 on_error（回调本身的异常只记录日志）。"""
+        task = self._background.get(key)
+        if task is None or on_error is None:
+            return
+
+        def done(t: asyncio.Task) -> None:
+            e = asyncio.CancelledError() if t.cancelled() else t.exception()
+            if e is None:
+                return
+            try:
+                on_error(e)
+            except Exception:
+                logger.exception("Background error callback failed: %s", key)
+
+        task.add_done_callback(done)
+
+    def _background_done(self, key: str, task: asyncio.Task) -> None:
+        if self._background.get(key) is task:
+            del self._background[key]
+        if task.cancelled():
+            return
+        e = task.exception()
+        if isinstance(e, RendererUnavailableError):
+            logger.warning("Background card render unavailable: %s: %s", key, e)
+        elif e is not None:
+            logger.error("Background card task failed: %s", key, exc_info=e)
+
+    async def _wait_background(self, key: str) -> None:
+        task = self._background.get(key)
+        if task is None:
+            return
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            pass
 
     def _ensure_query_result(self, payload: object) -> QueryResult:
         if isinstance(payload, QueryResult):
@@ -267,6 +986,9 @@ class CardService:
             return QueryResult(type="", key="", title="", data=payload)
         return QueryResult(type="", key="", title="", data={"payload": payload})
 
+    def _uses_native_png(self, template: str) -> bool:
+        return self.loader.template_meta(template).get("png_engine") == "native"
+
     def _load_png_render_cfg_optional(self, template: str, qr: QueryResult) -> dict[str, Any]:
         """
         png 渲染配置来源：尝试用 json 模板渲染出配置 dict。
@@ -284,12 +1006,64 @@ class CardService:
             return {}
         return payload if isinstance(payload, dict) else {}
 
+    def _prepare_revision_dir(self, out_dir: Path) -> None:
+        """
+        首次创建某个版本目录时，清理同一 payload 下其他（旧）模板版本的产物。
+        只影响当前模板的这个 payload，不做全量清理。只在 IO 线程池中调用。
+        """
+        if out_dir.exists():
+            return
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        for sibling in out_dir.parent.iterdir():
+            if sibling == out_dir:
+                continue
+            if sibling.is_dir():
+                shutil.rmtree(sibling, ignore_errors=True)
+                self.manifest.discard_tree(sibling)
+            elif sibling.name.startswith("artifact."):
+                # 引入版本目录之前的旧布局
+                sibling.unlink(missing_ok=True)
+                self.manifest.discard(sibling)
+
     async def _atomic_write_text(self, path: Path, content: str, *, encoding: str = "utf-8") -> None:
-        tmp = path.with_suffix(path.suffix + ".tmp")
-        tmp.write_text(content, encoding=encoding)
-        os.replace(tmp, path)
+        # 大卡片的编码本身也不便宜，和写入一起放到 IO 线程池
+        await self._run_blocking(self._atomic_write_sync, path, content, encoding)
 
     async def _atomic_write_bytes(self, path: Path, content: bytes) -> None:
+        await self._run_blocking(self._atomic_write_sync, path, content)
+
+    def _atomic_write_sync(self, path: Path, content: bytes | str, encoding: str = "utf-8") -> None:
+        """
+        tmp 写入 + os.replace 原子替换；开启 fsync 时同时刷文件与目录项，保证掉电后不会留下半截产物。
+        文本产物（html/txt/json/svg）同时写入 .gz/.br 预压缩副本，且先于主文件落盘，
+        主文件可见时副本一定已就绪。只在 IO 线程池中调用。
+        content 为 str 时在这里按 encoding 编码。
+        """
+        if isinstance(content, str):
+            content = content.encode(encoding)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if path.suffix in PRECOMPRESS_SUFFIXES:
+            for suffix, data in _precompress(content):
+                self._replace_file(path.with_name(path.name + suffix), data)
+        self._replace_file(path, content)
+
+        if self._fsync and hasattr(os, "O_DIRECTORY"):
+            fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+        self.manifest.maybe_save()
+
+    def _replace_file(self, path: Path, content: bytes) -> None:
         tmp = path.with_suffix(path.suffix + ".tmp")
-        tmp.write_bytes(content)
+        with open(tmp, "wb") as f:
+            f.write(content)
+            if self._fsync:
+                f.flush()
+                os.fsync(f.fileno())
         os.replace(tmp, path)
+        self.manifest.record(path, len(content), os.stat(path).st_mtime_ns, content_etag(content))
@@ -14,6 +14,14 @@ class Config:
     ResourcePath: Path
     GameDataRepo: Optional[str] = None
     BaseUrl: Optional[str] = None
+    DevMode: bool = False
+    """开发模式：模板文件改动后自动重新编译"""
+    OptimizePng: bool = False
+    """落盘前对 PNG 卡片做无损压缩（在进程池中执行）"""
+    FsyncCards: bool = False
+    """卡片产物落盘时 fsync 文件与目录项（掉电安全，写入更慢）"""
+    CardFont: Optional[str] = None
+    """原生 PNG 引擎的默认中文字体路径；不配置时依次尝试常见系统字体（Docker 镜像内为 wqy-zenhei）"""
 
 def load_from_disk()-> Config:
 
@@ -21,6 +29,10 @@ def load_from_disk()-> Config:
     ResourcePath = None
     GameDataRepo = None
     BaseUrl = None
+    DevMode = False
+    OptimizePng = False
+    FsyncCards = False
+    CardFont = None
 
     # 按照以下路径顺序寻找config.json文件
     # 1. 当前工作目录
@@ -46,6 +58,10 @@ def load_from_disk()-> Config:
 
                 GameDataRepo = config.get('GameDataRepo', None)
                 BaseUrl = config.get('BaseUrl', None)
+                DevMode = bool(config.get('DevMode', False))
+                OptimizePng = bool(config.get('OptimizePng', False))
+                FsyncCards = bool(config.get('FsyncCards', False))
+                CardFont = config.get('CardFont', None) or None
 
                 break
 
@@ -57,7 +73,11 @@ def load_from_disk()-> Config:
         ProjectRoot=ProjectRoot,
         ResourcePath=ResourcePath,
         GameDataRepo=GameDataRepo,
-        BaseUrl=BaseUrl
+        BaseUrl=BaseUrl,
+        DevMode=DevMode,
+        OptimizePng=OptimizePng,
+        FsyncCards=FsyncCards,
+        CardFont=CardFont,
     )
 
 
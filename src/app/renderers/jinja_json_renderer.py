@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import json
-
 from src.app.renderers.types import RenderOutput
 from src.app.renderers.jinja_template_loader import JinjaTemplateLoader
 from src.app.renderers.types import Renderer
 from src.domain.types import QueryResult
+from src.helpers import json_codec
 
 
 class JinjaJsonRenderer(Renderer):
@@ -20,7 +19,7 @@ class JinjaJsonRenderer(Renderer):
             kind="json", template_name=template_name, ext="json", ctx=ctx
         ).strip()
 
-        payload = json.loads(rendered)
+        payload = json_codec.loads(rendered)
         return RenderOutput(
             mime="application/json; charset=utf-8",
             payload=payload,
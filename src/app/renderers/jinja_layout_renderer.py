@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from src.app.renderers.types import RenderOutput
+from src.app.renderers.jinja_template_loader import JinjaTemplateLoader
+from src.app.renderers.types import Renderer
+from src.domain.types import QueryResult
+from src.helpers import json_codec
+
+
+class JinjaLayoutRenderer(Renderer):
+    """渲染 <template>.layout.json.j2，得到 NativePNGTransformer 使用的布局描述 dict。"""
+
+    def __init__(self, loader: JinjaTemplateLoader):
+        self.loader = loader
+        self.kind = "layout"
+
+    def render(self, template_name: str, result: QueryResult) -> RenderOutput:
+        ctx = dict(result.data or {})
+        ctx["r"] = result
+        rendered = self.loader.render_by_kind(
+            kind="layout", template_name=template_name, ext="layout.json", ctx=ctx
+        ).strip()
+
+        payload = json_codec.loads(rendered)
+        if not isinstance(payload, dict):
+            raise ValueError(f"Layout of template {template_name} must be a JSON object")
+        return RenderOutput(
+            mime="application/json; charset=utf-8",
+            payload=payload,
+        )
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from src.app.renderers.types import Renderer, RenderOutput
+from src.app.renderers.jinja_template_loader import JinjaTemplateLoader
+from src.domain.types import QueryResult
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JinjaSvgRenderer(Renderer):
+    """渲染 <template>.svg.j2（自动转义），输出可直接展示的矢量卡片文本。"""
+
+    def __init__(self, loader: JinjaTemplateLoader):
+        self.loader = loader
+        self.kind = "svg"
+
+    def render(self, template_name: str, result: QueryResult) -> RenderOutput:
+        ctx = dict(result.data or {})
+        ctx["r"] = result
+        text = self.loader.render_by_kind(
+            kind="svg", template_name=template_name, ext="svg", ctx=ctx
+        )
+        return RenderOutput(mime="image/svg+xml", payload=text.strip())
@@ -1,37 +1,270 @@
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from pathlib import Path
+
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    TemplateNotFound,
+    meta,
+    select_autoescape,
+)
 import logging
 
+from src.helpers import json_codec
+
 logger = logging.getLogger(__name__)
 
+# dev 模式下检查模板目录变化的最小间隔（秒）
+_RELOAD_CHECK_INTERVAL = 1.0
+
+# 模板元数据文件：<template_root>/<template_name>/template.json
+TEMPLATE_META_FILE = "template.json"
+
+# 模板/样式中对 template_root 下兄弟资源目录的引用，例如 src="../rank/1.png"、url(../classify/x.png)
+_SIBLING_ASSET_REF = re.compile(r"(?<![\w.])\.\./([\w\-]+)/")
+# 会去查找兄弟目录引用的文本文件
+_ASSET_REF_SUFFIXES = (".j2", ".css", ".json", ".svg", ".html")
+
+
 class JinjaTemplateLoader:
-    def __init__(self, template_root: str):
+    """
+    模板注册表：
+    - 启动时把 template_root 下所有 *.j2 编译一遍（配合 bytecode cache，重启后无需重新编译）
+    - (kind, template_name, ext) -> Template 的解析结果做记忆化，渲染时不再逐个尝试候选路径
+    - auto_reload（dev 模式）下模板目录有改动时清空记忆并重新编译；
+      检查要遍历整个模板目录，只在渲染线程（get_by_kind）或调用方显式调用 check_reload() 时进行，
+      template_hash / template_meta 可以直接在事件循环上调用
+    """
+
+    def __init__(
+        self,
+        template_root: str,
+        *,
+        bytecode_cache_dir: str | Path | None = None,
+        auto_reload: bool = False,
+    ):
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_dir))
+
+        self.template_root = Path(template_root)
+        self.auto_reload = auto_reload
         self.env = Environment(
             loader=FileSystemLoader(template_root),
-            autoescape=False,
+            # svg 是 XML：只对 *.svg.j2 开启自动转义，其他格式保持原样输出
+            autoescape=select_autoescape(enabled_extensions=("svg.j2",), default_for_string=False, default=False),
             trim_blocks=True,
             lstrip_blocks=True,
+            auto_reload=auto_reload,
+            cache_size=-1,
+            bytecode_cache=bytecode_cache,
         )
 
+        self._resolved: dict[tuple[str, str, str], Template | None] = {}
+        self._hashes: dict[str, str] = {}
+        self._meta: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._signature: tuple = ()
+        self._last_check = 0.0
+
+        self.precompile()
+
+    def precompile(self) -> int:
+        """编译全部模板并重置解析记忆，返回编译成功的模板数。"""
+        count = 0
+        for relpath in self.env.list_templates(extensions=["j2"]):
+            try:
+                self.env.get_template(relpath)
+                count += 1
+            except Exception:
+                logger.exception("Failed to compile template: %s", relpath)
+
+        self._resolved = {}
+        self._meta = {}
+        self._signature = self._scan_signature()
+        self._last_check = time.monotonic()
+
+        # 预先算好每个模板目录的版本号，之后取版本号只是一次 dict 查询
+        hashes: dict[str, str] = {}
+        if self.template_root.is_dir():
+            for folder in self.template_root.iterdir():
+                if folder.is_dir():
+                    hashes[folder.name] = self._compute_hash(folder.name)
+        self._hashes = hashes
+
+        logger.info("Precompiled %d templates under %s", count, self.template_root)
+        return count
+
     def render_by_kind(self, *, kind: str, template_name: str, ext: str, ctx: dict) -> str:
-        relpath = self.resolve_template(kind=kind, template_name=template_name, ext=ext)
-        return self.env.get_template(relpath).render(**ctx)
+        return self.get_by_kind(kind=kind, template_name=template_name, ext=ext).render(**ctx)
+
+    def get_by_kind(self, *, kind: str, template_name: str, ext: str) -> Template:
+        self.check_reload()
+
+        key = (kind, template_name, ext)
+        if key not in self._resolved:
+            self._resolved[key] = self._lookup(kind=kind, template_name=template_name, ext=ext)
 
+        tpl = self._resolved[key]
+        if tpl is None:
+            raise TemplateNotFound(f"None of templates found: {self._candidates(kind, template_name, ext)}")
+        return tpl
 
     def resolve_template(self, *, kind: str, template_name: str, ext: str) -> str:
         """
         返回第一个存在的模板路径；都不存在则抛 TemplateNotFound(列出所有候选)。
         """
-        candidates = [
+        return self.get_by_kind(kind=kind, template_name=template_name, ext=ext).name
+
+    def template_hash(self, template_name: str) -> str:
+        """
+        模板内容版本号（sha256 前 12 位），覆盖：
+        - <template_root>/<template_name>/ 目录下所有文件（各格式的 j2、css、字体、图片等）
+        - 其他位置上按候选规则命中的 <template_name>.*.j2
+        - 上述模板通过 include/import/extends 引用到的模板（递归）
+        - 上述文件以 ../<目录>/ 引用到的 template_root 下兄弟资源目录（如 ../rank、../classify）的全部文件
+        任一文件内容变化，该模板的所有产物都会换到新的版本目录下。
+        dev 模式下不在这里检查模板目录的改动：调用方先（在线程池中）调用 check_reload()。
+        """
+        cached = self._hashes.get(template_name)
+        if cached is not None:
+            return cached
+
+        digest = self._compute_hash(template_name)
+        self._hashes[template_name] = digest
+        return digest
+
+    def template_meta(self, template_name: str) -> dict:
+        """
+        模板元数据（template.json），例如 {"png_engine": "native"}；文件缺失或无效时返回 {}。
+        与 template_hash 相同，不检查模板目录的改动。
+        """
+        cached = self._meta.get(template_name)
+        if cached is not None:
+            return cached
+
+        meta_data: dict = {}
+        path = self.template_root / template_name / TEMPLATE_META_FILE
+        if path.is_file():
+            try:
+                loaded = json_codec.loads(path.read_bytes())
+                meta_data = loaded if isinstance(loaded, dict) else {}
+            except Exception:
+                logger.exception("Invalid template meta: %s", path)
+        self._meta[template_name] = meta_data
+        return meta_data
+
+    def reload_due(self) -> bool:
+        """dev 模式下距上次检查已超过间隔，需要调用一次 check_reload()。只比较时间，不触碰磁盘。"""
+        return self.auto_reload and time.monotonic() - self._last_check >= _RELOAD_CHECK_INTERVAL
+
+    def check_reload(self) -> None:
+        """
+        dev 模式：模板目录有改动（文件增删或 mtime 变化）时重新编译。
+        要遍历整个模板目录，是阻塞调用；同一间隔内的重复调用直接返回。
+        """
+        if not self.reload_due():
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_check < _RELOAD_CHECK_INTERVAL:
+                return
+            self._last_check = now
+            signature = self._scan_signature()
+            if signature != self._signature:
+                logger.info("Template directory changed, recompiling templates")
+                self.precompile()
+
+    # ---------- internal ----------
+
+    def _compute_hash(self, template_name: str) -> str:
+        files = self._template_files(template_name)
+        h = hashlib.sha256()
+        for rel in sorted(files):
+            h.update(rel.encode("utf-8"))
+            h.update(b"\0")
+            h.update((self.template_root / rel).read_bytes())
+            h.update(b"\0")
+
+        return h.hexdigest()[:12]
+
+    def _template_files(self, template_name: str) -> set[str]:
+        root = self.template_root
+        files: set[str] = set()
+
+        folder = root / template_name
+        if folder.is_dir():
+            files.update(str(p.relative_to(root).as_posix()) for p in folder.rglob("*") if p.is_file())
+        files.update(str(p.relative_to(root).as_posix()) for p in root.glob(f"{template_name}.*.j2"))
+        files.update(str(p.relative_to(root).as_posix()) for p in root.glob(f"*/{template_name}.*.j2"))
+
+        # 递归补齐被引用的模板
+        pending = [f for f in files if f.endswith(".j2")]
+        while pending:
+            rel = pending.pop()
+            try:
+                source = (root / rel).read_text(encoding="utf-8")
+                refs = meta.find_referenced_templates(self.env.parse(source))
+            except Exception:
+                logger.exception("Failed to parse template: %s", rel)
+                continue
+            for ref in refs:
+                # 动态引用（变量拼接的模板名）无法静态解析，返回 None
+                if ref and ref not in files and (root / ref).is_file():
+                    files.add(ref)
+                    pending.append(ref)
+
+        # 兄弟资源目录：渲染时从 template_root 读取（HTMLToPNGTransformer 的 asset_root），同样影响产物
+        for asset_dir in sorted(self._sibling_asset_dirs(files, exclude=template_name)):
+            files.update(
+                str(p.relative_to(root).as_posix()) for p in (root / asset_dir).rglob("*") if p.is_file()
+            )
+
+        return files
+
+    def _sibling_asset_dirs(self, files: set[str], *, exclude: str) -> set[str]:
+        dirs: set[str] = set()
+        for rel in files:
+            if not rel.endswith(_ASSET_REF_SUFFIXES):
+                continue
+            try:
+                source = (self.template_root / rel).read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            dirs.update(_SIBLING_ASSET_REF.findall(source))
+        dirs.discard(exclude)
+        return {d for d in dirs if (self.template_root / d).is_dir()}
+
+    @staticmethod
+    def _candidates(kind: str, template_name: str, ext: str) -> list[str]:
+        return [
             f"{kind}/{template_name}.{ext}.j2",
             f"{template_name}.{ext}.j2",
             f"{template_name}/{template_name}.{ext}.j2",
         ]
 
-        for relpath in candidates:
+    def _lookup(self, *, kind: str, template_name: str, ext: str) -> Template | None:
+        for relpath in self._candidates(kind, template_name, ext):
             try:
-                self.env.get_template(relpath)
-                return relpath
+                return self.env.get_template(relpath)
             except TemplateNotFound:
                 continue
-            
-        raise TemplateNotFound(f"None of templates found: {candidates}")
\ No newline at end of file
+        return None
+
+    def _scan_signature(self) -> tuple:
+        if not self.template_root.exists():
+            return ()
+        return tuple(sorted(
+            (str(p.relative_to(self.template_root)), p.stat().st_mtime_ns)
+            for p in self.template_root.rglob("*")
+            if p.is_file()
+        ))
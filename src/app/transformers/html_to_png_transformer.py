@@ -1,19 +1,84 @@
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import asyncio
+import logging
+import mimetypes
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote, urlsplit
 
 from src.app.transformers.types import Transformer
 
+logger = logging.getLogger(__name__)
+
+# 渲染页面所在的虚拟站点：文档和模板资源都由 route 拦截后从内存返回，不走网络
+VIRTUAL_ORIGIN = "http://cards.local"
+
+# 模板在页面就绪后设置的信号（见 operator_info.html.j2 末尾的脚本）
+READY_SIGNAL = "__cardReady"
+
+# 各阶段默认期限（毫秒）
+DEFAULT_LAUNCH_TIMEOUT_MS = 30000
+DEFAULT_LOAD_TIMEOUT_MS = 15000
+DEFAULT_SCREENSHOT_TIMEOUT_MS = 10000
+CLOSE_TIMEOUT_SECONDS = 5
+
+
+class RenderTimeoutError(TimeoutError):
+    """某个渲染阶段（启动浏览器 / 加载 / 截图）超过期限。"""
+
+
+class BrowserCrashedError(RuntimeError):
+    """渲染过程中浏览器或页面崩溃。"""
+
+
+class TemplateAssetCache:
+    """
+    模板静态资源（css、字体、职业图标、立绘等）的内存缓存，按相对 asset_root 的路径索引。
+    不存在的资源也会记住（None），之后直接 404，不再访问磁盘。
+    memoize=False（dev 模式）时每次都读盘，改了 css 立即生效。
+    """
+
+    def __init__(self, asset_root: Path, *, memoize: bool = True):
+        self.asset_root = asset_root.resolve()
+        self.memoize = memoize
+        self._entries: dict[str, tuple[bytes, str] | None] = {}
+
+    def get(self, relpath: str) -> tuple[bytes, str] | None:
+        if self.memoize and relpath in self._entries:
+            return self._entries[relpath]
+
+        entry = None
+        target = (self.asset_root / relpath).resolve()
+        if target.is_relative_to(self.asset_root) and target.is_file():
+            mime = mimetypes.guess_type(target.name)[0] or "application/octet-stream"
+            entry = (target.read_bytes(), mime)
+        if self.memoize:
+            self._entries[relpath] = entry
+        return entry
+
+    def clear(self) -> None:
+        self._entries = {}
+
+
 class HTMLToPNGTransformer(Transformer):
     """
     使用 Playwright 把 HTML 字符串渲染为 PNG bytes。
 
+    - 浏览器常驻：首次渲染时启动，之后每次只新建 page
+    - 页面以 {VIRTUAL_ORIGIN}/{base_path}/index.html 打开，模板中的相对路径（font.css、../classify/xx.png）
+      由 route 拦截后从 asset_root 下的内存缓存返回
+    - 模板输出了就绪信号（window.__cardReady）时等待信号，而不是等待 networkidle
+
     cfg 常用字段（都可选）：
     - viewport: {"width": 900, "height": 520, "deviceScaleFactor": 2}
     - full_page: true/false
-    - wait_until: "load" | "domcontentloaded" | "networkidle"
+    - base_path: 资源相对路径的基准目录（CardService 传入模板名）
+    - selector: 只截取匹配的元素（元素裁剪截图），默认截取整个视口/页面
+    - wait_until: "load" | "domcontentloaded" | "networkidle"，默认 "load"
+    - ready_timeout_ms: 等待就绪信号的上限，默认 5000；超时后照常截图
+    - launch_timeout_ms / load_timeout_ms / screenshot_timeout_ms: 各阶段期限，超时抛 RenderTimeoutError
     - extra_wait_ms: 0..n
     - transparent: true/false
     - chromium_args: ["--font-render-hinting=medium", ...]  # 可选
@@ -23,42 +88,305 @@ class HTMLToPNGTransformer(Transformer):
     input_mime = "text/html"
     output_mime = "image/png"
 
+    def __init__(self, asset_root: Path | None = None, *, memoize_assets: bool = True):
+        self.assets: Optional[TemplateAssetCache] = (
+            TemplateAssetCache(asset_root, memoize=memoize_assets) if asset_root else None
+        )
+        self._playwright = None
+        self._browser = None
+        self._launch_key: tuple = ()
+        self._browser_lock = asyncio.Lock()
+        # 导出到 /rest/status 的计数
+        self.stats: Dict[str, int] = {"renders": 0, "errors": 0, "timeouts": 0, "crashes": 0, "recycles": 0}
+
     async def transform(self, *, input: Any, cfg: Dict[str, Any] | None = None) -> bytes:
         if not isinstance(input, str):
             raise TypeError(f"HTMLToPNGTransformer expects input=str, got {type(input)}")
 
-        cfg = cfg or {}
+        opts = self._options(cfg or {})
+
+        t0 = time.perf_counter()
+        browser = await self._get_browser(opts)
+        t_launch = time.perf_counter()
+
+        page = None
+        try:
+            page = await self._open_page(browser, opts, {"html": input})
+            png_bytes, (t_load, t_ready, t_shot) = await self._capture(page, input, opts)
+        except BaseException as e:
+            await self._on_failure(browser, page, e)
+            raise
+        finally:
+            await self._close_page(page)
+        self.stats["renders"] += 1
+
+        logger.info(
+            "html->png %s: browser=%.1fms load=%.1fms ready=%.1fms screenshot=%.1fms total=%.1fms",
+            opts["base_path"] or "-",
+            (t_launch - t0) * 1000,
+            (t_load - t_launch) * 1000,
+            (t_ready - t_load) * 1000,
+            (t_shot - t_ready) * 1000,
+            (t_shot - t0) * 1000,
+        )
+        return png_bytes
 
-        viewport = cfg.get("viewport") or {"width": 900, "height": 520}
-        full_page = bool(cfg.get("full_page", False))
-        wait_until = cfg.get("wait_until", "networkidle")
-        extra_wait_ms = int(cfg.get("extra_wait_ms", 0))
-        transparent = bool(cfg.get("transparent", False))
+    async def transform_many(
+        self,
+        *,
+        inputs: List[str],
+        cfg: Dict[str, Any] | None = None,
+    ) -> List[bytes | BaseException]:
+        """
+        批量渲染：同一组 cfg 的多张卡片复用一个 page，依次加载各自的 html 并截图。
+        返回值与 inputs 一一对应；单张失败时该位置为异常对象，不影响其余卡片
+        （失败后换一个新 page，避免残留状态影响后续卡片）。
 
-        chromium_args = cfg.get("chromium_args") or []
-        headless = cfg.get("headless", True)
+        cfg 额外字段：
+        - selector: 只截取该元素（如 "#template"），否则按 full_page/viewport 截图
+        """
+        opts = self._options(cfg or {})
+        t0 = time.perf_counter()
 
+        holder: Dict[str, str] = {"html": ""}
+        results: List[bytes | BaseException] = []
+        browser = None
+        page = None
         try:
-            from playwright.async_api import async_playwright
-        except Exception as e:
-            raise RuntimeError(
-                "Playwright 不可用，无法渲染 PNG。请安装 playwright 并执行 playwright install。"
-            ) from e
-
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=headless, args=chromium_args)
+            for html in inputs:
+                if not isinstance(html, str):
+                    results.append(TypeError(f"HTMLToPNGTransformer expects input=str, got {type(html)}"))
+                    continue
+                holder["html"] = html
+                try:
+                    if page is None:
+                        browser = await self._get_browser(opts)
+                        page = await self._open_page(browser, opts, holder)
+                    png_bytes, _ = await self._capture(page, html, opts)
+                    results.append(png_bytes)
+                    self.stats["renders"] += 1
+                except Exception as e:
+                    logger.warning("Batch card render failed: %s", e)
+                    results.append(e)
+                    await self._on_failure(browser, page, e)
+                    # 换一个新 page（浏览器被回收时下次循环会重新启动）
+                    await self._close_page(page)
+                    page = None
+        finally:
+            await self._close_page(page)
+
+        ok = sum(1 for r in results if not isinstance(r, BaseException))
+        elapsed = (time.perf_counter() - t0) * 1000
+        logger.info(
+            "html->png batch %s: %d/%d ok in %.1fms (%.1fms/card)",
+            opts["base_path"] or "-",
+            ok,
+            len(inputs),
+            elapsed,
+            elapsed / max(1, len(inputs)),
+        )
+        return results
+
+    async def close(self) -> None:
+        async with self._browser_lock:
+            await self._shutdown()
+
+    # ---------- internal ----------
+
+    @staticmethod
+    def _options(cfg: Dict[str, Any]) -> Dict[str, Any]:
+        base_path = str(cfg.get("base_path") or "").strip("/")
+        return {
+            "viewport": cfg.get("viewport") or {"width": 900, "height": 520},
+            "full_page": bool(cfg.get("full_page", False)),
+            "selector": cfg.get("selector") or None,
+            "base_path": base_path,
+            "doc_url": f"{VIRTUAL_ORIGIN}/{base_path}/index.html" if base_path else f"{VIRTUAL_ORIGIN}/index.html",
+            "wait_until": cfg.get("wait_until", "load"),
+            "ready_timeout_ms": int(cfg.get("ready_timeout_ms", 5000)),
+            "launch_timeout_ms": int(cfg.get("launch_timeout_ms", DEFAULT_LAUNCH_TIMEOUT_MS)),
+            "load_timeout_ms": int(cfg.get("load_timeout_ms", DEFAULT_LOAD_TIMEOUT_MS)),
+            "screenshot_timeout_ms": int(cfg.get("screenshot_timeout_ms", DEFAULT_SCREENSHOT_TIMEOUT_MS)),
+            "extra_wait_ms": int(cfg.get("extra_wait_ms", 0)),
+            "transparent": bool(cfg.get("transparent", False)),
+            "chromium_args": cfg.get("chromium_args") or [],
+            "headless": cfg.get("headless", True),
+        }
+
+    async def _capture(self, page, html: str, opts: Dict[str, Any]) -> tuple[bytes, tuple[float, float, float]]:
+        """在已挂好 route 的 page 上加载文档、等待就绪并截图；返回 (png, (load, ready, shot) 时间点)。"""
+        await self._stage(
+            "load",
+            page.goto(opts["doc_url"], wait_until=opts["wait_until"], timeout=opts["load_timeout_ms"]),
+            opts["load_timeout_ms"],
+        )
+        t_load = time.perf_counter()
+
+        if READY_SIGNAL in html:
             try:
-                page = await browser.new_page(viewport=viewport)  # type: ignore
-                await page.set_content(input, wait_until=wait_until)
+                await self._stage(
+                    "ready",
+                    page.wait_for_function(f"window.{READY_SIGNAL} === true", timeout=opts["ready_timeout_ms"]),
+                    opts["ready_timeout_ms"],
+                )
+            except Exception:
+                logger.warning(
+                    "Card ready signal not received within %dms, capturing anyway", opts["ready_timeout_ms"]
+                )
+        t_ready = time.perf_counter()
+
+        if opts["extra_wait_ms"] > 0:
+            await page.wait_for_timeout(opts["extra_wait_ms"])
+
+        if opts["selector"]:
+            shot = page.locator(opts["selector"]).first.screenshot(
+                type="png",
+                omit_background=opts["transparent"],
+                timeout=opts["screenshot_timeout_ms"],
+            )
+        else:
+            shot = page.screenshot(
+                full_page=opts["full_page"],
+                type="png",
+                omit_background=opts["transparent"],
+                timeout=opts["screenshot_timeout_ms"],
+            )
+        png_bytes = await self._stage("screenshot", shot, opts["screenshot_timeout_ms"])
+        return png_bytes, (t_load, t_ready, time.perf_counter())
+
+    def _make_route_handler(self, doc_url: str, holder: Dict[str, str]):
+        """holder["html"] 为当前要加载的文档；批量渲染时逐张替换。"""
+        async def handler(route):
+            url = route.request.url
+            if url == doc_url:
+                await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=holder["html"])
+                return
+
+            entry = None
+            if self.assets is not None:
+                relpath = unquote(urlsplit(url).path).lstrip("/")
+                entry = self.assets.get(relpath)
+            if entry is None:
+                await route.fulfill(status=404, body="")
+                return
+
+            body, mime = entry
+            await route.fulfill(status=200, content_type=mime, body=body)
+
+        return handler
+
+    async def _stage(self, name: str, awaitable, timeout_ms: int):
+        """
+        给单个阶段加期限。Playwright 自身的 timeout 参数在浏览器卡死时不一定生效，
+        这里再用 asyncio.timeout 兜底，超时即取消等待。
+        """
+        try:
+            async with asyncio.timeout(timeout_ms / 1000):
+                return await awaitable
+        except TimeoutError as e:
+            raise RenderTimeoutError(f"{name} timed out after {timeout_ms}ms") from e
+
+    async def _open_page(self, browser, opts: Dict[str, Any], holder: Dict[str, str]):
+        page = await self._stage("new_page", browser.new_page(viewport=opts["viewport"]), opts["launch_timeout_ms"])
+        page.on("crash", lambda _page: logger.error("Render page crashed"))
+        await page.route(f"{VIRTUAL_ORIGIN}/**", self._make_route_handler(opts["doc_url"], holder))
+        return page
+
+    async def _close_page(self, page) -> None:
+        if page is None:
+            return
+        try:
+            async with asyncio.timeout(CLOSE_TIMEOUT_SECONDS):
+                await page.close()
+        except Exception:
+            # 页面已随浏览器一起失效或卡死，交给回收逻辑处理
+            pass
+
+    async def _on_failure(self, browser, page, exc: BaseException) -> None:
+        """统计失败；超时或崩溃时回收浏览器，下一次渲染重新启动。"""
+        if isinstance(exc, asyncio.CancelledError):
+            return
+
+        crashed = browser is not None and not browser.is_connected()
+        if page is not None and not crashed:
+            try:
+                crashed = page.is_closed()
+            except Exception:
+                crashed = True
 
-                if extra_wait_ms > 0:
-                    await page.wait_for_timeout(extra_wait_ms)
+        if isinstance(exc, RenderTimeoutError):
+            self.stats["timeouts"] += 1
+        elif crashed:
+            self.stats["crashes"] += 1
+        else:
+            self.stats["errors"] += 1
 
-                png_bytes = await page.screenshot(
-                    full_page=full_page,
-                    type="png",
-                    omit_background=transparent,
+        if isinstance(exc, RenderTimeoutError) or crashed:
+            await self._recycle(browser, reason="timeout" if isinstance(exc, RenderTimeoutError) else "crash")
+
+    async def _recycle(self, browser, *, reason: str) -> None:
+        async with self._browser_lock:
+            # 并发失败时只回收一次：浏览器已经换过就不再动新的
+            if browser is not None and self._browser is not browser:
+                return
+            logger.warning("Recycling render browser (%s)", reason)
+            self.stats["recycles"] += 1
+            await self._shutdown()
+
+    def _usable(self, launch_key: tuple) -> bool:
+        return self._browser is not None and self._launch_key == launch_key and self._browser.is_connected()
+
+    async def _get_browser(self, opts: Dict[str, Any]):
+        launch_key = (bool(opts["headless"]), tuple(opts["chromium_args"]))
+        if self._usable(launch_key):
+            return self._browser
+
+        async with self._browser_lock:
+            if self._usable(launch_key):
+                return self._browser
+
+            await self._shutdown()
+
+            try:
+                from playwright.async_api import async_playwright
+            except Exception as e:
+                raise RuntimeError(
+                    "Playwright 不可用，无法渲染 PNG。请安装 playwright 并执行 playwright install。"
+                ) from e
+
+            async def launch():
+                self._playwright = await async_playwright().start()
+                return await self._playwright.chromium.launch(
+                    headless=opts["headless"],
+                    args=list(opts["chromium_args"]),
+                    timeout=opts["launch_timeout_ms"],
                 )
-                return png_bytes
-            finally:
-                await browser.close()
+
+            try:
+                browser = await self._stage("launch", launch(), opts["launch_timeout_ms"])
+            except BaseException:
+                await self._shutdown()
+                raise
+
+            browser.on("disconnected", lambda _b: logger.warning("Render browser disconnected"))
+            self._browser = browser
+            self._launch_key = launch_key
+            return browser
+
+    async def _shutdown(self) -> None:
+        browser, pw = self._browser, self._playwright
+        self._browser = None
+        self._playwright = None
+        try:
+            if browser is not None:
+                async with asyncio.timeout(CLOSE_TIMEOUT_SECONDS):
+                    await browser.close()
+        except Exception:
+            logger.exception("Failed to close browser")
+        try:
+            if pw is not None:
+                # stop() 会结束驱动进程，浏览器卡死时也能把它带走
+                async with asyncio.timeout(CLOSE_TIMEOUT_SECONDS):
+                    await pw.stop()
+        except Exception:
+            logger.exception("Failed to stop playwright")
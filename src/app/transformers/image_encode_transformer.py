@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import io
+from typing import Any, Dict
+
+from src.app.transformers.types import Transformer
+
+# format -> (Pillow 格式名, MIME)
+IMAGE_FORMATS: Dict[str, tuple[str, str]] = {
+    "webp": ("WEBP", "image/webp"),
+    "jpg": ("JPEG", "image/jpeg"),
+}
+
+DEFAULT_QUALITY = 85
+
+
+class ImageEncodeTransformer(Transformer):
+    """
+    截图后的转码阶段：PNG bytes -> webp / jpg bytes（Pillow）。
+
+    cfg 字段：
+    - format: "webp" | "jpg"（必填）
+    - quality: 1..100，默认 85
+    - lossless: webp 无损模式，默认 false
+    - background: jpg 不支持透明，透明区域填充色，默认 "#ffffff"
+    """
+
+    input_mime = "image/png"
+    output_mime = None  # 由 cfg.format 决定
+
+    async def transform(self, *, input: Any, cfg: Dict[str, Any] | None = None) -> bytes:
+        if not isinstance(input, (bytes, bytearray)):
+            raise TypeError(f"ImageEncodeTransformer expects input=bytes, got {type(input)}")
+        cfg = cfg or {}
+        fmt = str(cfg.get("format") or "").lower()
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {fmt}. Must be one of {tuple(IMAGE_FORMATS)}")
+        return await asyncio.to_thread(self._encode, bytes(input), fmt, cfg)
+
+    def _encode(self, data: bytes, fmt: str, cfg: Dict[str, Any]) -> bytes:
+        try:
+            from PIL import Image
+        except Exception as e:
+            raise RuntimeError("Pillow 不可用，无法输出 webp/jpg。请安装 pillow。") from e
+
+        pil_format, _ = IMAGE_FORMATS[fmt]
+        quality = int(cfg.get("quality", DEFAULT_QUALITY))
+
+        with Image.open(io.BytesIO(data)) as img:
+            buf = io.BytesIO()
+            if pil_format == "JPEG":
+                if img.mode in ("RGBA", "LA", "P"):
+                    rgba = img.convert("RGBA")
+                    bg = Image.new("RGB", rgba.size, cfg.get("background", "#ffffff"))
+                    bg.paste(rgba, mask=rgba.getchannel("A"))
+                    img_out = bg
+                else:
+                    img_out = img.convert("RGB")
+                img_out.save(buf, format="JPEG", quality=quality, optimize=True, progressive=True)
+            else:
+                img.save(buf, format="WEBP", quality=quality, lossless=bool(cfg.get("lossless", False)), method=4)
+            return buf.getvalue()
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import io
+import logging
+import re
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.app.transformers.types import Transformer
+
+logger = logging.getLogger(__name__)
+
+# 没有在布局/配置中指定字体时依次尝试的系统中文字体
+# wqy-zenhei 由 `playwright install --with-deps` 装入 Docker 镜像
+FALLBACK_FONTS = [
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "C:/Windows/Fonts/msyh.ttc",
+]
+
+# 换行切分：连续的字母数字作为一个整体，其余（中文、标点、空白）逐字
+_TOKEN_RE = re.compile(r"[A-Za-z0-9.%+\-]+|\s|.")
+
+# (高度, 绘制函数(draw, image, x, y))
+Measured = Tuple[int, Callable[[Any, Any, int, int], None]]
+
+
+@functools.lru_cache(maxsize=64)
+def _load_font(path: str, size: int, default_font: str = ""):
+    """
+    依次尝试：布局指定的字体 -> 配置的默认字体（Config.CardFont）-> FALLBACK_FONTS。
+    都不可用时退回 Pillow 内置字体并记录错误：内置字体没有中文字形，中文会渲染成方块。
+    """
+    from PIL import ImageFont
+
+    for candidate in (path, default_font):
+        if not candidate:
+            continue
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            logger.warning("Font not loadable: %s", candidate)
+    for candidate in FALLBACK_FONTS:
+        if Path(candidate).is_file():
+            try:
+                return ImageFont.truetype(candidate, size)
+            except OSError:
+                continue
+    logger.error(
+        "No CJK font found for native PNG rendering (tried %s); Chinese text will not render. "
+        "Set CardFont in config.json or install fonts-wqy-zenhei.",
+        ", ".join(c for c in (path, default_font, *FALLBACK_FONTS) if c),
+    )
+    return ImageFont.load_default(size=size)
+
+
+class NativePNGTransformer(Transformer):
+    """
+    不启动浏览器，用 Pillow 把受限的布局描述直接栅格化为 PNG，适合以文字为主的卡片。
+
+    input 为布局 dict（通常由 <template>.layout.json.j2 渲染得到）：
+    {
+      "width": 720, "padding": 24, "gap": 10,
+      "background": "#1e1e1e", "color": "#f0f0f0",
+      "font": "fonts/xxx.ttf",            # 相对 asset_root，可选
+      "blocks": [
+        {"type": "text", "text": "...", "size": 28, "color": "#fff", "align": "left|center"},
+        {"type": "table", "rows": [["技力", "20/40"]], "size": 20, "columns": [0.3, 0.7]},
+        {"type": "range", "text": "　□\\n■□\\n", "cell": 18},   # build_range 的输出
+        {"type": "icon", "src": "classify/pioneer.png", "size": 48},
+        {"type": "divider"}, {"type": "spacer", "height": 12}
+      ]
+    }
+
+    cfg（与 png 渲染配置共用，都可选）：
+    - viewport: {"width": 720, "deviceScaleFactor": 2}  # width 覆盖布局宽度，deviceScaleFactor 为整体缩放
+    - transparent: true/false
+
+    font 为默认字体路径（Config.CardFont），布局没有指定字体时使用。
+    executor 为栅格化所在的线程池（CardService 传入自己的 IO 线程池）；为 None 时使用默认线程池。
+    """
+
+    input_mime = "application/json"
+    output_mime = "image/png"
+
+    def __init__(
+        self,
+        asset_root: Path | None = None,
+        *,
+        font: str | None = None,
+        executor: Executor | None = None,
+    ):
+        self.asset_root = asset_root.resolve() if asset_root else None
+        self.font = str(font or "")
+        self.executor = executor
+
+    async def transform(self, *, input: Any, cfg: Dict[str, Any] | None = None) -> bytes:
+        if not isinstance(input, dict):
+            raise TypeError(f"NativePNGTransformer expects input=dict, got {type(input)}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._render, input, cfg or {})
+
+    # ---------- internal ----------
+
+    def _render(self, layout: dict, cfg: dict) -> bytes:
+        try:
+            from PIL import Image, ImageDraw
+        except Exception as e:
+            raise RuntimeError("Pillow 不可用，无法使用原生渲染。请安装 pillow。") from e
+
+        viewport = cfg.get("viewport") or {}
+        scale = float(viewport.get("deviceScaleFactor") or layout.get("scale") or 1)
+
+        def px(v: float) -> int:
+            return int(round(v * scale))
+
+        width = px(viewport.get("width") or layout.get("width") or 720)
+        padding = px(layout.get("padding", 24))
+        gap = px(layout.get("gap", 10))
+        color = layout.get("color", "#f0f0f0")
+        font_path = self._asset_path(layout.get("font") or "")
+        content_width = max(1, width - padding * 2)
+
+        measured: List[Measured] = []
+        for block in layout.get("blocks") or []:
+            m = self._measure(block, content_width=content_width, px=px, color=color, font_path=font_path)
+            if m is not None:
+                measured.append(m)
+
+        height = padding * 2 + sum(h for h, _ in measured) + gap * max(0, len(measured) - 1)
+
+        transparent = bool(cfg.get("transparent", False))
+        background = (0, 0, 0, 0) if transparent else layout.get("background", "#1e1e1e")
+        image = Image.new("RGBA", (width, max(1, height)), background)
+        draw = ImageDraw.Draw(image)
+
+        y = padding
+        for h, paint in measured:
+            paint(draw, image, padding, y)
+            y += h + gap
+
+        buf = io.BytesIO()
+        image.save(buf, format="PNG")
+        return buf.getvalue()
+
+    def _measure(self, block: dict, *, content_width: int, px, color: str, font_path: str) -> Measured | None:
+        kind = block.get("type", "text")
+
+        if kind == "spacer":
+            h = px(block.get("height", 12))
+            return h, lambda draw, image, x, y: None
+
+        if kind == "divider":
+            thickness = max(1, px(block.get("thickness", 1)))
+            line_color = block.get("color", "#555555")
+
+            def paint_divider(draw, image, x, y):
+                draw.rectangle([x, y, x + content_width, y + thickness - 1], fill=line_color)
+
+            return thickness, paint_divider
+
+        if kind == "text":
+            return self._measure_text(
+                str(block.get("text", "")),
+                width=content_width,
+                font=_load_font(self._asset_path(block.get("font") or "") or font_path, px(block.get("size", 20)), self.font),
+                color=block.get("color", color),
+                align=block.get("align", "left"),
+                line_height=float(block.get("line_height", 1.4)),
+            )
+
+        if kind == "table":
+            return self._measure_table(block, content_width=content_width, px=px, color=color, font_path=font_path)
+
+        if kind == "range":
+            return self._measure_range(block, px=px, color=color)
+
+        if kind == "icon":
+            return self._measure_icon(block, px=px)
+
+        logger.warning("Unknown layout block type: %s", kind)
+        return None
+
+    @staticmethod
+    def _wrap(text: str, font, width: int) -> List[str]:
+        lines: List[str] = []
+        for para in text.split("\n"):
+            line = ""
+            for token in _TOKEN_RE.findall(para):
+                candidate = line + token
+                if line and font.getlength(candidate) > width:
+                    lines.append(line.rstrip())
+                    line = token.lstrip()
+                else:
+                    line = candidate
+            lines.append(line)
+        return lines
+
+    def _measure_text(self, text: str, *, width: int, font, color: str, align: str, line_height: float) -> Measured:
+        lines = self._wrap(text, font, width)
+        step = int(round(font.size * line_height))
+
+        def paint(draw, image, x, y):
+            for i, line in enumerate(lines):
+                dx = 0
+                if align == "center":
+                    dx = int((width - font.getlength(line)) / 2)
+                elif align == "right":
+                    dx = int(width - font.getlength(line))
+                draw.text((x + dx, y + i * step), line, font=font, fill=color)
+
+        return step * len(lines), paint
+
+    def _measure_table(self, block: dict, *, content_width: int, px, color: str, font_path: str) -> Measured | None:
+        rows = [[str(c) for c in row] for row in (block.get("rows") or []) if row]
+        if not rows:
+            return None
+
+        n_cols = max(len(r) for r in rows)
+        ratios = list(block.get("columns") or [])[:n_cols]
+        ratios += [1.0] * (n_cols - len(ratios))
+        total = sum(ratios) or 1.0
+        col_widths = [int(content_width * r / total) for r in ratios]
+
+        font = _load_font(font_path, px(block.get("size", 20)), self.font)
+        cell_pad = px(block.get("cell_padding", 6))
+        line_color = block.get("line_color", "#444444")
+        header_color = block.get("header_color")
+
+        cells: List[List[Measured]] = []
+        row_heights: List[int] = []
+        for ri, row in enumerate(rows):
+            fill = header_color if (ri == 0 and header_color) else block.get("color", color)
+            measured_row = [
+                self._measure_text(
+                    row[ci] if ci < len(row) else "",
+                    width=max(1, col_widths[ci] - cell_pad * 2),
+                    font=font,
+                    color=fill,
+                    align="left",
+                    line_height=float(block.get("line_height", 1.4)),
+                )
+                for ci in range(n_cols)
+            ]
+            cells.append(measured_row)
+            row_heights.append(max(h for h, _ in measured_row) + cell_pad * 2)
+
+        def paint(draw, image, x, y):
+            cy = y
+            for measured_row, rh in zip(cells, row_heights):
+                cx = x
+                for (_, paint_cell), cw in zip(measured_row, col_widths):
+                    paint_cell(draw, image, cx + cell_pad, cy + cell_pad)
+                    cx += cw
+                cy += rh
+                draw.line([x, cy - 1, x + content_width, cy - 1], fill=line_color)
+
+        return sum(row_heights), paint
+
+    def _measure_range(self, block: dict, *, px, color: str) -> Measured | None:
+        grid = [line for line in str(block.get("text", "")).split("\n") if line]
+        if not grid:
+            return None
+
+        cell = px(block.get("cell", 18))
+        stroke = max(1, px(1))
+        cell_color = block.get("color", color)
+        origin_color = block.get("origin_color", "#f5c542")
+
+        def paint(draw, image, x, y):
+            for r, line in enumerate(grid):
+                for c, ch in enumerate(line):
+                    box = [x + c * cell, y + r * cell, x + (c + 1) * cell - 2, y + (r + 1) * cell - 2]
+                    if ch == "■":
+                        draw.rectangle(box, fill=origin_color)
+                    elif ch == "□":
+                        draw.rectangle(box, outline=cell_color, width=stroke)
+
+        return cell * len(grid), paint
+
+    def _measure_icon(self, block: dict, *, px) -> Measured | None:
+        path = self._asset_path(block.get("src") or "")
+        if not path:
+            return None
+
+        from PIL import Image
+
+        size = px(block.get("size", 48))
+        with Image.open(path) as src:
+            icon = src.convert("RGBA")
+        icon.thumbnail((size, size))
+
+        def paint(draw, image, x, y):
+            image.alpha_composite(icon, (x, y))
+
+        return icon.height, paint
+
+    def _asset_path(self, rel: str) -> str:
+        if not rel or self.asset_root is None:
+            return ""
+        target = (self.asset_root / rel).resolve()
+        if not target.is_relative_to(self.asset_root) or not target.is_file():
+            logger.warning("Layout asset not found: %s", rel)
+            return ""
+        return str(target)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import io
+from typing import Any, Dict
+
+from src.app.transformers.types import Transformer
+
+
+class PNGResizeTransformer(Transformer):
+    """
+    使用 Pillow 把一张（通常是高 DPI 的）PNG 缩小为另一张 PNG，不需要再走一次浏览器渲染。
+
+    cfg 字段（三选一，保持宽高比；都不给则原样返回）：
+    - width: 目标宽度（像素）
+    - height: 目标高度（像素）
+    - scale: 缩放比例，如 0.5
+    可选：
+    - resample: "lanczos" | "bicubic" | "bilinear" | "box"，默认 "lanczos"
+    """
+
+    input_mime = "image/png"
+    output_mime = "image/png"
+
+    async def transform(self, *, input: Any, cfg: Dict[str, Any] | None = None) -> bytes:
+        if not isinstance(input, (bytes, bytearray)):
+            raise TypeError(f"PNGResizeTransformer expects input=bytes, got {type(input)}")
+        return await asyncio.to_thread(self._resize, bytes(input), cfg or {})
+
+    def _resize(self, data: bytes, cfg: Dict[str, Any]) -> bytes:
+        try:
+            from PIL import Image
+        except Exception as e:
+            raise RuntimeError("Pillow 不可用，无法生成缩略图/低分辨率图。请安装 pillow。") from e
+
+        with Image.open(io.BytesIO(data)) as img:
+            w, h = img.size
+            if cfg.get("width"):
+                ratio = int(cfg["width"]) / w
+            elif cfg.get("height"):
+                ratio = int(cfg["height"]) / h
+            elif cfg.get("scale"):
+                ratio = float(cfg["scale"])
+            else:
+                return data
+
+            # 只缩小不放大：放大不会增加信息，原图即可
+            if ratio >= 1:
+                return data
+
+            size = (max(1, round(w * ratio)), max(1, round(h * ratio)))
+            resample = {
+                "lanczos": Image.Resampling.LANCZOS,
+                "bicubic": Image.Resampling.BICUBIC,
+                "bilinear": Image.Resampling.BILINEAR,
+                "box": Image.Resampling.BOX,
+            }.get(str(cfg.get("resample", "lanczos")).lower(), Image.Resampling.LANCZOS)
+
+            # reducing_gap：先按整数倍快速降采样，再做精细重采样，大图缩小时快很多
+            out = img.resize(size, resample=resample, reducing_gap=2.0)
+
+            buf = io.BytesIO()
+            out.save(buf, format="PNG")
+            return buf.getvalue()
@@ -1,6 +1,8 @@
-import shutil, subprocess, zipfile, logging
+import os, shutil, subprocess, zipfile, logging
 from pathlib import Path
 
+from src.data.loader._table_index import build_table_indexes
+
 log = logging.getLogger("asset")
 
 class GitGameDataMaintainer:
@@ -113,12 +115,36 @@ class GitGameDataMaintainer:
         self.gamedata_dir.mkdir(parents=True, exist_ok=True)
         try:
             with zipfile.ZipFile(zip_path, "r") as z:
-                z.extractall(self.gamedata_dir)
-            return True
+                self._extract_replacing(z)
         except Exception:
             log.exception("解压失败")
             return False
 
+        # 解压后一次性为大表建立记录偏移索引，失败不影响更新结果
+        build_table_indexes(self.gamedata_dir)
+        return True
+
+    def _extract_replacing(self, z: zipfile.ZipFile) -> None:
+        """
+        逐个文件解压到同目录的 tmp 文件再 os.replace，不原地改写已有文件：
+        worker（包括退出中的旧 worker）可能还 mmap 着旧表（TableIndex），原地截断会让它们 SIGBUS；
+        换 inode 后旧映射继续指向旧文件内容，直到关闭。
+        """
+        root = self.gamedata_dir.resolve()
+        for member in z.infolist():
+            target = (root / member.filename).resolve()
+            if target != root and root not in target.parents:
+                log.warning("跳过越界的压缩包条目：%s", member.filename)
+                continue
+            if member.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + ".extract.tmp")
+            with z.open(member) as src, open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(tmp, target)
+
     def update(self) -> bool:
         """
         先比较远端 hash，确定是否需要 pull：
@@ -0,0 +1,176 @@
+# src/data/loader/_json_scanner.py
+"""
+轻量 JSON 字节扫描器：只定位 value 在原始字节中的区间，不构造 Python 对象。
+
+buf 可以是 bytes / bytearray / mmap（re 模块可以直接在 buffer 上匹配）。
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Iterator, Optional, Sequence, Tuple
+
+_WS_RE = re.compile(rb"[ \t\r\n]*")
+_STRING_RE = re.compile(rb'"(?:[^"\\]|\\.)*"', re.S)
+_STRUCT_RE = re.compile(rb'["\[\]{}]')
+_SCALAR_RE = re.compile(rb"[^,\]}\s]+")
+
+_QUOTE = ord('"')
+_OPEN = (ord("{"), ord("["))
+_CLOSE = (ord("}"), ord("]"))
+_LBRACE = ord("{")
+_RBRACE = ord("}")
+_COLON = ord(":")
+_COMMA = ord(",")
+
+Span = Tuple[int, int]
+
+
+class JsonScanError(ValueError):
+    """扫描到非法/截断的 JSON"""
+
+
+def skip_ws(buf, pos: int) -> int:
+    return _WS_RE.match(buf, pos).end()
+
+
+def _byte_at(buf, pos: int) -> int:
+    """越界（输入被截断）时抛 JsonScanError 而不是 IndexError。"""
+    if pos >= len(buf):
+        raise JsonScanError(f"Unexpected end of input at {pos}")
+    return buf[pos]
+
+
+def scan_value_end(buf, pos: int) -> int:
+    """
+    pos 指向一个 value 的首字节，返回该 value 结束后的位置（不含尾随空白）。
+    容器只按括号深度匹配，不校验 [ 与 } 这类错配；错配/截断的 JSON 由之后的解码报错。
+    """
+    c = _byte_at(buf, pos)
+
+    if c == _QUOTE:
+        m = _STRING_RE.match(buf, pos)
+        if not m:
+            raise JsonScanError(f"Unterminated string at {pos}")
+        return m.end()
+
+    if c in _OPEN:
+        depth = 1
+        cur = pos + 1
+        while True:
+            m = _STRUCT_RE.search(buf, cur)
+            if not m:
+                raise JsonScanError(f"Unterminated container at {pos}")
+            ch = buf[m.start()]
+            if ch == _QUOTE:
+                sm = _STRING_RE.match(buf, m.start())
+                if not sm:
+                    raise JsonScanError(f"Unterminated string at {m.start()}")
+                cur = sm.end()
+                continue
+            if ch in _OPEN:
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return m.end()
+            cur = m.end()
+
+    m = _SCALAR_RE.match(buf, pos)
+    if not m:
+        raise JsonScanError(f"Invalid value at {pos}")
+    return m.end()
+
+
+def _decode_key(buf, start: int, end: int) -> str:
+    raw = bytes(buf[start:end])
+    if b"\\" not in raw:
+        return raw[1:-1].decode("utf-8")
+    return json.loads(raw)
+
+
+def iter_object_members(buf, pos: int) -> Iterator[Tuple[str, int, int]]:
+    """
+    pos 指向 '{'，依次产出 (key, value_start, value_end)。
+    """
+    pos = skip_ws(buf, pos)
+    if _byte_at(buf, pos) != _LBRACE:
+        raise JsonScanError(f"Expected object at {pos}")
+
+    pos = skip_ws(buf, pos + 1)
+    if _byte_at(buf, pos) == _RBRACE:
+        return
+
+    while True:
+        m = _STRING_RE.match(buf, pos)
+        if not m:
+            raise JsonScanError(f"Expected key at {pos}")
+        key = _decode_key(buf, m.start(), m.end())
+
+        pos = skip_ws(buf, m.end())
+        if _byte_at(buf, pos) != _COLON:
+            raise JsonScanError(f"Expected ':' at {pos}")
+        value_start = skip_ws(buf, pos + 1)
+        value_end = scan_value_end(buf, value_start)
+
+        yield key, value_start, value_end
+
+        pos = skip_ws(buf, value_end)
+        c = _byte_at(buf, pos)
+        if c == _COMMA:
+            pos = skip_ws(buf, pos + 1)
+            continue
+        if c == _RBRACE:
+            return
+        raise JsonScanError(f"Expected ',' or '}}' at {pos}")
+
+
+def find_path(buf, path: Sequence[str], pos: int = 0) -> Optional[Span]:
+    """
+    沿对象 key 路径定位子树，返回 (start, end)；路径不存在返回 None。
+    空路径表示根 value 本身。
+    """
+    start = skip_ws(buf, pos)
+    end = scan_value_end(buf, start)
+
+    for part in path:
+        if buf[start] != _LBRACE:
+            return None
+        for key, vs, ve in iter_object_members(buf, start):
+            if key == part:
+                start, end = vs, ve
+                break
+        else:
+            return None
+
+    return start, end
+
+
+def iter_subtrees(buf, paths: Sequence[Sequence[str]], pos: int = 0) -> Iterator[Tuple[Tuple[str, ...], Span]]:
+    """
+    单次遍历产出多个 key 路径对应的子树区间：(path, (start, end))。
+
+    未命中的分支只做字节级跳过，不会被解码成 Python 对象；
+    路径不存在时静默跳过。
+    """
+    trie: dict = {}
+    for path in paths:
+        node = trie
+        for part in path:
+            node = node.setdefault(part, {})
+        node[None] = tuple(path)
+
+    start = skip_ws(buf, pos)
+    yield from _walk_trie(buf, start, trie)
+
+
+def _walk_trie(buf, start: int, node: dict) -> Iterator[Tuple[Tuple[str, ...], Span]]:
+    if None in node:
+        yield node[None], (start, scan_value_end(buf, start))
+        return
+    if buf[start] != _LBRACE:
+        return
+    for key, vs, _ in iter_object_members(buf, start):
+        child = node.get(key)
+        if child is not None:
+            yield from _walk_trie(buf, vs, child)
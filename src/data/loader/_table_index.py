@@ -0,0 +1,173 @@
+# src/data/loader/_table_index.py
+"""
+大体积 excel 表的记录级字节偏移索引。
+
+解压 gamedata 后扫描一次，把每条顶层记录（或指定子对象下的每条记录）
+在文件中的 [start, end) 记录到 <gamedata>/index/<table>.idx.json。
+之后可以 mmap 原始表文件，只解码需要的那一条记录。
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import mmap
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from src.helpers import json_codec
+from src.data.loader._json_scanner import find_path, iter_object_members
+
+log = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+# 表名 -> 记录所在的对象路径（空 tuple 表示根对象的每个 key 就是一条记录）
+INDEXED_TABLES: Dict[str, tuple[str, ...]] = {
+    "character_table": (),
+    "skill_table": (),
+    "skin_table": ("charSkins",),
+    "charword_table": ("charWords",),
+    "handbook_info_table": ("handbookDict",),
+}
+
+
+def _table_path(gamedata_dir: Path, table: str) -> Path:
+    return gamedata_dir / "excel" / f"{table}.json"
+
+
+def _index_path(gamedata_dir: Path, table: str) -> Path:
+    return gamedata_dir / "index" / f"{table}.idx.json"
+
+
+def _source_signature(path: Path) -> Dict[str, int]:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def build_table_index(gamedata_dir: Path, table: str, record_path: Sequence[str] = ()) -> Optional[Path]:
+    """
+    为单张表建立索引并落盘，返回索引文件路径；源表不存在返回 None。
+    """
+    src = _table_path(gamedata_dir, table)
+    if not src.exists():
+        return None
+
+    records: Dict[str, list[int]] = {}
+    with src.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        span = find_path(buf, record_path)
+        if span is not None and buf[span[0]] == ord("{"):
+            for key, start, end in iter_object_members(buf, span[0]):
+                records[key] = [start, end]
+
+    out = _index_path(gamedata_dir, table)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    tmp.write_text(
+        json_codec.dumps(
+            {
+                "format": INDEX_FORMAT_VERSION,
+                "table": table,
+                "record_path": list(record_path),
+                "source": _source_signature(src),
+                "records": records,
+            }
+        ),
+        encoding="utf-8",
+    )
+    tmp.replace(out)
+    log.info("Built record index for %s: %d records", table, len(records))
+    return out
+
+
+def build_table_indexes(gamedata_dir: Path) -> Dict[str, Path]:
+    """为 INDEXED_TABLES 中所有存在的表建立索引（失败的表跳过并记录日志）。"""
+    built: Dict[str, Path] = {}
+    for table, record_path in INDEXED_TABLES.items():
+        try:
+            p = build_table_index(gamedata_dir, table, record_path)
+        except Exception:
+            log.exception("Failed to build record index for %s", table)
+            continue
+        if p is not None:
+            built[table] = p
+    return built
+
+
+class TableIndex:
+    """
+    已打开的单表索引：持有源表的只读 mmap，按 key 只解码一条记录。
+
+    源表被重新解压后旧 mmap 会失效，调用方需在更新前 close()。
+    """
+
+    def __init__(self, table: str, source: Path, records: Dict[str, list[int]]):
+        self.table = table
+        self.source = source
+        self._records = records
+        self._sorted_keys: Optional[List[str]] = None
+        self._file = source.open("rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+    @classmethod
+    def open(cls, gamedata_dir: Path, table: str) -> Optional["TableIndex"]:
+        """
+        打开索引；索引缺失、格式不符或与源表签名不一致时返回 None（调用方可重建）。
+        """
+        src = _table_path(gamedata_dir, table)
+        idx = _index_path(gamedata_dir, table)
+        if not src.exists() or not idx.exists():
+            return None
+        try:
+            meta = json_codec.load_path(idx)
+        except Exception:
+            log.exception("Failed to read record index: %s", idx)
+            return None
+
+        if meta.get("format") != INDEX_FORMAT_VERSION:
+            return None
+        if meta.get("source") != _source_signature(src):
+            return None
+        return cls(table, src, meta.get("records") or {})
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def keys(self) -> Iterator[str]:
+        return iter(self._records.keys())
+
+    def keys_with_prefix(self, prefix: str) -> List[str]:
+        """按 key 排序返回以 prefix 开头的全部 key（排序后的 key 列表只建一次，之后二分查找）。"""
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._records)
+        keys = self._sorted_keys
+        lo = bisect.bisect_left(keys, prefix)
+        hi = lo
+        while hi < len(keys) and keys[hi].startswith(prefix):
+            hi += 1
+        return keys[lo:hi]
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        span = self._records.get(key)
+        if span is None:
+            return None
+        start, end = span
+        return self._buf[start:end]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self.get_raw(key)
+        if raw is None:
+            return default
+        return json_codec.loads(raw)
+
+    def close(self) -> None:
+        try:
+            self._buf.close()
+        finally:
+            self._file.close()
@@ -0,0 +1,46 @@
+# src/data/loader/_table_reader.py
+"""
+流式读取大表的指定子树：按 key 路径定位，只解码命中的部分。
+"""
+from __future__ import annotations
+
+import logging
+import mmap
+from pathlib import Path
+from typing import Any, Dict, Iterator, Sequence, Tuple
+
+from src.helpers import json_codec
+from src.data.loader._json_scanner import iter_subtrees
+
+log = logging.getLogger(__name__)
+
+
+def iter_table_subtrees(path: Path, paths: Sequence[Sequence[str]]) -> Iterator[Tuple[Tuple[str, ...], Any]]:
+    """依次产出 (path, value)，value 为该子树解码后的对象。"""
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for sub_path, (start, end) in iter_subtrees(buf, paths):
+            yield sub_path, json_codec.loads(buf[start:end])
+
+
+def read_table_subtrees(path: Path, paths: Sequence[Sequence[str]]) -> Dict[str, Any]:
+    """
+    只保留 paths 指定的子树，并按原结构拼回 dict，
+    这样下游 get_table(...).get("xxx") 的用法不需要改。
+    读不到/解析失败则返回 {}。
+    """
+    if not path.exists():
+        return {}
+
+    out: Dict[str, Any] = {}
+    try:
+        for sub_path, value in iter_table_subtrees(path, paths):
+            if not sub_path:
+                return value if isinstance(value, dict) else {}
+            node = out
+            for part in sub_path[:-1]:
+                node = node.setdefault(part, {})
+            node[sub_path[-1]] = value
+    except Exception:
+        log.exception("Failed to read json subtrees: %s", path)
+        return {}
+    return out
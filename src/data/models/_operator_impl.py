@@ -1,6 +1,6 @@
 # src/data/models/_operator_impl.py
 from typing import Dict, Any, List
-from src.domain.models.operator import Operator,OperatorPhase, Skill, SkillLevel, SkillSpData, OperatorModule, STR_DICT, LIST_STR_DICT
+from src.domain.models.operator import Operator,OperatorPhase, OperatorAttributeFrame, PotentialRank, Skill, SkillLevel, SkillSpData, OperatorModule, STR_DICT, LIST_STR_DICT
 from src.domain.models.generic import Cost, MaterialCost, parse_cost
 from src.helpers.bundle import *
 
@@ -99,6 +99,10 @@ class OperatorImpl(Operator):
         raw = data.get("phases") or []
         self.phases = [OperatorPhase.from_gamedata(i, p) for i, p in enumerate(raw)]
 
+        # 信赖加成与潜能
+        self.favor_key_frames = [OperatorAttributeFrame.from_gamedata(f) for f in (data.get("favorKeyFrames") or [])]
+        self.potential_ranks = [PotentialRank.from_gamedata(i, r) for i, r in enumerate(data.get("potentialRanks") or [])]
+
     def _init_tags(self, data, tables):
         tags = [self.classes, self.type]
         hs = get_table(tables, "rarity_tags", source="local", default={})
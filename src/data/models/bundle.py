@@ -1,7 +1,11 @@
 from dataclasses import dataclass, field
-from typing import Any, Dict, Mapping
+from typing import Any, Dict, List, Mapping, Optional
 
+from src.domain.models.attribute_curves import AttributeCurves
+from src.domain.models.attribute_store import AttributeStore
+from src.domain.models.cost_vectors import CostVectors
 from src.domain.models.operator import Operator
+from src.domain.models.skill_matrix import SkillMatrix
 from src.helpers.bundle import *
 
 @dataclass(frozen=True, slots=True)
@@ -23,3 +27,12 @@ class DataBundle:
     tables: Dict[str, Dict[str,Any]]
     """保留一些表，方便详情方法内部使用（避免再读磁盘）"""
 
+    # precomputed
+    skill_matrices: Dict[str, List[SkillMatrix]] = field(default_factory=dict)
+    """预计算：operator_id -> 各技能全等级的列式数据"""
+    attribute_store: Optional[AttributeStore] = None
+    """预计算：全体干员属性的 NumPy 列式存储（numpy 未安装时为 None）"""
+    attribute_curves: Optional[AttributeCurves] = None
+    """预计算：全体干员的属性关键帧，用于任意 精英化/等级/信赖/潜能/模组 下的属性计算（numpy 未安装时为 None）"""
+    cost_vectors: Optional[CostVectors] = None
+    """预计算：全体干员各养成步骤的材料稀疏向量，用于材料汇总（numpy 未安装时为 None）"""
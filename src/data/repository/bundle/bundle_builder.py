@@ -1,28 +1,40 @@
 # data/loader/bundle_loader.py
 from __future__ import annotations
 
-import json
 import logging
 from pathlib import Path
 from typing import Any, Dict, List
 
 from src.app.config import Config
+from src.data.loader._table_reader import read_table_subtrees
 from src.data.models.bundle import DataBundle
 from src.data.models._operator_impl import OperatorImpl
+from src.domain.models.attribute_curves import AttributeCurves
+from src.domain.models.attribute_store import AttributeStore
+from src.domain.models.cost_vectors import CostVectors
 from src.domain.models.operator import Operator
+from src.domain.models.skill_matrix import build_skill_matrices
 from src.domain.models.token import Token
+from src.helpers import json_codec
 from src.helpers.bundle import build_range, get_table, html_tag_format
 
 log = logging.getLogger(__name__)
 
+# 只用到部分子树的大表：表名 -> 需要保留的 key 路径
+# 其余部分（如 charword_table.charWords 的全部语音文本）只做字节级跳过，不会变成 Python 对象
+TABLE_SUBTREES: Dict[str, List[tuple[str, ...]]] = {
+    "charword_table": [("voiceLangDict",), ("voiceLangTypeDict",)],
+    # 只需要精英化龙门币；其余常量（大量富文本）不解码
+    "gamedata_const": [("evolveGoldCost",)],
+}
+
 
 def _read_json(path: Path) -> Dict[str, Any]:
     """读不到/解析失败则返回 {}"""
     if not path.exists():
         return {}
     try:
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f) or {}
+        return json_codec.load_path(path) or {}
     except Exception:
         log.exception("Failed to read json: %s", path)
         return {}
@@ -42,6 +54,7 @@ def load_bundle_from_disk(cfg: Config, version: str | None = None) -> DataBundle
     for name, folder in [
         ("character_table", "excel"),
         ("uniequip_table", "excel"),
+        ("battle_equip_table", "excel"),
         ("handbook_team_table", "excel"),
         ("item_table", "excel"),
         ("range_table", "excel"),
@@ -49,8 +62,13 @@ def load_bundle_from_disk(cfg: Config, version: str | None = None) -> DataBundle
         ("skin_table", "excel"),
         ("charword_table", "excel"),
         ("char_meta_table", "excel"),
+        ("gamedata_const", "excel"),
     ]:
-        tables["gamedata"][name] = _read_json(game_root / folder / f"{name}.json") or {}
+        path = game_root / folder / f"{name}.json"
+        if name in TABLE_SUBTREES:
+            tables["gamedata"][name] = read_table_subtrees(path, TABLE_SUBTREES[name])
+        else:
+            tables["gamedata"][name] = _read_json(path) or {}
 
     # 2) 添加本地表 ProjectRoot/data/local/*.json
     # 这些表用于存放项目本地的自定义数据
@@ -69,6 +87,10 @@ def load_bundle_from_disk(cfg: Config, version: str | None = None) -> DataBundle
     # 3) 构建
     tokens = _build_token(tables)
     operators, name_to_id, index_to_id = _build_operators(tables)
+    skill_matrices = build_skill_matrices(operators, _item_names(tables))
+    attribute_store = AttributeStore.from_operators(operators)
+    attribute_curves = AttributeCurves.from_operators(operators)
+    cost_vectors = CostVectors.from_operators(operators, _items(tables), _evolve_gold_cost(tables))
 
     return DataBundle(
         version=version,
@@ -77,6 +99,10 @@ def load_bundle_from_disk(cfg: Config, version: str | None = None) -> DataBundle
         operator_name_to_id=name_to_id,
         operator_index_to_id=index_to_id,
         tables=tables,
+        skill_matrices=skill_matrices,
+        attribute_store=attribute_store,
+        attribute_curves=attribute_curves,
+        cost_vectors=cost_vectors,
     )
 
 
@@ -115,6 +141,18 @@ def _build_token(tables):
     
     return tokens
 
+def _items(tables) -> Dict[str, dict]:
+    items: Dict[str, dict] = (get_table(tables, "item_table", source="gamedata", default={}) or {}).get("items") or {}
+    return {iid: it for iid, it in items.items() if isinstance(it, dict)}
+
+def _evolve_gold_cost(tables) -> List[List[int]]:
+    """gamedata_const.evolveGoldCost：[稀有度-1][精英化阶段-1] -> 龙门币（-1 表示不能精英化）。"""
+    cost = (get_table(tables, "gamedata_const", source="gamedata", default={}) or {}).get("evolveGoldCost") or []
+    return [[int(c) for c in row] for row in cost if isinstance(row, list)]
+
+def _item_names(tables) -> Dict[str, str]:
+    return {iid: str(it.get("name") or iid) for iid, it in _items(tables).items()}
+
 def _build_operators(tables) -> tuple[Dict[str, Operator], Dict[str, str], Dict[str, str]]:
     character_table: Dict[str, dict] = tables.get("gamedata", {}).get("character_table") or {}
 
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -10,10 +10,12 @@ from typing import Any, Dict, List, Optional
 from src.data.repository.bundle.bundle_builder import load_bundle_from_disk
 from src.app.config import Config
 from src.data.loader._git_gamedata_maintainer import GitGameDataMaintainer
+from src.data.loader._table_index import INDEXED_TABLES, TableIndex, build_table_index
 from src.data.models.bundle import DataBundle
 from src.data.models._operator_impl import OperatorImpl
 from src.domain.models.operator import Operator
 from src.domain.models.token import Token
+from src.helpers import json_codec
 from src.helpers.bundle import build_range, html_tag_format
 
 log = logging.getLogger(__name__)
@@ -35,6 +37,10 @@ class DataRepository:
 
     _maintainer: Optional[GitGameDataMaintainer] = field(default=None, init=False, repr=False)
     _bundle: Optional[DataBundle] = field(default=None, init=False, repr=False)
+    _indexes: Dict[str, Optional[TableIndex]] = field(default_factory=dict, init=False, repr=False)
+    # 索引的打开/读取/关闭互斥（读取在线程池中进行）；更新期间不现场重建索引
+    _index_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _updating: bool = field(default=False, init=False, repr=False)
 
     _ready_lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
     _update_lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
@@ -59,6 +65,28 @@ class DataRepository:
             raise DataNotReadyError("Game data bundle is not ready. Call startup_prepare()/ensure_ready() first.")
         return self._bundle
 
+    def read_record(self, table: str, key: str, default: Any = None) -> Any:
+        """
+        通过记录偏移索引只解码大表中的一条记录（如 charword_table.charWords[<id>]）。
+        索引不存在时会现场建立一次；表不在 INDEXED_TABLES 中直接抛 KeyError。
+        """
+        with self._index_lock:
+            index = self._index(table)
+            if index is None:
+                return default
+            return index.get(key, default)
+
+    def read_records(self, table: str, prefix: str) -> Dict[str, Any]:
+        """
+        只解码 key 以 prefix 开头的记录（如某名干员的全部语音：charWords 的 key 为 <char_id>_<语种>_<序号>）。
+        返回 key -> 记录，按 key 排序；索引不可用时返回 {}。
+        """
+        with self._index_lock:
+            index = self._index(table)
+            if index is None:
+                return {}
+            return {key: index.get(key) for key in index.keys_with_prefix(prefix)}
+
     async def startup_prepare(self, force_update_on_first_run: bool = True) -> DataBundle:
         if self._maintainer is None:
             raise RuntimeError("No maintainer configured; cannot perform startup_prepare.")
@@ -72,6 +100,48 @@ class DataRepository:
 
         return await self.refresh_from_disk()
 
+    def prepare_blocking(self, force_update_on_first_run: bool = True) -> DataBundle:
+        """
+        同步版 startup_prepare：给没有事件循环的场景使用（如 prefork 父进程）。
+        """
+        if self._maintainer is None:
+            raise RuntimeError("No maintainer configured; cannot perform prepare_blocking.")
+
+        if force_update_on_first_run and not self._maintainer.is_initialized():
+            log.info("No local gamedata found. Performing first-time git update...")
+            if not self._maintainer.update():
+                raise RuntimeError("First-time gamedata update failed.")
+
+        self._bundle = self._load_bundle()
+        log.info("Game data bundle loaded. version=%s", getattr(self._bundle, "version", ""))
+        return self._bundle
+
+    def update_blocking(self) -> bool:
+        """
+        同步执行一次 git 更新；磁盘版本与内存 bundle 不一致时重新加载。
+        返回是否重新加载了 bundle。
+        """
+        if self._maintainer is None:
+            log.warning("No maintainer configured; skip update.")
+            return False
+
+        self._begin_update()
+        try:
+            ok = self._maintainer.update()
+        finally:
+            self._end_update()
+        if not ok:
+            log.warning("Update gamedata on disk failed.")
+            return False
+
+        version = self._maintainer.get_version(short=True, with_dirty=True)
+        if self._bundle is not None and self._bundle.version == version:
+            return False
+
+        self._bundle = load_bundle_from_disk(self.cfg, version=version)
+        log.info("Bundle reloaded after update. version=%s", version)
+        return True
+
     async def ensure_ready(self) -> DataBundle:
         if self._bundle is not None:
             return self._bundle
@@ -101,7 +171,11 @@ class DataRepository:
 
         async with self._update_lock:
             log.info("Updating gamedata on disk (git+zip)...")
-            ok = await asyncio.to_thread(self._maintainer.update)
+            self._begin_update()
+            try:
+                ok = await asyncio.to_thread(self._maintainer.update)
+            finally:
+                self._end_update()
             if not ok:
                 log.warning("Update gamedata on disk failed.")
                 return False
@@ -123,12 +197,52 @@ class DataRepository:
         if not path.exists():
             return {}
         try:
-            with path.open("r", encoding="utf-8") as f:
-                return json.load(f) or {}
+            return json_codec.load_path(path) or {}
         except Exception:
             log.exception("Failed to read json: %s", path)
             return {}
 
+    def _index(self, table: str) -> Optional[TableIndex]:
+        """持有 _index_lock 时调用。"""
+        if table not in INDEXED_TABLES:
+            raise KeyError(f"Table {table} is not indexed")
+        if table not in self._indexes:
+            self._indexes[table] = self._open_index(table)
+        return self._indexes[table]
+
+    def _open_index(self, table: str) -> Optional[TableIndex]:
+        gamedata_dir = self.cfg.ResourcePath / "gamedata"
+        index = TableIndex.open(gamedata_dir, table)
+        if index is not None or self._updating:
+            # 更新期间表文件与索引可能分属新旧两个版本：只打开签名一致的索引，不现场重建
+            return index
+
+        try:
+            if build_table_index(gamedata_dir, table, INDEXED_TABLES[table]) is None:
+                return None
+        except Exception:
+            log.exception("Failed to build record index for %s", table)
+            return None
+        return TableIndex.open(gamedata_dir, table)
+
+    def _close_indexes(self) -> None:
+        with self._index_lock:
+            for index in self._indexes.values():
+                if index is not None:
+                    index.close()
+            self._indexes.clear()
+
+    def _begin_update(self) -> None:
+        # 更新前后都关闭索引：更新期间打开的索引可能指向旧版本的表，更新结束后一并丢弃、按需重新打开
+        with self._index_lock:
+            self._updating = True
+        self._close_indexes()
+
+    def _end_update(self) -> None:
+        with self._index_lock:
+            self._updating = False
+        self._close_indexes()
+
     def _load_bundle(self) -> DataBundle:
         version = None
         if self._maintainer is not None:
@@ -0,0 +1,257 @@
+# domain/models/attribute_curves.py
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence
+
+from src.domain.models.operator import Operator, OperatorAttributes
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 参与计算的属性（gamedata 键，与 data/local/attrs.json 一致）
+CURVE_KEYS = (
+    "maxHp", "atk", "def", "magicResistance", "cost",
+    "blockCnt", "respawnTime", "attackSpeed", "baseAttackTime",
+)
+
+# 游戏内显示为整数的属性：插值结果四舍五入
+INTEGER_KEYS = {"maxHp", "atk", "def", "cost", "blockCnt", "respawnTime"}
+
+MAX_PHASES = 3
+MAX_POTENTIAL = 6
+MAX_MODULE_LEVEL = 3
+MAX_FAVOR_LEVEL = 50
+
+# 模组 attributeBlackboard 的 key -> gamedata 属性键
+MODULE_BLACKBOARD_KEYS = {
+    "max_hp": "maxHp",
+    "atk": "atk",
+    "def": "def",
+    "magic_resistance": "magicResistance",
+    "cost": "cost",
+    "block_cnt": "blockCnt",
+    "respawn_time": "respawnTime",
+    "attack_speed": "attackSpeed",
+    "base_attack_time": "baseAttackTime",
+}
+
+
+def _attr_row(a: OperatorAttributes) -> List[float]:
+    return [
+        a.max_hp, a.atk, a.defense, a.magic_resistance, a.cost,
+        a.block_cnt, a.respawn_time, a.attack_speed, a.base_attack_time,
+    ]
+
+
+def _round_half_up(np, x):
+    return np.floor(x + 0.5)
+
+
+def _interp(np, levels, values, x):
+    """
+    分段线性插值（逐行）：levels (n,K) 升序，values (n,K,C)，x (n,) -> (n,C)。
+    关键帧不足 K 个的行用最后一帧补齐（区间长度为 0，取该帧的值）。
+    """
+    n, k = levels.shape
+    if k == 1:
+        return values[:, 0, :]
+    rows = np.arange(n)
+    j = np.clip((levels <= x[:, None]).sum(axis=1) - 1, 0, k - 2)
+    l0 = levels[rows, j]
+    l1 = levels[rows, j + 1]
+    span = l1 - l0
+    t = np.where(span > 0, (x - l0) / np.where(span > 0, span, 1.0), 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    v0 = values[rows, j]
+    v1 = values[rows, j + 1]
+    return v0 + (v1 - v0) * t[:, None]
+
+
+@dataclass(frozen=True, slots=True)
+class AttributeCurves:
+    """
+    全体干员的属性关键帧（NumPy），用于计算任意 (精英化, 等级, 信赖, 潜能, 模组等级) 下的面板属性。
+    第 i 行对应 ids[i]，属性维度 C 与 CURVE_KEYS 对应。
+
+    - phase_count (n,)、max_level (n, 3)
+    - level_keys (n, 3, K) / level_values (n, 3, K, C)：各精英化阶段的 attributesKeyFrames
+    - favor_keys (n, F) / favor_values (n, F, C)：favorKeyFrames（信赖等级 0~50）
+    - potential (n, 6, C)：潜能 1~6 的累计加值
+    - module_values (n, M+1, 4, C)：第 m 个模组（0 为不装备）在等级 0~3 的加值
+    """
+    ids: List[str]
+    names: List[str]
+    phase_count: "np.ndarray"
+    max_level: "np.ndarray"
+    level_keys: "np.ndarray"
+    level_values: "np.ndarray"
+    favor_keys: "np.ndarray"
+    favor_values: "np.ndarray"
+    potential: "np.ndarray"
+    module_values: "np.ndarray"
+    module_names: List[List[str]] = field(default_factory=list)
+    """每名干员可装备的模组名（有战斗数据的），下标 m-1 对应模组 m"""
+    rows: Dict[str, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row_of(self, op_id: str) -> Optional[int]:
+        return self.rows.get(op_id)
+
+    @staticmethod
+    def from_operators(operators: Mapping[str, Operator]) -> Optional["AttributeCurves"]:
+        """numpy 未安装时返回 None。"""
+        try:
+            import numpy as np
+        except ImportError:
+            logger.warning("numpy 未安装，跳过干员属性关键帧的构建")
+            return None
+
+        ops = list(operators.values())
+        n = len(ops)
+        c = len(CURVE_KEYS)
+        key_index = {k: i for i, k in enumerate(CURVE_KEYS)}
+
+        k_max = max([len(p.attributes) for op in ops for p in op.phases[:MAX_PHASES]] + [1])
+        f_max = max([len(op.favor_key_frames) for op in ops] + [1])
+        modules_per_op = [
+            [m for m in op.modules if (m.battle_detail or {}).get("phases")]
+            for op in ops
+        ]
+        m_max = max([len(ms) for ms in modules_per_op] + [0])
+
+        phase_count = np.zeros(n, dtype=np.int8)
+        max_level = np.zeros((n, MAX_PHASES), dtype=np.int16)
+        level_keys = np.zeros((n, MAX_PHASES, k_max), dtype=np.float64)
+        level_values = np.full((n, MAX_PHASES, k_max, c), np.nan, dtype=np.float64)
+        favor_keys = np.zeros((n, f_max), dtype=np.float64)
+        favor_values = np.zeros((n, f_max, c), dtype=np.float64)
+        potential = np.zeros((n, MAX_POTENTIAL, c), dtype=np.float64)
+        module_values = np.zeros((n, m_max + 1, MAX_MODULE_LEVEL + 1, c), dtype=np.float64)
+        module_names: List[List[str]] = []
+
+        for i, op in enumerate(ops):
+            phases = op.phases[:MAX_PHASES]
+            phase_count[i] = len(phases)
+            for p, phase in enumerate(phases):
+                max_level[i, p] = phase.max_level
+                frames = phase.attributes
+                if not frames:
+                    continue
+                for k in range(k_max):
+                    f = frames[min(k, len(frames) - 1)]
+                    level_keys[i, p, k] = f.level
+                    level_values[i, p, k] = _attr_row(f.data)
+
+            frames = op.favor_key_frames
+            for k in range(f_max):
+                if not frames:
+                    break
+                f = frames[min(k, len(frames) - 1)]
+                favor_keys[i, k] = f.level
+                favor_values[i, k] = _attr_row(f.data)
+
+            # 潜能 p 的加值 = 潜能 2..p 的效果之和
+            for rank in op.potential_ranks[:MAX_POTENTIAL - 1]:
+                for key, value in rank.modifiers.items():
+                    if key in key_index:
+                        potential[i, rank.rank - 1:, key_index[key]] += value
+
+            names: List[str] = []
+            for m, module in enumerate(modules_per_op[i], start=1):
+                names.append(module.name)
+                for phase in module.battle_detail.get("phases") or []:
+                    level = int(phase.get("equipLevel", 0) or 0)
+                    if not 1 <= level <= MAX_MODULE_LEVEL:
+                        continue
+                    for item in phase.get("attributeBlackboard") or []:
+                        key = MODULE_BLACKBOARD_KEYS.get(item.get("key"))
+                        if key:
+                            module_values[i, m, level, key_index[key]] += float(item.get("value", 0.0) or 0.0)
+            module_names.append(names)
+
+        return AttributeCurves(
+            ids=[op.id for op in ops],
+            names=[op.name for op in ops],
+            phase_count=phase_count,
+            max_level=max_level,
+            level_keys=level_keys,
+            level_values=level_values,
+            favor_keys=favor_keys,
+            favor_values=favor_values,
+            potential=potential,
+            module_values=module_values,
+            module_names=module_names,
+            rows={op.id: i for i, op in enumerate(ops)},
+        )
+
+    def compute(
+        self,
+        *,
+        elite: int = -1,
+        level: int = 0,
+        trust: int = 100,
+        potential: int = 1,
+        module: int = 0,
+        module_level: int = MAX_MODULE_LEVEL,
+        rows: Sequence[int] | None = None,
+    ) -> Dict[str, "np.ndarray"]:
+        """
+        向量化计算面板属性，返回 属性键 -> (n,) 数组（rows 指定时只计算这些行）。
+
+        - elite=-1 为各自的最高精英化阶段；超出该干员阶段数的行 valid=False、属性为 NaN
+        - level<=0 为该阶段满级，超过满级时按满级计算
+        - trust 为信赖百分比（0~200，超过 100% 不再增加属性）
+        - potential 为潜能 1~6；module 为第几个模组（0 为不装备），只在精英二阶段生效
+        - 等级与信赖的插值结果先各自四舍五入，再与潜能、模组加值相加（与游戏面板一致）
+
+        另外返回 elite / level（实际使用的阶段与等级）、module_applied、valid，
+        以及 attackInterval（实际攻击间隔 = baseAttackTime * 100 / attackSpeed）。
+        """
+        import numpy as np
+
+        idx = np.arange(len(self.ids)) if rows is None else np.asarray(rows, dtype=np.intp)
+        n = idx.size
+
+        phase_count = self.phase_count[idx].astype(np.intp)
+        e = phase_count - 1 if elite < 0 else np.full(n, elite, dtype=np.intp)
+        valid = (e >= 0) & (e < phase_count)
+        e = np.clip(e, 0, MAX_PHASES - 1)
+
+        cap = self.max_level[idx, e].astype(np.float64)
+        lv = cap if level <= 0 else np.minimum(float(level), cap)
+        lv = np.maximum(lv, 1.0)
+
+        base = _interp(np, self.level_keys[idx, e], self.level_values[idx, e], lv)
+
+        favor_level = np.full(n, min(max(trust, 0), 100) / 100 * MAX_FAVOR_LEVEL, dtype=np.float64)
+        favor = _interp(np, self.favor_keys[idx], self.favor_values[idx], favor_level)
+
+        integer_cols = [i for i, k in enumerate(CURVE_KEYS) if k in INTEGER_KEYS]
+        base[:, integer_cols] = _round_half_up(np, base[:, integer_cols])
+        favor[:, integer_cols] = _round_half_up(np, favor[:, integer_cols])
+
+        pot = self.potential[idx, min(max(potential, 1), MAX_POTENTIAL) - 1]
+
+        m = min(max(module, 0), self.module_values.shape[1] - 1)
+        module_count = np.array([len(self.module_names[i]) for i in idx], dtype=np.intp)
+        module_applied = (m > 0) & (module <= module_count) & (e == MAX_PHASES - 1)
+        mod = self.module_values[idx, m, min(max(module_level, 0), MAX_MODULE_LEVEL)]
+        mod = np.where(module_applied[:, None], mod, 0.0)
+
+        total = base + favor + pot + mod
+        total[~valid] = np.nan
+
+        out: Dict[str, np.ndarray] = {key: total[:, i] for i, key in enumerate(CURVE_KEYS)}
+        speed = out["attackSpeed"]
+        out["attackInterval"] = np.where(speed > 0, out["baseAttackTime"] * 100.0 / np.where(speed > 0, speed, 1.0), np.nan)
+        out["elite"] = e
+        out["level"] = lv.astype(np.intp)
+        out["module_applied"] = module_applied
+        out["valid"] = valid
+        return out
@@ -0,0 +1,108 @@
+# domain/models/attribute_store.py
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional
+
+from src.domain.models.operator import Operator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 精英化阶段数上限（精零/精一/精二）
+MAX_PHASES = 3
+
+# 按阶段存储的数值列：列名 -> 从 OperatorAttributes 取值
+PHASE_COLUMNS = ("max_hp", "atk", "def", "res", "cost", "block", "respawn", "attack_interval")
+
+
+def _attack_interval(a) -> float:
+    # 实际攻击间隔 = 基础攻击间隔 / (攻速 / 100)
+    return a.base_attack_time * 100.0 / a.attack_speed if a.attack_speed else a.base_attack_time
+
+
+_FRAME_GETTERS = {
+    "max_hp": lambda a: a.max_hp,
+    "atk": lambda a: a.atk,
+    "def": lambda a: a.defense,
+    "res": lambda a: a.magic_resistance,
+    "cost": lambda a: a.cost,
+    "block": lambda a: a.block_cnt,
+    "respawn": lambda a: a.respawn_time,
+    "attack_interval": _attack_interval,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class AttributeStore:
+    """
+    全体干员属性的列式存储（NumPy）：第 i 行对应 ids[i]。
+
+    - rarity / phase_count：int8，形状 (n,)
+    - classes / classes_code / sub_classes：字符串数组，形状 (n,)
+    - phases[col]：float64，形状 (n, MAX_PHASES)，为各精英化阶段满级（max_frame）的数值；
+      不存在的阶段为 NaN
+
+    bundle 构建时生成一次，查询全部是向量化运算（见 src/domain/services/operator_query.py）。
+    """
+    ids: List[str]
+    names: List[str]
+    rarity: "np.ndarray"
+    phase_count: "np.ndarray"
+    classes: "np.ndarray"
+    classes_code: "np.ndarray"
+    sub_classes: "np.ndarray"
+    phases: Dict[str, "np.ndarray"] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def at_phase(self, column: str, phase: int = -1) -> "np.ndarray":
+        """
+        某一列在指定精英化阶段的值，形状 (n,)。
+        phase=-1 表示每名干员各自的最高阶段；指定阶段不存在时为 NaN。
+        """
+        import numpy as np
+
+        values = self.phases[column]
+        if phase < 0:
+            last = np.maximum(self.phase_count.astype(np.intp) - 1, 0)
+            return values[np.arange(len(self.ids)), last]
+        return values[:, min(phase, MAX_PHASES - 1)]
+
+    @staticmethod
+    def from_operators(operators: Mapping[str, Operator]) -> Optional["AttributeStore"]:
+        """numpy 未安装时返回 None（相关查询不可用，其余功能不受影响）。"""
+        try:
+            import numpy as np
+        except ImportError:
+            logger.warning("numpy 未安装，跳过干员属性列式存储的构建")
+            return None
+
+        ops = list(operators.values())
+        n = len(ops)
+        phases = {col: np.full((n, MAX_PHASES), np.nan, dtype=np.float64) for col in PHASE_COLUMNS}
+        phase_count = np.zeros(n, dtype=np.int8)
+
+        for i, op in enumerate(ops):
+            phase_count[i] = min(len(op.phases), MAX_PHASES)
+            for p, phase in enumerate(op.phases[:MAX_PHASES]):
+                frame = phase.max_frame
+                if frame is None:
+                    continue
+                for col, getter in _FRAME_GETTERS.items():
+                    phases[col][i, p] = getter(frame.data)
+
+        return AttributeStore(
+            ids=[op.id for op in ops],
+            names=[op.name for op in ops],
+            rarity=np.array([op.rarity for op in ops], dtype=np.int8),
+            phase_count=phase_count,
+            classes=np.array([op.classes for op in ops], dtype=str),
+            classes_code=np.array([op.classes_code for op in ops], dtype=str),
+            sub_classes=np.array([op.classes_sub for op in ops], dtype=str),
+            phases=phases,
+        )
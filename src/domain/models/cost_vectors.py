@@ -0,0 +1,174 @@
+# domain/models/cost_vectors.py
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from src.domain.models.generic import Cost, GoldCost, MaterialCost
+from src.domain.models.operator import EvolveCostItem, Operator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# item_table 中龙门币的 id（GoldCost 不带 id）
+GOLD_ITEM_ID = "4001"
+
+# 稀疏向量：(item 下标数组 int32, 数量数组 int64)
+SparseCost = Tuple["np.ndarray", "np.ndarray"]
+
+
+@dataclass(frozen=True, slots=True)
+class OperatorCostVectors:
+    """
+    单个干员各养成步骤的材料（稀疏向量，下标为 CostVectors.item_ids 的下标）。
+    """
+    evolve: List[SparseCost] = field(default_factory=list)
+    """[p-1] -> 精英化到阶段 p（1/2），含龙门币"""
+    skill_levels: List[SparseCost] = field(default_factory=list)
+    """[l-2] -> 技能升到 l 级（2~7，所有技能共用）"""
+    masteries: List[List[SparseCost]] = field(default_factory=list)
+    """[技能序号-1][专精等级-1]"""
+    modules: List[List[SparseCost]] = field(default_factory=list)
+    """[模组序号-1][模组等级-1]（只含有升级材料的模组，按游戏内顺序）"""
+    module_names: List[str] = field(default_factory=list)
+    skill_names: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class CostVectors:
+    """
+    全体干员养成材料的稀疏向量表（bundle 构建时生成一次）。
+    聚合时把所需步骤的稀疏向量拼接后做一次 bincount，得到 item_table 维度上的总需求。
+
+    精英化所需的龙门币不在 character_table 中，取自 gamedata_const.evolveGoldCost（按稀有度），
+    以 GOLD_ITEM_ID 计入 evolve 向量。
+    """
+    item_ids: List[str]
+    item_names: List[str]
+    item_order: "np.ndarray"
+    """各材料的排序键（item_table 的 sortId）"""
+    operators: Dict[str, OperatorCostVectors] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def get(self, op_id: str) -> Optional[OperatorCostVectors]:
+        return self.operators.get(op_id)
+
+    def total(self, parts: Iterable[SparseCost]) -> "np.ndarray":
+        """把若干稀疏向量求和为稠密向量（长度 = 材料数）。"""
+        import numpy as np
+
+        parts = list(parts)
+        if not parts:
+            return np.zeros(len(self.item_ids), dtype=np.int64)
+        idx = np.concatenate([p[0] for p in parts])
+        counts = np.concatenate([p[1] for p in parts])
+        return np.bincount(idx, weights=counts, minlength=len(self.item_ids)).astype(np.int64)
+
+    def named(self, dense: "np.ndarray") -> List[Tuple[str, int]]:
+        """稠密向量 -> [(材料名, 数量)]，按 item_table 的 sortId 排列，省略 0。"""
+        import numpy as np
+
+        nz = np.flatnonzero(dense)
+        nz = nz[np.argsort(self.item_order[nz], kind="stable")]
+        return [(self.item_names[i], int(dense[i])) for i in nz]
+
+    @staticmethod
+    def from_operators(
+        operators: Mapping[str, Operator],
+        items: Mapping[str, Dict[str, Any]],
+        evolve_gold: Sequence[Sequence[int]] = (),
+    ) -> Optional["CostVectors"]:
+        """
+        items 为 item_table.items；evolve_gold 为 gamedata_const.evolveGoldCost
+        （[稀有度-1][精英化阶段-1]，-1 表示不能精英化）。numpy 未安装时返回 None。
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            logger.warning("numpy 未安装，跳过养成材料向量的构建")
+            return None
+
+        item_ids: List[str] = []
+        item_names: List[str] = []
+        item_order: List[float] = []
+        index: Dict[str, int] = {}
+
+        def slot(item_id: str) -> int:
+            i = index.get(item_id)
+            if i is None:
+                it = items.get(item_id) or {}
+                i = index[item_id] = len(item_ids)
+                item_ids.append(item_id)
+                item_names.append(str(it.get("name") or item_id))
+                item_order.append(float(it.get("sortId", 1e9) or 1e9))
+            return i
+
+        for item_id in items:
+            slot(item_id)
+
+        def vec(pairs: Iterable[Tuple[str, int]]) -> SparseCost:
+            pairs = [(slot(i), c) for i, c in pairs if i and c]
+            return (
+                np.array([i for i, _ in pairs], dtype=np.int32),
+                np.array([c for _, c in pairs], dtype=np.int64),
+            )
+
+        def cost_pairs(costs: Iterable[Cost]) -> List[Tuple[str, int]]:
+            out: List[Tuple[str, int]] = []
+            for c in costs:
+                if isinstance(c, GoldCost):
+                    out.append((GOLD_ITEM_ID, c.count))
+                elif isinstance(c, MaterialCost):
+                    out.append((c.material_id, c.count))
+            return out
+
+        def evolve_pairs(costs: Iterable[EvolveCostItem], rarity: int, phase: int) -> List[Tuple[str, int]]:
+            pairs = [(c.id, c.count) for c in costs]
+            row = evolve_gold[rarity - 1] if 1 <= rarity <= len(evolve_gold) else ()
+            gold = row[phase - 1] if 1 <= phase <= len(row) else 0
+            if gold > 0:
+                pairs.append((GOLD_ITEM_ID, gold))
+            return pairs
+
+        vectors: Dict[str, OperatorCostVectors] = {}
+        for op_id, op in operators.items():
+            evolve = [
+                vec(evolve_pairs(p.evolve_cost, op.rarity, phase))
+                for phase, p in enumerate(op.phases[1:3], start=1)
+            ]
+
+            # 技能 2~7 级材料所有技能共用，取第一个有等级数据的技能
+            skill_levels: List[SparseCost] = []
+            masteries: List[List[SparseCost]] = []
+            skill_names: List[str] = []
+            for sk in op.skills:
+                by_level = {lv.level: lv for lv in sk.levels}
+                if not skill_levels:
+                    skill_levels = [vec(cost_pairs(by_level[l].costs if l in by_level else [])) for l in range(2, 8)]
+                masteries.append([vec(cost_pairs(by_level[l].costs if l in by_level else [])) for l in range(8, 11)])
+                skill_names.append(sk.name)
+
+            modules = [m for m in op.modules if m.level_costs]
+            vectors[op_id] = OperatorCostVectors(
+                evolve=evolve,
+                skill_levels=skill_levels,
+                masteries=masteries,
+                modules=[
+                    [vec(cost_pairs(lc.costs)) for lc in sorted(m.level_costs, key=lambda lc: lc.level)]
+                    for m in modules
+                ],
+                module_names=[m.name for m in modules],
+                skill_names=skill_names,
+            )
+
+        return CostVectors(
+            item_ids=item_ids,
+            item_names=item_names,
+            item_order=np.array(item_order, dtype=np.float64),
+            operators=vectors,
+        )
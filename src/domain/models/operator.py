@@ -117,6 +117,12 @@ class Operator(ABC):
         self.modules: List[OperatorModule] = []
         """模组信息（结构化）"""
 
+        self.favor_key_frames: List[OperatorAttributeFrame] = []
+        """信赖加成关键帧（favorKeyFrames，level 为信赖等级 0~50，对应信赖 0%~100%）"""
+
+        self.potential_ranks: List[PotentialRank] = []
+        """潜能提升（第 i 项为潜能 i+2 带来的效果）"""
+
     # ========== 对外稳定接口 ==========
 
     @abstractmethod
@@ -239,6 +245,48 @@ class OperatorPhase:
         )
     
 
+# 潜能/模组加成里的属性名 -> OperatorAttributes 的 gamedata 键
+# 潜能的 attributeType 在不同版本的数据中可能是枚举名或枚举序号
+ATTRIBUTE_TYPE_KEYS: Dict[Any, str] = {
+    "MAX_HP": "maxHp", 0: "maxHp",
+    "ATK": "atk", 1: "atk",
+    "DEF": "def", 2: "def",
+    "MAGIC_RESISTANCE": "magicResistance", 3: "magicResistance",
+    "COST": "cost", 4: "cost",
+    "BLOCK_CNT": "blockCnt", 5: "blockCnt",
+    "MOVE_SPEED": "moveSpeed", 6: "moveSpeed",
+    "ATTACK_SPEED": "attackSpeed", 7: "attackSpeed",
+    "BASE_ATTACK_TIME": "baseAttackTime", 8: "baseAttackTime",
+    "RESPAWN_TIME": "respawnTime", 9: "respawnTime",
+}
+
+
+@dataclass(frozen=True)
+class PotentialRank:
+    """
+    对应 character_table 里的 potentialRanks[i]（潜能 i+2）
+    """
+    rank: int                        # 2..6
+    description: str
+    modifiers: Dict[str, float] = field(default_factory=dict)  # gamedata 属性键 -> 加值（只记录 ADDITION 类）
+
+    @staticmethod
+    def from_gamedata(index: int, d: Dict[str, Any]) -> "PotentialRank":
+        d = d or {}
+        modifiers: Dict[str, float] = {}
+        attrs = ((d.get("buff") or {}).get("attributes") or {}).get("attributeModifiers") or []
+        for m in attrs:
+            key = ATTRIBUTE_TYPE_KEYS.get(m.get("attributeType"))
+            if key and m.get("formulaItem") in (None, "ADDITION", 0):
+                modifiers[key] = modifiers.get(key, 0.0) + float(m.get("value", 0.0) or 0.0)
+
+        return PotentialRank(
+            rank=index + 2,
+            description=str(d.get("description") or ""),
+            modifiers=modifiers,
+        )
+
+
 @dataclass(frozen=True)
 class SkillLevel:
     level: int                 # 1..7（普通） / 8..10（专精）
@@ -0,0 +1,118 @@
+# domain/models/skill_matrix.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Mapping, Tuple
+
+from src.domain.models.generic import Cost, GoldCost, MaterialCost
+from src.domain.models.operator import Operator, Skill
+
+# 描述切分：数字（含小数/百分号）作为整体，其余逐字，便于只报告数值变化
+_DESC_TOKEN_RE = re.compile(r"[+-]?\d+(?:\.\d+)?%?|\s|.", re.S)
+
+# (变化前, 变化后)
+DescChange = Tuple[str, str]
+
+
+def _desc_diff(prev: str, cur: str) -> List[DescChange]:
+    """相对上一等级描述的变化片段；相同则为空列表。"""
+    if prev == cur:
+        return []
+    a = _DESC_TOKEN_RE.findall(prev)
+    b = _DESC_TOKEN_RE.findall(cur)
+    changes: List[DescChange] = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag != "equal":
+            changes.append(("".join(a[i1:i2]), "".join(b[j1:j2])))
+    return changes
+
+
+def _cost_row(costs: List[Cost], item_names: Mapping[str, str]) -> List[Tuple[str, int]]:
+    row: List[Tuple[str, int]] = []
+    for c in costs:
+        if isinstance(c, GoldCost):
+            row.append(("龙门币", c.count))
+        elif isinstance(c, MaterialCost):
+            row.append((item_names.get(c.material_id, c.material_id), c.count))
+    return row
+
+
+@dataclass(frozen=True, slots=True)
+class SkillMatrix:
+    """
+    单个技能全部等级的列式数据（下标 i 对应 levels[i]）。
+    描述只保存 1 级全文，之后每级只保存相对上一级的变化片段。
+    """
+    skill_id: str
+    skill_index: int
+    name: str
+    levels: List[int] = field(default_factory=list)
+    sp_type: List[str] = field(default_factory=list)
+    skill_type: List[str] = field(default_factory=list)
+    sp_cost: List[int] = field(default_factory=list)
+    init_sp: List[int] = field(default_factory=list)
+    duration: List[float] = field(default_factory=list)
+    description: str = ""
+    description_diff: List[List[DescChange]] = field(default_factory=list)
+    upgrade_cost: List[List[Tuple[str, int]]] = field(default_factory=list)
+
+    @staticmethod
+    def from_skill(skill: Skill, item_names: Mapping[str, str]) -> "SkillMatrix":
+        levels = sorted(skill.levels, key=lambda x: x.level)
+        descs = [lv.description or "" for lv in levels]
+
+        return SkillMatrix(
+            skill_id=skill.skill_id,
+            skill_index=skill.skill_index,
+            name=skill.name,
+            levels=[lv.level for lv in levels],
+            sp_type=[lv.sp.sp_type for lv in levels],
+            skill_type=[lv.skill_type for lv in levels],
+            sp_cost=[lv.sp.sp_cost for lv in levels],
+            init_sp=[lv.sp.init_sp for lv in levels],
+            duration=[lv.duration for lv in levels],
+            description=descs[0] if descs else "",
+            description_diff=[[]] + [_desc_diff(p, c) for p, c in zip(descs, descs[1:])] if descs else [],
+            upgrade_cost=[_cost_row(lv.costs, item_names) for lv in levels],
+        )
+
+    def to_dict(
+        self,
+        *,
+        sp_type_name: Mapping[str, str] | None = None,
+        skill_type_name: Mapping[str, str] | None = None,
+    ) -> Dict[str, Any]:
+        """紧凑输出：各列中全等级都相同的值折叠成单个值。"""
+        sp_type_name = sp_type_name or {}
+        skill_type_name = skill_type_name or {}
+
+        def column(values: List[Any]) -> Any:
+            return values[0] if values and all(v == values[0] for v in values) else values
+
+        return {
+            "index": self.skill_index,
+            "name": self.name,
+            "levels": self.levels,
+            "sp_type": column([sp_type_name.get(v, v) for v in self.sp_type]),
+            "skill_type": column([skill_type_name.get(v, v) for v in self.skill_type]),
+            "sp_cost": column(self.sp_cost),
+            "init_sp": column(self.init_sp),
+            "duration": column(self.duration),
+            "description": self.description,
+            "description_diff": [[list(c) for c in changes] for changes in self.description_diff],
+            "upgrade_cost": [[list(c) for c in row] for row in self.upgrade_cost],
+        }
+
+
+def build_skill_matrices(
+    operators: Mapping[str, Operator],
+    item_names: Mapping[str, str],
+) -> Dict[str, List[SkillMatrix]]:
+    """operator_id -> 各技能的 SkillMatrix（bundle 构建时计算一次）。"""
+    return {
+        op_id: [SkillMatrix.from_skill(sk, item_names) for sk in op.skills if sk.levels]
+        for op_id, op in operators.items()
+        if op.skills
+    }
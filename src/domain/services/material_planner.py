@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from src.domain.models.cost_vectors import CostVectors, SparseCost
+
+
+class MaterialPlanError(ValueError):
+    pass
+
+
+MAX_ELITE = 2
+MAX_SKILL_LEVEL = 7
+MAX_MASTERY = 3
+MAX_MODULE_LEVEL = 3
+
+
+@dataclass
+class UpgradeTarget:
+    """
+    养成目标（从零开始计算，即 精零 1 级、技能 1 级、未专精、未解锁模组）。
+    前置条件会自动补齐：专精需要技能 7 级与精英二；技能 5 级以上需要精英一；模组需要精英二。
+    """
+    elite: int = 0
+    skill_level: int = 1
+    mastery: int = 0
+    """目标专精等级 0~3"""
+    skills: Sequence[int] = ()
+    """专精哪些技能（技能序号从 1 开始），为空表示全部技能"""
+    module_level: int = 0
+    """目标模组等级 0~3（对所有有升级材料的模组生效）"""
+    modules: Sequence[int] = ()
+    """升级哪些模组（模组序号从 1 开始，不含初始模组），为空表示全部模组"""
+
+    def normalized(self) -> "UpgradeTarget":
+        for name, value, hi in (
+            ("elite", self.elite, MAX_ELITE),
+            ("skill_level", self.skill_level, MAX_SKILL_LEVEL),
+            ("mastery", self.mastery, MAX_MASTERY),
+            ("module_level", self.module_level, MAX_MODULE_LEVEL),
+        ):
+            if not 0 <= value <= hi:
+                raise MaterialPlanError(f"{name} 必须在 0~{hi} 之间（当前：{value}）")
+
+        elite, skill_level = self.elite, max(self.skill_level, 1)
+        if self.mastery > 0:
+            skill_level, elite = MAX_SKILL_LEVEL, MAX_ELITE
+        if self.module_level > 0:
+            elite = MAX_ELITE
+        if skill_level > 4:
+            elite = max(elite, 1)
+        return UpgradeTarget(
+            elite=elite,
+            skill_level=skill_level,
+            mastery=self.mastery,
+            skills=tuple(self.skills),
+            module_level=self.module_level,
+            modules=tuple(self.modules),
+        )
+
+
+@dataclass
+class OperatorPlan:
+    op_id: str
+    name: str
+    items: List[Tuple[str, int]]
+    steps: List[str] = field(default_factory=list)
+    """实际计入的养成步骤（便于核对）"""
+    warnings: List[str] = field(default_factory=list)
+
+
+@dataclass
+class MaterialPlan:
+    total: List[Tuple[str, int]]
+    operators: List[OperatorPlan]
+
+
+def _select(
+    vectors: CostVectors,
+    op_id: str,
+    target: UpgradeTarget,
+) -> Tuple[List[SparseCost], List[str], List[str]]:
+    """选出达成目标所需的全部稀疏向量；返回 (向量, 步骤说明, 警告)。"""
+    v = vectors.get(op_id)
+    parts: List[SparseCost] = []
+    steps: List[str] = []
+    warnings: List[str] = []
+    if v is None:
+        return parts, steps, ["没有养成材料数据"]
+
+    if target.elite > len(v.evolve):
+        warnings.append(f"最高只能精英化到阶段{len(v.evolve)}")
+    for p in range(min(target.elite, len(v.evolve))):
+        parts.append(v.evolve[p])
+        steps.append(f"精英{p + 1}")
+
+    if target.skill_level > 1:
+        if not v.skill_levels:
+            warnings.append("没有技能")
+        else:
+            parts.extend(v.skill_levels[:target.skill_level - 1])
+            steps.append(f"技能1→{target.skill_level}")
+
+    if target.mastery > 0:
+        chosen = list(target.skills) or list(range(1, len(v.masteries) + 1))
+        for s in chosen:
+            if not 1 <= s <= len(v.masteries):
+                warnings.append(f"没有第{s}个技能")
+                continue
+            parts.extend(v.masteries[s - 1][:target.mastery])
+            steps.append(f"{v.skill_names[s - 1]} 专精{target.mastery}")
+
+    if target.module_level > 0:
+        chosen = list(target.modules) or list(range(1, len(v.modules) + 1))
+        if not v.modules:
+            warnings.append("没有可升级的模组")
+        for m in chosen:
+            if not 1 <= m <= len(v.modules):
+                if v.modules:
+                    warnings.append(f"没有第{m}个模组")
+                continue
+            parts.extend(v.modules[m - 1][:target.module_level])
+            steps.append(f"{v.module_names[m - 1]} 等级{target.module_level}")
+
+    return parts, steps, warnings
+
+
+def plan_materials(
+    vectors: CostVectors,
+    targets: Sequence[Tuple[str, str, UpgradeTarget]],
+    *,
+    per_operator: bool = True,
+) -> MaterialPlan:
+    """
+    targets 为 [(operator_id, 显示名, 目标)]；同一干员出现多次时分别计入。
+    总计为所有选中稀疏向量拼接后的一次 bincount；per_operator=False 时不输出分项。
+    """
+    everything: List[SparseCost] = []
+    operators: List[OperatorPlan] = []
+    for op_id, name, target in targets:
+        parts, steps, warnings = _select(vectors, op_id, target.normalized())
+        everything.extend(parts)
+        operators.append(OperatorPlan(
+            op_id=op_id,
+            name=name,
+            items=vectors.named(vectors.total(parts)) if per_operator else [],
+            steps=steps,
+            warnings=warnings,
+        ))
+
+    return MaterialPlan(
+        total=vectors.named(vectors.total(everything)),
+        operators=operators,
+    )
+
+
+def format_items(items: Sequence[Tuple[str, int]]) -> Dict[str, int]:
+    return {name: count for name, count in items}
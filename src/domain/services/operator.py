@@ -3,7 +3,7 @@ import logging
 
 from src.helpers.gamedata.search import build_sources, search_source_spec
 
-from src.helpers.bundle import get_table
+from src.helpers.bundle import get_table, html_tag_format
 
 from src.app.context import AppContext
 from src.domain.models.operator import Operator
@@ -46,23 +46,32 @@ def build_trust_attr(op) -> dict:
     """
     信赖满级（50）的加成
     """
-    frames = getattr(op, "favorKeyFrames", None)
+    frames = getattr(op, "favor_key_frames", None)
     if not frames:
         return {}
 
     # 找 level=50 的
-    f = next((x for x in frames if x["level"] == 50), None)
+    f = next((x for x in frames if x.level == 50), None)
     if not f:
         return {}
 
-    d = f.get("data", {})
     return {
-        "maxHp": d.get("maxHp", 0),
-        "atk": d.get("atk", 0),
-        "def": d.get("def", 0),
+        "maxHp": f.data.max_hp,
+        "atk": f.data.atk,
+        "def": f.data.defense,
     }
 
 
+def build_potential_list(op) -> list[dict]:
+    """
+    潜能列表（模板使用的 potential_rank 从 0 开始，对应潜能 2）
+    """
+    return [
+        {"potential_rank": p.rank - 2, "potential_desc": p.description}
+        for p in (getattr(op, "potential_ranks", None) or [])
+    ]
+
+
 def search_operator_by_name(ctx: AppContext, name: str) -> QueryResult:
 
     search_sources = build_sources(ctx.data_repository.get_bundle(), source_key=["name"])
@@ -80,9 +89,13 @@ def search_operator_by_name(ctx: AppContext, name: str) -> QueryResult:
         raise OperatorNotFoundError(f"未找到干员: {name}")
     
     op: Operator = search_results.by_key("name")[0].value
+    return build_operator_profile(ctx, op)
 
-    last_phase = op.phases[-1]
 
+def build_operator_profile(ctx: AppContext, op: Operator) -> QueryResult:
+    """
+    由已解析的 Operator 组装 operator_info 模板使用的 QueryResult（不再搜索）。
+    """
     bundle = ctx.data_repository.get_bundle()
     CLASSICON = get_table(bundle.tables, "classes_icons", source="local")
     SP_TYPE_NAME = get_table(bundle.tables, "sp_type", source="local")
@@ -104,7 +117,60 @@ def search_operator_by_name(ctx: AppContext, name: str) -> QueryResult:
             "skill_type_name": SKILL_TYPE_NAME,
             "talents_list": op.talents(),
             "building_skills": [],
-            "potential_list": [],
+            "potential_list": build_potential_list(op),
         }
     )
-    return result
\ No newline at end of file
+    return result
+
+
+def build_skill_payload(bundle, op: Operator, index: int, level: int) -> dict | None:
+    """
+    组装 operator_skill 模板（txt / 原生 png 布局）使用的 payload。
+    技能序号（从 1 开始）或等级不存在时返回 None，由调用方给出提示。
+    """
+    if index < 1 or not op.skills or len(op.skills) < index:
+        return None
+    sk = op.skills[index - 1]
+    chosen = next((x for x in sk.levels if int(x.level) == int(level)), None)
+    if not chosen:
+        return None
+
+    SPType = get_table(bundle.tables, "sp_type", source="local", default={})
+    SkillType = get_table(bundle.tables, "skill_type", source="local", default={})
+    SkillLevelName = get_table(bundle.tables, "skill_level", source="local", default={})
+
+    sp_data = getattr(chosen, "sp", None)
+    sp_type_raw = getattr(sp_data, "sp_type", "") if sp_data else ""
+    skill_type_raw = getattr(chosen, "skill_type", "")
+
+    return {
+        "op": op,
+        "skill": {
+            "index": index,
+            "name": sk.name,
+        },
+        "meta": {
+            "level_text": SkillLevelName.get(str(level), str(level)) if level >= 8 else str(level),
+            "range": getattr(chosen, "range", "") or "",
+            "sp_type_text": SPType.get(sp_type_raw, SPType.get(str(sp_type_raw), str(sp_type_raw))),
+            "skill_type_text": SkillType.get(skill_type_raw, SkillType.get(str(skill_type_raw), str(skill_type_raw))),
+            "sp_cost": getattr(sp_data, "sp_cost", 0) if sp_data else 0,
+            "init_sp": getattr(sp_data, "init_sp", 0) if sp_data else 0,
+            "duration": getattr(chosen, "duration", 0) or 0,
+            "description": getattr(chosen, "description", "") or "",
+        },
+    }
+
+
+def build_operator_voices(ctx: AppContext, op: Operator) -> list[dict]:
+    """
+    干员语音台词 [{"title", "text"}]，按游戏内顺序。
+    charword_table 的台词部分不进 bundle，这里经记录偏移索引只解码该干员的记录。
+    """
+    records = ctx.data_repository.read_records("charword_table", f"{op.id}_")
+    words = [r for r in records.values() if isinstance(r, dict) and r.get("charId") == op.id]
+    words.sort(key=lambda r: (r.get("voiceIndex") or 0, str(r.get("charWordId") or "")))
+    return [
+        {"title": str(r.get("voiceTitle") or ""), "text": html_tag_format(str(r.get("voiceText") or ""))}
+        for r in words
+    ]
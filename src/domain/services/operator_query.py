@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from src.domain.models.attribute_store import PHASE_COLUMNS, AttributeStore
+
+
+class OperatorQueryError(ValueError):
+    pass
+
+
+# 列名别名（含中文），统一映射到 AttributeStore 的列名
+COLUMN_ALIASES: Dict[str, str] = {
+    "rarity": "rarity", "star": "rarity", "星级": "rarity", "稀有度": "rarity",
+    "max_hp": "max_hp", "hp": "max_hp", "maxhp": "max_hp", "生命": "max_hp", "生命上限": "max_hp",
+    "atk": "atk", "攻击": "atk", "攻击力": "atk",
+    "def": "def", "defense": "def", "防御": "def", "防御力": "def",
+    "res": "res", "magic_resistance": "res", "法抗": "res", "法术抗性": "res",
+    "cost": "cost", "费用": "cost", "部署费用": "cost",
+    "block": "block", "block_cnt": "block", "阻挡": "block", "阻挡数": "block",
+    "respawn": "respawn", "respawn_time": "respawn", "再部署": "respawn", "再部署时间": "respawn",
+    "attack_interval": "attack_interval", "interval": "attack_interval", "攻击间隔": "attack_interval",
+}
+
+_OPS = {
+    "<": lambda a, v: a < v,
+    "<=": lambda a, v: a <= v,
+    ">": lambda a, v: a > v,
+    ">=": lambda a, v: a >= v,
+    "=": lambda a, v: a == v,
+    "==": lambda a, v: a == v,
+    "!=": lambda a, v: a != v,
+}
+
+_CONDITION_RE = re.compile(r"^\s*([^\s<>=!]+)\s*(<=|>=|==|!=|<|>|=)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+# (列名, 比较符, 数值)
+Condition = Tuple[str, str, float]
+
+
+def resolve_column(name: str) -> str:
+    col = COLUMN_ALIASES.get(name.strip().lower()) or COLUMN_ALIASES.get(name.strip())
+    if not col:
+        raise OperatorQueryError(f"未知的属性列: {name}（可用：{', '.join(('rarity',) + PHASE_COLUMNS)}）")
+    return col
+
+
+def parse_conditions(text: str) -> List[Condition]:
+    """
+    解析数值条件，逗号/分号/空白分隔：
+        "cost<=20, def>=500"  ->  [("cost", "<=", 20.0), ("def", ">=", 500.0)]
+    """
+    conditions: List[Condition] = []
+    for part in re.split(r"[,，;；\s]+", text or ""):
+        if not part:
+            continue
+        m = _CONDITION_RE.match(part)
+        if not m:
+            raise OperatorQueryError(f"无法解析的条件: {part}（示例：cost<=20）")
+        conditions.append((resolve_column(m.group(1)), m.group(2), float(m.group(3))))
+    return conditions
+
+
+@dataclass
+class OperatorQuery:
+    classes: Sequence[str] = ()
+    """职业（中文名或代码，如 “重装” / “TANK”）"""
+    sub_classes: Sequence[str] = ()
+    """子职业（中文名）"""
+    rarity: Sequence[int] = ()
+    conditions: Sequence[Condition] = ()
+    sort_by: str = ""
+    descending: bool = True
+    limit: int = 10
+    phase: int = -1
+    """数值取自哪个精英化阶段的满级；-1 为各自的最高阶段"""
+    columns: Sequence[str] = field(default_factory=lambda: ("max_hp", "atk", "def", "res", "cost", "block"))
+
+
+@dataclass
+class OperatorQueryResult:
+    total: int
+    columns: List[str]
+    rows: List[List[Any]]
+
+
+def run_query(store: AttributeStore, q: OperatorQuery) -> OperatorQueryResult:
+    """
+    向量化过滤 + 排序 + top-k：
+    - 过滤条件之间为“且”；同一类别（职业/子职业/星级）的多个取值之间为“或”
+    - sort_by 为空时按星级从高到低、再按数据表顺序输出；NaN（阶段不存在）排在最后且不满足任何数值条件
+    - limit <= 0 时返回全部命中
+    """
+    import numpy as np
+
+    n = len(store)
+    mask = np.ones(n, dtype=bool)
+
+    if q.classes:
+        wanted = np.array([c.strip() for c in q.classes], dtype=str)
+        mask &= np.isin(store.classes, wanted) | np.isin(store.classes_code, np.char.upper(wanted))
+    if q.sub_classes:
+        mask &= np.isin(store.sub_classes, np.array([c.strip() for c in q.sub_classes], dtype=str))
+    if q.rarity:
+        mask &= np.isin(store.rarity, np.array(list(q.rarity), dtype=np.int8))
+
+    columns: Dict[str, Any] = {}
+
+    def column(name: str):
+        if name not in columns:
+            columns[name] = store.rarity.astype(np.float64) if name == "rarity" else store.at_phase(name, q.phase)
+        return columns[name]
+
+    for col, op, value in q.conditions:
+        if op not in _OPS:
+            raise OperatorQueryError(f"未知的比较符: {op}")
+        mask &= _OPS[op](column(col), value)
+
+    idx = np.flatnonzero(mask)
+    total = int(idx.size)
+    limit = max(0, int(q.limit))
+
+    if q.sort_by:
+        key = column(resolve_column(q.sort_by))[idx]
+        # NaN 统一排在最后
+        key = np.where(np.isnan(key), -np.inf if q.descending else np.inf, key)
+        if q.descending:
+            key = -key
+        if 0 < limit < idx.size:
+            part = np.argpartition(key, limit - 1)[:limit]
+            idx = idx[part[np.argsort(key[part], kind="stable")]]
+        else:
+            idx = idx[np.argsort(key, kind="stable")]
+    else:
+        idx = idx[np.lexsort((idx, -store.rarity[idx]))]
+
+    if limit:
+        idx = idx[:limit]
+
+    # 输出列：默认列 + 排序列 + 条件列（星级已在固定列中）
+    out_columns: List[str] = []
+    extra = [q.sort_by] if q.sort_by else []
+    for col in [*(resolve_column(c) for c in (*q.columns, *extra)), *(c for c, _, _ in q.conditions)]:
+        if col != "rarity" and col not in out_columns:
+            out_columns.append(col)
+
+    values = {c: column(c)[idx] for c in out_columns}
+    rows: List[List[Any]] = []
+    for r, i in enumerate(idx):
+        row: List[Any] = [store.names[i], int(store.rarity[i]), str(store.classes[i]), str(store.sub_classes[i])]
+        for c in out_columns:
+            v = float(values[c][r])
+            row.append(None if np.isnan(v) else (int(v) if v.is_integer() else round(v, 3)))
+        rows.append(row)
+
+    return OperatorQueryResult(
+        total=total,
+        columns=["name", "rarity", "class", "sub_class", *out_columns],
+        rows=rows,
+    )
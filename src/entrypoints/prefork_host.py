@@ -0,0 +1,230 @@
+# src/entrypoints/prefork_host.py
+"""
+多进程 prefork 服务模式。
+
+- 父进程加载一次 DataBundle，gc.freeze() 后 fork 出 N 个 worker，
+  worker 以 copy-on-write 方式共享 bundle（冻结后 GC 不再遍历/改写这些对象，避免页被写脏）
+- 所有 worker 共享同一个监听 socket；每个 worker 额外监听一个自己的 UDS，用于 SSE 会话转发
+- 父进程负责定时更新数据：更新（git pull + 解压 + 重建 bundle）在后台线程中进行，监督循环照常回收/重启 worker；
+  bundle 版本变化时等更新完成后再 fork 新一代 worker，并优雅退出旧 worker
+  （退出中的 worker 只在监督循环里轮询回收，不阻塞其他 worker 的崩溃重启）
+"""
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+import uvicorn
+
+from src.adapters.mcp.sse_affinity import SseAffinityMiddleware
+from src.app.bootstrap_disk import build_context_from_repository
+from src.app.config import Config, load_from_disk
+from src.app.context import AppContext
+from src.data.repository.data_repository import DataRepository
+from src.entrypoints.uvicorn_host import HOST, PORT, create_app
+
+log = logging.getLogger("prefork")
+
+UPDATE_INTERVAL_SECONDS = 15 * 60
+RETIRE_TIMEOUT_SECONDS = 30
+
+
+def _bind_shared_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(cfg: Config, data_repo: DataRepository, shared: socket.socket, run_dir: Path) -> None:
+    """worker 进程主体，不会返回。"""
+    # fork 出来的进程沿用父进程的信号处理，交还给 uvicorn 自己安装
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    socket_path = run_dir / f"worker-{os.getpid()}.sock"
+    socket_path.unlink(missing_ok=True)
+    uds = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    uds.bind(str(socket_path))
+    uds.listen(128)
+
+    async def context_factory() -> AppContext:
+        return build_context_from_repository(cfg, data_repo)
+
+    app = create_app(cfg, context_factory=context_factory, periodic_update=False)
+    app.add_middleware(SseAffinityMiddleware, run_dir=run_dir, socket_path=socket_path)
+
+    code = 0
+    try:
+        server = uvicorn.Server(uvicorn.Config(app, host=HOST, port=PORT))
+        server.run(sockets=[shared, uds])
+    except BaseException:
+        log.exception("Worker %s crashed", os.getpid())
+        code = 1
+    finally:
+        uds.close()
+        socket_path.unlink(missing_ok=True)
+        os._exit(code)
+
+
+class PreforkSupervisor:
+    def __init__(self, cfg: Config, workers: int):
+        self.cfg = cfg
+        self.workers = max(1, workers)
+        self.run_dir = Path(cfg.ResourcePath) / "run"
+        self.data_repo = DataRepository(cfg=cfg)
+        self.children: Dict[int, int] = {}  # pid -> slot
+        self.retiring: Dict[int, float] = {}  # pid -> SIGKILL 的截止时间（monotonic）
+        self._stopping = False
+        self._update_thread: threading.Thread | None = None
+        self._update_result = False
+
+    def run(self) -> None:
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+
+        self.data_repo.prepare_blocking(True)
+        self._freeze()
+
+        shared = _bind_shared_socket()
+        self.shared = shared
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+
+        for slot in range(self.workers):
+            self._spawn(slot)
+        log.info("Prefork started: %d workers on %s:%d", self.workers, HOST, PORT)
+
+        next_update = time.monotonic() + UPDATE_INTERVAL_SECONDS
+        try:
+            while not self._stopping:
+                self._reap_and_respawn()
+                if time.monotonic() >= next_update:
+                    next_update = time.monotonic() + UPDATE_INTERVAL_SECONDS
+                    self._start_update()
+                self._poll_update()
+                self._kill_overdue()
+                time.sleep(1)
+        finally:
+            self._retire(list(self.children))
+            self._drain_retiring()
+            shared.close()
+
+    # ---------- internal ----------
+
+    def _freeze(self) -> None:
+        # 把 bundle 相关对象移入永久代：子进程里 GC 不会再触碰这些对象的引用计数/GC 头
+        gc.collect()
+        gc.freeze()
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(self.cfg, self.data_repo, self.shared, self.run_dir)
+        self.children[pid] = slot
+
+    def _reap_and_respawn(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                # 已经没有子进程了
+                self.retiring.clear()
+                return
+            if pid == 0:
+                return
+            if self.retiring.pop(pid, None) is not None:
+                continue
+            slot = self.children.pop(pid, None)
+            if slot is not None and not self._stopping:
+                log.warning("Worker %d exited (status=%d), respawning slot %d", pid, status, slot)
+                self._spawn(slot)
+
+    def _start_update(self) -> None:
+        """在后台线程中执行数据更新；上一次更新还没结束时跳过。"""
+        if self._update_thread is not None:
+            return
+
+        def update() -> None:
+            try:
+                self._update_result = self.data_repo.update_blocking()
+            except Exception:
+                log.exception("data_repository.update failed")
+                self._update_result = False
+
+        self._update_result = False
+        # daemon：退出时不等待进行中的 git pull
+        self._update_thread = threading.Thread(target=update, name="prefork-update", daemon=True)
+        self._update_thread.start()
+
+    def _poll_update(self) -> None:
+        thread = self._update_thread
+        if thread is None or thread.is_alive():
+            return
+        self._update_thread = None
+        if self._update_result and not self._stopping:
+            self._recycle()
+
+    def _recycle(self) -> None:
+        # 新 bundle 已在父进程内存中：fork 新一代 worker 后再让旧 worker 优雅退出
+        gc.unfreeze()
+        self._freeze()
+
+        old = list(self.children)
+        for slot in range(self.workers):
+            self._spawn(slot)
+        self._retire(old)
+        log.info("Workers recycled for bundle version %s", self.data_repo.get_bundle().version)
+
+    def _retire(self, pids: list[int]) -> None:
+        """向旧 worker 发送 SIGTERM 后立即返回；回收与超时强杀由监督循环完成。"""
+        deadline = time.monotonic() + RETIRE_TIMEOUT_SECONDS
+        for pid in pids:
+            self.children.pop(pid, None)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            self.retiring[pid] = deadline
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now < deadline:
+                continue
+            log.warning("Worker %d did not exit in time, killing", pid)
+            # 之后由 _reap_and_respawn 回收；截止时间顺延，避免每轮重复发送
+            self.retiring[pid] = float("inf")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def _drain_retiring(self) -> None:
+        """退出时等待所有退出中的 worker（超时强杀）。"""
+        while self.retiring:
+            self._reap_and_respawn()
+            self._kill_overdue()
+            if self.retiring:
+                time.sleep(0.2)
+
+    def _on_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+
+def prefork_main(workers: int):
+    if sys.platform == "win32":
+        raise RuntimeError("prefork 模式依赖 os.fork，Windows 下请使用单进程模式")
+
+    cfg = load_from_disk()
+    PreforkSupervisor(cfg, workers).run()
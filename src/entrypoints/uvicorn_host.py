@@ -1,20 +1,24 @@
 # src/entrypoints/uvicorn_host.py
 from fastapi import FastAPI
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 import uvicorn
 
 import asyncio
 import logging
+from typing import Awaitable, Callable, Optional
 
 from fastapi.middleware.cors import CORSMiddleware
 from src.app.bootstrap_disk import build_context_from_disk
 from src.adapters.mcp.app import register_asgi
-from src.app.card_fileservier import register_cardserver_asgi
+from src.app.card_fileserver import register_cardserver_asgi
 from src.app.context import AppContext
-from src.app.config import load_from_disk
+from src.app.config import Config, load_from_disk
 
 log = logging.getLogger("asset")
 
+HOST = "0.0.0.0"
+PORT = 9000
+
 
 async def _periodic_update_loop(app: FastAPI, interval_seconds: int = 15 * 60):
     while True:
@@ -34,25 +38,45 @@ async def _periodic_update_loop(app: FastAPI, interval_seconds: int = 15 * 60):
             log.exception("data_repository.update failed")
 
 
-def uvicorn_main():
-
-    cfg = load_from_disk()
+def create_app(
+    cfg: Config,
+    *,
+    context_factory: Optional[Callable[[], Awaitable[AppContext]]] = None,
+    periodic_update: bool = True,
+) -> FastAPI:
+    """
+    构造 FastAPI 应用。
+    - context_factory：默认从磁盘构造上下文；prefork worker 传入复用父进程 bundle 的工厂
+    - periodic_update：是否在本进程内定时更新数据（prefork 模式由父进程负责，worker 关闭）
+    """
+    if context_factory is None:
+        async def context_factory() -> AppContext:
+            return await build_context_from_disk(cfg)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
-        ctx = await build_context_from_disk(cfg)
+        ctx = await context_factory()
         app.state.ctx = ctx
 
-        task = asyncio.create_task(_periodic_update_loop(app, interval_seconds=15 * 60))
+        task = None
+        if periodic_update:
+            task = asyncio.create_task(_periodic_update_loop(app, interval_seconds=15 * 60))
 
         try:
-            yield
+            async with AsyncExitStack() as stack:
+                mcp = getattr(app.state, "mcp", None)
+                if mcp is not None:
+                    # streamable HTTP 传输需要 session manager 常驻
+                    await stack.enter_async_context(mcp.session_manager.run())
+                yield
         finally:
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            await ctx.card_service.aclose()
 
     app = FastAPI(lifespan=lifespan)
 
@@ -71,6 +95,21 @@ def uvicorn_main():
 
     @app.get("/rest/status")
     async def status():
-        return {"status": "ok"}
+        ctx = getattr(app.state, "ctx", None)
+        if not isinstance(ctx, AppContext):
+            return {"status": "ok"}
+        status = {"status": "ok", "renderer": ctx.card_service.render_status()}
+        tool_cache = getattr(app.state, "tool_cache", None)
+        if tool_cache is not None:
+            status["tool_cache"] = tool_cache.stats()
+        return status
+
+    return app
+
+
+def uvicorn_main():
+
+    cfg = load_from_disk()
+    app = create_app(cfg)
 
-    uvicorn.run(app, host="0.0.0.0", port=9000)
+    uvicorn.run(app, host=HOST, port=PORT)
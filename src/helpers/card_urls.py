@@ -5,6 +5,7 @@ from urllib.parse import quote
 
 from fastapi import Request
 
+from src.app.card_service import CardArtifact
 from src.app.config import Config
 
 
@@ -17,6 +18,7 @@ def build_card_url(
     template: str,
     payload_key: str,
     format: str,
+    revision: str = "",
     mount_path: str = DEFAULT_MOUNT_PATH,
 ) -> str:
     """
@@ -28,19 +30,38 @@ def build_card_url(
         raise RuntimeError("Config.BaseUrl is required to build card URL")
 
     payload_key_url = quote(payload_key, safe="")
+    revision_part = f"/{revision}" if revision else ""
 
     return (
         base.rstrip("/")
-        + f"{mount_path}/{template}/{payload_key_url}/artifact.{format}"
+        + f"{mount_path}/{template}/{payload_key_url}{revision_part}/artifact.{format}"
     )
 
 
+def build_artifact_url(
+    *,
+    cfg: Config,
+    artifact: CardArtifact,
+    mount_path: str = DEFAULT_MOUNT_PATH,
+) -> str:
+    """
+    直接用 CardService 返回的产物构造 URL（包含模板版本号等路径信息）
+    依赖 cfg 中的 BaseUrl
+    """
+    base = getattr(cfg, "BaseUrl", None)
+    if not base:
+        raise RuntimeError("Config.BaseUrl is required to build card URL")
+
+    return base.rstrip("/") + f"{mount_path}/{artifact.url_path}"
+
+
 def build_card_url_from_request(
     request: Request,
     *,
     template: str,
     payload_key: str,
     format: str,
+    revision: str = "",
     mount_path: str = DEFAULT_MOUNT_PATH,
 ) -> str:
     """
@@ -48,8 +69,9 @@ def build_card_url_from_request(
     自动从 request.base_url 推导 host/scheme
     """
     payload_key_url = quote(payload_key, safe="")
+    revision_part = f"/{revision}" if revision else ""
 
     return (
         str(request.base_url).rstrip("/")
-        + f"{mount_path}/{template}/{payload_key_url}/artifact.{format}"
+        + f"{mount_path}/{template}/{payload_key_url}{revision_part}/artifact.{format}"
     )
@@ -0,0 +1,58 @@
+# src/helpers/circuit_breaker.py
+from __future__ import annotations
+
+import time
+
+
+class CircuitBreaker:
+    """
+    简单的熔断器：
+    - closed：正常放行，连续失败达到 failure_threshold 次后打开
+    - open：reset_timeout 秒内直接拒绝（快速失败）
+    - half_open：冷却结束后只放行一次试探，成功则关闭，失败则重新打开
+
+    只在事件循环线程中使用，不加锁。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, *, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        self._state = self.CLOSED
+
+    def release(self) -> None:
+        """试探请求被取消（既不算成功也不算失败）时调用，允许下一次试探。"""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self._state != self.CLOSED or self.failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
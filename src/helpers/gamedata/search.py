@@ -1,6 +1,6 @@
 
 from typing import Any, Literal
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from difflib import SequenceMatcher
 from typing import Callable, List, Optional, Sequence, Union
 
@@ -334,6 +334,53 @@ def search_source_spec(
 
     return SearchResults(matches=deduped)
 
+def search_source_spec_many(
+    queries: Sequence[QueryInput],
+    *,
+    sources: List[SourceSpec],
+    n: int = 10,
+    exact_only: bool = False,
+    min_sim: float = 0.2,
+) -> List[SearchResults]:
+    """
+    一次搜索多组查询，返回与 queries 一一对应的 SearchResults（规则与 search_source_spec 相同）。
+
+    每个 SourceSpec 的候选列表只取一次，在所有查询之间复用，
+    避免批量查询时为每个名字重复构建候选集。
+    """
+    snapshot = [
+        replace(spec, candidates=(lambda cand=tuple(spec.candidates()): cand))
+        for spec in sources
+    ]
+    return [
+        search_source_spec(q, sources=snapshot, n=n, exact_only=exact_only, min_sim=min_sim)
+        for q in queries
+    ]
+
+def pick_unique_match(
+    results: SearchResults,
+    key: str,
+    preferred: Sequence[str] = (),
+) -> tuple[Optional[MatchResult], List[str]]:
+    """
+    从搜索结果中取唯一命中：
+    - key 下只有一个命中时直接返回
+    - 否则按 preferred 的顺序找精确等于该文本的命中（如先“前缀+名字”，再“名字”）
+    - 仍不唯一时返回 (None, 去重后的候选文本)，由调用方提示用户选择
+    """
+    matches = results.by_key(key)
+    if len(matches) == 1:
+        return matches[0], []
+
+    for text in preferred:
+        exact = [m for m in matches if m.matched_text == text]
+        if len(exact) == 1:
+            return exact[0], []
+        if exact:
+            break
+
+    return None, list(dict.fromkeys(m.matched_text for m in matches))
+
 def build_sources(bundle: DataBundle, source_key: Optional[List[str]] = None) -> List[SourceSpec]:
 
     all_source = [
@@ -0,0 +1,97 @@
+# src/helpers/json_codec.py
+"""
+项目统一的 JSON 编解码入口。
+
+- 安装了 orjson 时用它解码/紧凑编码，否则回退到标准库 json
+- 支持直接从 bytes / memoryview / mmap 切片解码，避免先 decode 成 str
+- pretty=True 的输出（落盘的 JSON 卡片产物）固定走标准库，
+  保证换后端后缓存文件逐字节不变
+- 同理，MCP 工具返回给客户端的 JSON 文本直接用标准库 json.dumps，不经过这里
+"""
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Union
+
+logger = logging.getLogger(__name__)
+
+JsonInput = Union[str, bytes, bytearray, memoryview]
+
+
+@dataclass(frozen=True)
+class JsonBackend:
+    name: str
+    loads: Callable[[JsonInput], Any]
+    dumps: Callable[[Any], str]
+
+
+def _stdlib_loads(data: JsonInput) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _load_backends() -> Dict[str, JsonBackend]:
+    backends = {"stdlib": JsonBackend("stdlib", _stdlib_loads, _stdlib_dumps)}
+
+    try:
+        import orjson
+    except ImportError:
+        return backends
+
+    def _orjson_dumps(obj: Any) -> str:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            # 非 str key、超 64 位整数等 orjson 不支持的情况
+            return _stdlib_dumps(obj)
+
+    backends["orjson"] = JsonBackend("orjson", orjson.loads, _orjson_dumps)
+    return backends
+
+
+BACKENDS: Dict[str, JsonBackend] = _load_backends()
+_current: JsonBackend = BACKENDS.get("orjson") or BACKENDS["stdlib"]
+
+
+def backend_name() -> str:
+    return _current.name
+
+
+def select_backend(name: str) -> None:
+    """切换后端（主要用于 benchmark / 排查问题）。"""
+    global _current
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend {name} is not available. Installed: {list(BACKENDS)}")
+    _current = BACKENDS[name]
+
+
+def loads(data: JsonInput) -> Any:
+    return _current.loads(data)
+
+
+def load_path(path: Path) -> Any:
+    """整文件解码：mmap 后直接交给后端，不经过 str。"""
+    with path.open("rb") as f:
+        if f.seek(0, 2) == 0:
+            return _current.loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf, memoryview(buf) as view:
+            return _current.loads(view)
+
+
+def dumps(obj: Any, *, pretty: bool = False) -> str:
+    """
+    pretty=False：紧凑输出，可能使用快速后端（分隔符可能与标准库不同）
+    pretty=True：固定为标准库 ensure_ascii=False, indent=2
+    """
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return _current.dumps(obj)
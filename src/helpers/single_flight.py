@@ -0,0 +1,58 @@
+# src/helpers/single_flight.py
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    按 key 合并并发的同一操作：同一时刻同一个 key 只执行一次 fn，其余调用方共享同一个结果。
+
+    - 每个 key 只在执行期间占一个条目，完成（成功/失败/取消）后立即移除，
+      注册表大小 = 正在执行的 key 数，不随历史 key 增长
+    - 调用方拿到的是同一个 Task 的结果（或异常），不需要再各自检查磁盘
+    - 单个调用方被取消不会取消共享的执行（其他调用方还在等）；执行本身的期限由 fn 自己负责
+
+    只在事件循环线程中使用。
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        return await asyncio.shield(self.start(key, fn))
+
+    def start(self, key: str, fn: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        """
+        同步地占下 key 并返回共享的 Task（key 已在执行时返回已有的 Task，fn 不会被调用）。
+        需要先占住一批 key、再统一执行时使用（例如批量渲染）；等待结果时请用 asyncio.shield 包一层。
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+        return task
+
+    async def wait(self, key: str) -> Any:
+        """等待 key 上正在进行的执行（没有则立即返回 None）。"""
+        task = self._calls.get(key)
+        if task is None:
+            return None
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 所有调用方都已取消时没人取结果，这里取一次避免 "exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,280 @@
+"""
+/cards 文件服务的请求级行为：ETag/304、Range/If-Range（206/416）、.br/.gz 预压缩协商、HEAD、
+404 与 Cache-Control。
+
+大部分用例不带 CardService（get_card_service 返回 None，只看磁盘），产物直接写进缓存目录；
+最后一个用例用真实的 CardService 渲染文本卡片，ETag 取自产物清单。
+"""
+import asyncio
+import gzip
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+
+from starlette.testclient import TestClient
+
+from src.app.card_fileserver import DEFAULT_CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL, CardFileServer
+from src.app.card_manifest import content_etag
+from src.app.card_service import CardService
+from src.app.config import Config
+
+REVISION = "0123456789ab"
+TEXT = "能天使 · 第3技能 · 专精三\n".encode("utf-8") * 50
+# brotli 是可选依赖：副本内容由测试直接写入，服务端只按文件名协商，不解码
+BR_BODY = b"fake brotli body"
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+@pytest.fixture
+def cache_root(tmp_path: Path) -> Path:
+    root = tmp_path / "cards"
+    card_dir = root / "operator_skill" / "char_002_amiya" / REVISION
+    card_dir.mkdir(parents=True)
+    (card_dir / "artifact.txt").write_bytes(TEXT)
+    (card_dir / "artifact.txt.gz").write_bytes(gzip.compress(TEXT, mtime=0))
+    (card_dir / "artifact.txt.br").write_bytes(BR_BODY)
+    (card_dir / "artifact.png").write_bytes(PNG)
+    # 无版本号的路径：不是 immutable
+    (root / "plain").mkdir()
+    (root / "plain" / "artifact.json").write_bytes(b'{"a": 1}')
+    (root / "notes.bin").write_bytes(b"x")
+    return root
+
+
+@pytest.fixture
+def client(cache_root: Path):
+    server = CardFileServer(cache_root, lambda: None)
+    with TestClient(server.asgi()) as c:
+        yield c
+
+
+TXT_URL = f"/operator_skill/char_002_amiya/{REVISION}/artifact.txt"
+PNG_URL = f"/operator_skill/char_002_amiya/{REVISION}/artifact.png"
+
+
+def _raw(client: TestClient, url: str, headers: dict):
+    """不经 httpx 自动解码，拿到原始响应体（br 副本未必能被本地解码）。"""
+    with client.stream("GET", url, headers=headers) as r:
+        return r, b"".join(r.iter_raw())
+
+
+# ---------- ETag / 304 ----------
+
+def test_get_returns_body_with_strong_etag(client):
+    r = client.get(PNG_URL, headers=IDENTITY)
+    assert r.status_code == 200
+    assert r.content == PNG
+    assert r.headers["etag"] == f'"{content_etag(PNG)}"'
+    assert r.headers["content-type"] == "image/png"
+    assert r.headers["accept-ranges"] == "bytes"
+    # 非文本产物没有预压缩副本，也就不需要 Vary
+    assert "vary" not in r.headers
+
+
+@pytest.mark.parametrize("header", [
+    '"{etag}"',
+    'W/"{etag}"',
+    '"other", "{etag}"',
+    "*",
+])
+def test_if_none_match_returns_304(client, header):
+    etag = content_etag(PNG)
+    r = client.get(PNG_URL, headers={**IDENTITY, "If-None-Match": header.format(etag=etag)})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == f'"{etag}"'
+    assert r.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+
+def test_if_none_match_mismatch_returns_200(client):
+    r = client.get(PNG_URL, headers={**IDENTITY, "If-None-Match": '"stale"'})
+    assert r.status_code == 200
+    assert r.content == PNG
+
+
+# ---------- Range / If-Range ----------
+
+def test_range_returns_206(client):
+    r = client.get(PNG_URL, headers={**IDENTITY, "Range": "bytes=8-15"})
+    assert r.status_code == 206
+    assert r.content == PNG[8:16]
+    assert r.headers["content-range"] == f"bytes 8-15/{len(PNG)}"
+
+
+def test_open_and_suffix_ranges(client):
+    r = client.get(PNG_URL, headers={**IDENTITY, "Range": "bytes=1000-"})
+    assert r.status_code == 206
+    assert r.content == PNG[1000:]
+    assert r.headers["content-range"] == f"bytes 1000-{len(PNG) - 1}/{len(PNG)}"
+
+    r = client.get(PNG_URL, headers={**IDENTITY, "Range": "bytes=-10"})
+    assert r.status_code == 206
+    assert r.content == PNG[-10:]
+
+    # 末尾越界按文件末尾截断
+    r = client.get(PNG_URL, headers={**IDENTITY, "Range": f"bytes=0-{len(PNG) * 2}"})
+    assert r.status_code == 206
+    assert r.content == PNG
+
+
+@pytest.mark.parametrize("header", [f"bytes={len(PNG)}-", "bytes=20-10", "bytes=-0"])
+def test_unsatisfiable_range_returns_416(client, header):
+    r = client.get(PNG_URL, headers={**IDENTITY, "Range": header})
+    assert r.status_code == 416
+    assert r.headers["content-range"] == f"bytes */{len(PNG)}"
+
+
+@pytest.mark.parametrize("header", ["bytes=0-1,4-5", "items=0-1", "bytes=-"])
+def test_unsupported_range_returns_full_body(client, header):
+    r = client.get(PNG_URL, headers={**IDENTITY, "Range": header})
+    assert r.status_code == 200
+    assert r.content == PNG
+
+
+def test_if_range(client):
+    etag = f'"{content_etag(PNG)}"'
+    r = client.get(PNG_URL, headers={**IDENTITY, "Range": "bytes=0-3", "If-Range": etag})
+    assert r.status_code == 206
+    assert r.content == PNG[:4]
+
+    # 表示已变化：忽略 Range，返回完整内容
+    r = client.get(PNG_URL, headers={**IDENTITY, "Range": "bytes=0-3", "If-Range": '"stale"'})
+    assert r.status_code == 200
+    assert r.content == PNG
+
+
+# ---------- 预压缩协商 ----------
+
+def test_brotli_preferred_over_gzip(client):
+    r, body = _raw(client, TXT_URL, {"Accept-Encoding": "gzip, br"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "br"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.headers["etag"] == f'"{content_etag(TEXT)}-br"'
+    assert r.headers["content-type"] == "text/plain; charset=utf-8"
+    assert body == BR_BODY
+
+
+def test_gzip_when_br_not_accepted(client):
+    r, body = _raw(client, TXT_URL, {"Accept-Encoding": "gzip, br;q=0"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["etag"] == f'"{content_etag(TEXT)}-gzip"'
+    assert gzip.decompress(body) == TEXT
+
+
+def test_identity_when_nothing_accepted(client):
+    r, body = _raw(client, TXT_URL, {"Accept-Encoding": "deflate"})
+    assert "content-encoding" not in r.headers
+    # 仍然声明 Vary：同一 URL 会按 Accept-Encoding 返回不同表示
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.headers["etag"] == f'"{content_etag(TEXT)}"'
+    assert body == TEXT
+
+
+def test_encoded_etag_is_compared_per_representation(client):
+    etag = content_etag(TEXT)
+    r = client.get(TXT_URL, headers={"Accept-Encoding": "gzip", "If-None-Match": f'"{etag}-gzip"'})
+    assert r.status_code == 304
+    # 未编码表示的 ETag 不能让 gzip 表示命中 304
+    r, body = _raw(client, TXT_URL, {"Accept-Encoding": "gzip", "If-None-Match": f'"{etag}"'})
+    assert r.status_code == 200
+    assert gzip.decompress(body) == TEXT
+
+
+def test_range_skips_precompressed_copies(client):
+    r, body = _raw(client, TXT_URL, {"Accept-Encoding": "gzip, br", "Range": "bytes=0-9"})
+    assert r.status_code == 206
+    assert "content-encoding" not in r.headers
+    assert body == TEXT[:10]
+
+
+def test_missing_copy_falls_back_to_identity(client, cache_root):
+    (cache_root / "operator_skill" / "char_002_amiya" / REVISION / "artifact.txt.br").unlink()
+    (cache_root / "operator_skill" / "char_002_amiya" / REVISION / "artifact.txt.gz").unlink()
+    r, body = _raw(client, TXT_URL, {"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in r.headers
+    assert body == TEXT
+
+
+# ---------- HEAD ----------
+
+def test_head_has_headers_without_body(client):
+    r = client.head(PNG_URL, headers=IDENTITY)
+    assert r.status_code == 200
+    assert r.content == b""
+    assert r.headers["content-length"] == str(len(PNG))
+    assert r.headers["etag"] == f'"{content_etag(PNG)}"'
+
+    r = client.head(PNG_URL, headers={**IDENTITY, "Range": "bytes=0-9"})
+    assert r.status_code == 206
+    assert r.content == b""
+    assert r.headers["content-length"] == "10"
+    assert r.headers["content-range"] == f"bytes 0-9/{len(PNG)}"
+
+
+def test_head_with_encoding_reports_encoded_length(client):
+    r = client.head(TXT_URL, headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["content-length"] == str(len(gzip.compress(TEXT, mtime=0)))
+
+
+# ---------- 404 / Cache-Control ----------
+
+@pytest.mark.parametrize("url", [
+    "/",
+    "/missing/artifact.png",
+    "/notes.bin",                          # 不对外提供的扩展名
+    "/plain/../../outside.txt",            # 越出缓存根目录
+    "/plain/%2e%2e/%2e%2e/outside.txt",
+    f"/operator_skill/char_002_amiya/{REVISION}/artifact.webp",  # 没有 CardService 时不现场转码
+])
+def test_not_found(client, cache_root, url):
+    (cache_root.parent / "outside.txt").write_text("secret", encoding="utf-8")
+    r = client.get(url, headers=IDENTITY)
+    assert r.status_code == 404
+    assert b"secret" not in r.content
+
+
+def test_cache_control_depends_on_revision_path(client):
+    assert client.get(PNG_URL, headers=IDENTITY).headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    r = client.get("/plain/artifact.json", headers=IDENTITY)
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == DEFAULT_CACHE_CONTROL
+    assert r.headers["content-type"] == "application/json"
+
+
+# ---------- 与 CardService 配合 ----------
+
+def test_serves_rendered_card_with_manifest_etag(tmp_path):
+    template_dir = tmp_path / "project" / "data" / "templates" / "hello"
+    template_dir.mkdir(parents=True)
+    (template_dir / "hello.txt.j2").write_text("你好，{{ name }}\n" * 40, encoding="utf-8")
+    service = CardService(Config(ProjectRoot=tmp_path / "project", ResourcePath=tmp_path / "resources"))
+    try:
+        artifact = asyncio.run(service.get(template="hello", payload_key="amiya", payload={"name": "阿米娅"}, format="txt"))
+        expected = artifact.path.read_bytes()
+        entry = service.manifest.get(artifact.path)
+        assert entry is not None and entry.etag == content_etag(expected)
+
+        server = CardFileServer(service.cache_root, lambda: service)
+        url = "/" + artifact.path.relative_to(service.cache_root).as_posix()
+        with TestClient(server.asgi()) as c:
+            r = c.get(url, headers=IDENTITY)
+            assert r.status_code == 200
+            assert r.content == expected
+            assert r.headers["etag"] == f'"{entry.etag}"'
+            assert r.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+            # 写入时生成的 gzip 副本同样记录在清单中
+            r, body = _raw(c, url, {"Accept-Encoding": "gzip"})
+            assert r.headers["content-encoding"] == "gzip"
+            assert gzip.decompress(body) == expected
+
+            assert c.get(url.replace("amiya", "nobody"), headers=IDENTITY).status_code == 404
+    finally:
+        service.close()
@@ -0,0 +1,147 @@
+"""
+CardService 的模板渲染、编码与文件读写都在有界的 IO 线程池（card-io）中执行：
+渲染进行时，事件循环上的其他协程（这里是一个心跳）仍然能运行。
+
+不比较时间：渲染函数在线程里阻塞等待，直到心跳在事件循环上跑满 HEARTBEATS 次才放行。
+渲染如果在事件循环上执行，心跳永远跑不了，等待超时即失败。
+"""
+import asyncio
+import threading
+from pathlib import Path
+
+from src.app.card_service import CardService
+from src.app.config import Config
+
+CARDS = 4
+HEARTBEATS = 5
+# 只在失败时才会等满：渲染阻塞了事件循环，心跳不可能再跑
+BLOCK_TIMEOUT = 10.0
+
+TEMPLATE = """{% for i in range(rows) %}{{ i }} {{ name }}
+{% endfor %}"""
+
+
+def _service(tmp_path: Path, *, fsync: bool, dev_mode: bool = False) -> CardService:
+    template_dir = tmp_path / "project" / "data" / "templates" / "big"
+    template_dir.mkdir(parents=True)
+    (template_dir / "big.txt.j2").write_text(TEMPLATE, encoding="utf-8")
+    cfg = Config(ProjectRoot=tmp_path / "project", ResourcePath=tmp_path / "resources", DevMode=dev_mode)
+    return CardService(cfg, fsync=fsync)
+
+
+def _record_threads(service: CardService, threads: dict[str, list[str]], released: threading.Event) -> None:
+    """包装渲染与写入：记录所在线程名；渲染在心跳跑够之前一直阻塞。"""
+    renderer = service.text_renderer
+    render = renderer.render
+    write = service._atomic_write_sync
+
+    def blocking_render(*args, **kwargs):
+        threads["render"].append(threading.current_thread().name)
+        threads["unblocked"].append(str(released.wait(BLOCK_TIMEOUT)))
+        return render(*args, **kwargs)
+
+    def recording_write(path, content, *args):
+        # 收到的还是 str：编码也发生在这里（IO 线程）
+        threads["write"].append(threading.current_thread().name)
+        threads["write_types"].append(type(content).__name__)
+        return write(path, content, *args)
+
+    renderer.render = blocking_render
+    service._atomic_write_sync = recording_write
+
+
+async def _render_with_heartbeat(service: CardService, released: threading.Event) -> tuple[int, list]:
+    beats = 0
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal beats
+        while not stop.is_set():
+            await asyncio.sleep(0.001)
+            beats += 1
+            if beats >= HEARTBEATS:
+                released.set()
+
+    beat = asyncio.create_task(heartbeat())
+    artifacts = await asyncio.gather(*(
+        service.get(template="big", payload_key=f"card{i}", payload={"rows": 100, "name": f"干员{i}"}, format="txt")
+        for i in range(CARDS)
+    ))
+    stop.set()
+    await beat
+    await service.aclose()
+    return beats, artifacts
+
+
+def test_event_loop_stays_responsive_during_renders(tmp_path):
+    service = _service(tmp_path, fsync=True)
+    released = threading.Event()
+    threads: dict[str, list[str]] = {"render": [], "unblocked": [], "write": [], "write_types": []}
+    _record_threads(service, threads, released)
+
+    beats, artifacts = asyncio.run(_render_with_heartbeat(service, released))
+
+    assert all(a.path.stat().st_size > 0 for a in artifacts)
+    # 渲染阻塞期间心跳照常运行，渲染被放行而不是等到超时
+    assert beats >= HEARTBEATS
+    assert threads["unblocked"] == ["True"] * CARDS
+    # 渲染与写入（含编码）都发生在 CardService 的 IO 线程池
+    assert len(threads["render"]) == CARDS
+    assert all(name.startswith("card-io") for name in threads["render"]), threads["render"]
+    assert len(threads["write"]) == CARDS
+    assert all(name.startswith("card-io") for name in threads["write"]), threads["write"]
+    assert threads["write_types"] == ["str"] * CARDS
+
+
+def test_native_png_uses_io_pool(tmp_path):
+    service = _service(tmp_path, fsync=False)
+    try:
+        assert service.native_png.executor is service._io_pool
+    finally:
+        service.close()
+
+
+def test_dev_mode_rescan_runs_on_io_pool(tmp_path):
+    """DevMode 下模板目录的重扫（rglob + stat）在 IO 线程池执行，改动后换到新的版本目录。"""
+    service = _service(tmp_path, fsync=False, dev_mode=True)
+    loader = service.loader
+    scans: list[str] = []
+    scan = loader._scan_signature
+
+    def recording_scan():
+        scans.append(threading.current_thread().name)
+        return scan()
+
+    loader._scan_signature = recording_scan
+
+    async def main() -> tuple[str, str]:
+        payload = {"rows": 1, "name": "干员"}
+        before = await service.get(template="big", payload_key="k", payload=payload, format="txt")
+        template = tmp_path / "project" / "data" / "templates" / "big" / "big.txt.j2"
+        template.write_text(TEMPLATE + "改动\n", encoding="utf-8")
+        # 跳过检查间隔
+        loader._last_check = 0.0
+        # 取版本号本身不扫目录
+        assert loader.template_hash("big") == before.revision
+        after = await service.get(template="big", payload_key="k", payload=payload, format="txt")
+        text = await service.get_text(template="big", payload_key="k", payload=payload)
+        await service.aclose()
+        assert text.endswith("改动")
+        return before.revision, after.revision
+
+    before, after = asyncio.run(main())
+
+    assert before != after
+    assert scans, "template directory was never rescanned"
+    assert all(name.startswith("card-io") for name in scans), scans
+
+
+def test_fsync_follows_config(tmp_path):
+    cfg = Config(ProjectRoot=tmp_path, ResourcePath=tmp_path / "resources", FsyncCards=True)
+    from src.app.bootstrap_disk import build_context_from_repository
+
+    ctx = build_context_from_repository(cfg, data_repo=None)
+    try:
+        assert ctx.card_service._fsync is True
+    finally:
+        ctx.card_service.close()
@@ -0,0 +1,112 @@
+"""
+JSON 字节扫描器与记录偏移索引：扫描得到的区间直接用于 mmap 切片解码，
+区间必须与标准 json 解析的结果逐条一致（转义、字符串内的括号、非 ASCII 都不能错位）。
+"""
+import json
+import mmap
+
+import pytest
+
+from src.data.loader._json_scanner import (
+    JsonScanError,
+    find_path,
+    iter_object_members,
+    iter_subtrees,
+    scan_value_end,
+)
+from src.data.loader._table_index import TableIndex, build_table_index
+
+TRICKY = {
+    'quote"key': 'value with "quotes"',
+    "back\\slash": "ends with backslash \\",
+    "escaped\\\"both": "\\\"",
+    "braces": "{not an object} [nor an array] }}]]",
+    "nested": {"inner {": ["}", "]", {"deep": "{\\\"x\\\": 1}"}]},
+    "干员": "能天使 · 「超高速」",
+    "emoji 🍎": "😀 ☃",
+    "unicode\\u escape": "\u00e9\u4e2d",
+    "numbers": [1, -2.5e3, 0, True, False, None],
+    "empty": {},
+    "empty_list": [],
+    "": "empty key",
+}
+
+
+def _dumps(obj, *, ensure_ascii: bool, indent=None) -> bytes:
+    return json.dumps(obj, ensure_ascii=ensure_ascii, indent=indent).encode("utf-8")
+
+
+@pytest.mark.parametrize("ensure_ascii", [False, True])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_members_match_json_loads(ensure_ascii, indent):
+    buf = _dumps(TRICKY, ensure_ascii=ensure_ascii, indent=indent)
+
+    members = list(iter_object_members(buf, 0))
+
+    assert [key for key, _, _ in members] == list(TRICKY)
+    for key, start, end in members:
+        assert json.loads(buf[start:end]) == TRICKY[key], key
+
+
+def test_scan_value_end_on_strings_with_escapes():
+    for value in ['a"b', "a\\", "\\\\\"", "}{][", "中文\"\\"]:
+        buf = _dumps(value, ensure_ascii=False) + b" ,"
+        end = scan_value_end(buf, 0)
+        assert json.loads(buf[:end]) == value
+
+
+def test_find_path_and_subtrees():
+    doc = {"charWords": {"a": {"text": "}"}, "b": 1}, "voiceLangDict": {"x": "{"}, "other": ["{"]}
+    buf = _dumps(doc, ensure_ascii=False, indent=1)
+
+    start, end = find_path(buf, ("charWords", "a"))
+    assert json.loads(buf[start:end]) == {"text": "}"}
+    assert find_path(buf, ("charWords", "missing")) is None
+    assert find_path(buf, ("other", "x")) is None
+
+    found = {path: json.loads(buf[s:e]) for path, (s, e) in iter_subtrees(buf, [("voiceLangDict",), ("charWords", "b")])}
+    assert found == {("voiceLangDict",): {"x": "{"}, ("charWords", "b"): 1}
+
+
+@pytest.mark.parametrize("broken", [b'{"a": "unterminated}', b'{"a": [1, 2}', b'{"a" 1}', b'{"a": 1 "b": 2}'])
+def test_broken_json_raises(broken):
+    with pytest.raises(JsonScanError):
+        list(iter_object_members(broken, 0))
+
+
+def test_scanner_works_on_mmap(tmp_path):
+    path = tmp_path / "t.json"
+    path.write_bytes(_dumps(TRICKY, ensure_ascii=False))
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        assert {k: json.loads(buf[s:e]) for k, s, e in iter_object_members(buf, 0)} == TRICKY
+
+
+@pytest.mark.parametrize("record_path", [(), ("charWords",)])
+def test_table_index_round_trip(tmp_path, record_path):
+    records = {
+        "char_002_amiya_CN_001": {"voiceTitle": "任命助理", "voiceText": "博士，\"罗德岛\"……{笑}"},
+        "char_002_amiya_CN_002": {"voiceTitle": "交谈1", "voiceText": "路径 C:\\\\prts\\\\"},
+        "char_003_kalts_CN_001": {"voiceTitle": "任命助理", "voiceText": "]}"},
+        "键\"含引号": [1, {"x": None}],
+    }
+    table = records
+    for part in reversed(record_path):
+        table = {"voiceLangDict": {"}": "{"}, part: table}
+    excel = tmp_path / "excel"
+    excel.mkdir()
+    (excel / "charword_table.json").write_text(json.dumps(table, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    assert build_table_index(tmp_path, "charword_table", record_path) is not None
+    index = TableIndex.open(tmp_path, "charword_table")
+    assert index is not None
+    try:
+        loaded = json.loads((excel / "charword_table.json").read_text(encoding="utf-8"))
+        for part in record_path:
+            loaded = loaded[part]
+        assert sorted(index.keys()) == sorted(loaded)
+        for key in loaded:
+            assert index.get(key) == loaded[key], key
+        assert index.get("missing", "default") == "default"
+        assert index.keys_with_prefix("char_002_") == ["char_002_amiya_CN_001", "char_002_amiya_CN_002"]
+    finally:
+        index.close()
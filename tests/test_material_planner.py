@@ -0,0 +1,155 @@
+"""
+养成材料汇总：UpgradeTarget 的前置条件补齐，以及 plan_materials 的逐项求和（含精英化龙门币）。
+干员用只带 from_operators 所需字段的轻量对象构造。
+"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.domain.models.cost_vectors import GOLD_ITEM_ID, CostVectors
+from src.domain.models.generic import MaterialCost
+from src.domain.models.operator import EvolveCostItem, OperatorPhase
+from src.domain.services.material_planner import MaterialPlanError, UpgradeTarget, plan_materials
+
+ITEMS = {
+    GOLD_ITEM_ID: {"name": "龙门币", "sortId": 1},
+    "chip": {"name": "芯片", "sortId": 2},
+    "book": {"name": "技巧概要", "sortId": 3},
+    "rock": {"name": "固源岩", "sortId": 4},
+    "mod": {"name": "模组数据块", "sortId": 5},
+}
+
+# gamedata_const.evolveGoldCost：[稀有度-1][精英化阶段-1]
+EVOLVE_GOLD = [[-1, -1], [-1, -1], [10000, -1], [15000, 60000], [20000, 120000], [30000, 180000]]
+
+
+def _phase(index: int, costs: list[tuple[str, int]] = ()) -> OperatorPhase:
+    return OperatorPhase(
+        phase_index=index,
+        character_prefab_key="",
+        range_id="",
+        max_level=0,
+        evolve_cost=[EvolveCostItem(id=i, count=c, type="MATERIAL") for i, c in costs],
+    )
+
+
+def _skill(name: str, book: int, rock: int):
+    """技能 2~7 级每级 book 本技巧概要，专精 1~3 每级 rock 个固源岩。"""
+    levels = [SimpleNamespace(level=lv, costs=[MaterialCost(count=book, material_id="book")]) for lv in range(2, 8)]
+    levels += [SimpleNamespace(level=lv, costs=[MaterialCost(count=rock, material_id="rock")]) for lv in range(8, 11)]
+    return SimpleNamespace(name=name, levels=levels)
+
+
+def _operator(rarity: int, *, phases: int = 3, skills=(), modules=()):
+    return SimpleNamespace(
+        rarity=rarity,
+        phases=[_phase(0), _phase(1, [("chip", 5)]), _phase(2, [("chip", 20)])][:phases],
+        skills=list(skills),
+        modules=list(modules),
+    )
+
+
+def _module(name: str, per_level: int):
+    level_costs = [
+        SimpleNamespace(level=lv, costs=[MaterialCost(count=per_level * lv, material_id="mod")])
+        for lv in (3, 1, 2)  # 乱序：按 level 排序
+    ]
+    return SimpleNamespace(name=name, level_costs=level_costs)
+
+
+@pytest.fixture
+def vectors() -> CostVectors:
+    operators = {
+        "six": _operator(6, skills=[_skill("一技能", 1, 10), _skill("二技能", 1, 20)], modules=[_module("X", 10)]),
+        "three": _operator(3, phases=2, skills=[_skill("一技能", 2, 5)]),
+    }
+    return CostVectors.from_operators(operators, ITEMS, EVOLVE_GOLD)
+
+
+def _plan(vectors, op_id: str, target: UpgradeTarget) -> dict:
+    plan = plan_materials(vectors, [(op_id, op_id, target)])
+    return dict(plan.total)
+
+
+# ---------- UpgradeTarget.normalized ----------
+
+def test_mastery_implies_elite2_and_skill7():
+    t = UpgradeTarget(mastery=1).normalized()
+    assert (t.elite, t.skill_level, t.mastery) == (2, 7, 1)
+
+
+def test_module_implies_elite2():
+    t = UpgradeTarget(module_level=1).normalized()
+    assert (t.elite, t.skill_level) == (2, 1)
+
+
+def test_skill_level_above_4_implies_elite1():
+    assert UpgradeTarget(skill_level=5).normalized().elite == 1
+    assert UpgradeTarget(skill_level=4).normalized().elite == 0
+    assert UpgradeTarget(elite=2, skill_level=5).normalized().elite == 2
+
+
+def test_skill_level_floor_is_1():
+    assert UpgradeTarget(skill_level=0).normalized().skill_level == 1
+
+
+@pytest.mark.parametrize("kwargs", [{"elite": 3}, {"skill_level": 8}, {"mastery": 4}, {"module_level": -1}])
+def test_out_of_range_target_is_rejected(kwargs):
+    with pytest.raises(MaterialPlanError):
+        UpgradeTarget(**kwargs).normalized()
+
+
+# ---------- plan_materials ----------
+
+def test_elite_promotion_includes_gold(vectors):
+    assert _plan(vectors, "six", UpgradeTarget(elite=1)) == {"龙门币": 30000, "芯片": 5}
+    assert _plan(vectors, "six", UpgradeTarget(elite=2)) == {"龙门币": 30000 + 180000, "芯片": 25}
+    # 三星只能精英一
+    assert _plan(vectors, "three", UpgradeTarget(elite=1)) == {"龙门币": 10000, "芯片": 5}
+
+
+def test_mastery_sums_prerequisites(vectors):
+    total = _plan(vectors, "six", UpgradeTarget(mastery=3, skills=[2]))
+    assert total == {
+        "龙门币": 210000,
+        "芯片": 25,
+        "技巧概要": 6,        # 技能 1→7（所有技能共用）
+        "固源岩": 20 * 3,     # 只专精二技能
+    }
+
+
+def test_mastery_of_all_skills(vectors):
+    total = _plan(vectors, "six", UpgradeTarget(mastery=2))
+    assert total["固源岩"] == 10 * 2 + 20 * 2
+
+
+def test_module_levels_are_summed_in_order(vectors):
+    total = _plan(vectors, "six", UpgradeTarget(module_level=2))
+    # 模组 1 级 10、2 级 20；同时补齐精英二
+    assert total == {"龙门币": 210000, "芯片": 25, "模组数据块": 30}
+
+
+def test_total_is_sum_of_operators(vectors):
+    target = UpgradeTarget(elite=1, skill_level=4)
+    plan = plan_materials(
+        vectors,
+        [("six", "six", target), ("three", "three", target), ("six", "six again", target)],
+    )
+    per_operator = [dict(p.items) for p in plan.operators]
+    expected: dict = {}
+    for items in per_operator:
+        for name, count in items.items():
+            expected[name] = expected.get(name, 0) + count
+    assert dict(plan.total) == expected
+    assert expected["龙门币"] == 30000 * 2 + 10000
+    # 按 item_table 的 sortId 排列
+    assert [name for name, _ in plan.total] == ["龙门币", "芯片", "技巧概要"]
+
+
+def test_unreachable_targets_warn(vectors):
+    plan = plan_materials(vectors, [("three", "three", UpgradeTarget(elite=2)), ("nobody", "nobody", UpgradeTarget())])
+    assert plan.operators[0].warnings == ["最高只能精英化到阶段1"]
+    assert plan.operators[1].warnings == ["没有养成材料数据"]
+    assert dict(plan.total) == {"龙门币": 10000, "芯片": 5}
@@ -0,0 +1,174 @@
+"""
+SingleFlight 的注册表只保存正在执行的 key：无论成功、失败还是取消，完成后条目都会移除，
+跑过 N 个 key 之后注册表为空，不随历史 key 增长。
+"""
+import asyncio
+import gc
+import tracemalloc
+
+import pytest
+
+from src.helpers.single_flight import SingleFlight
+
+N = 200
+
+MILLION = 1_000_000
+BATCH = 10_000
+# 一批结束后仍存活的分配上限（事件循环内部队列的扩容等一次性分配在内）：
+# 每个 key 哪怕只泄漏一个 Task（约 300 字节），一批 1 万个 key 也远超这个值
+MAX_RETAINED_BYTES = 512 * 1024
+# 末批相对首批的增长上限
+MAX_GROWTH_BYTES = 64 * 1024
+
+
+class _Boom(Exception):
+    pass
+
+
+def test_in_flight_map_is_empty_after_keys_complete():
+    flight = SingleFlight()
+    calls: dict[str, int] = {}
+
+    async def work(key: str, i: int):
+        calls[key] = calls.get(key, 0) + 1
+        await asyncio.sleep(0.001)
+        if i % 3 == 1:
+            raise _Boom(key)
+        return key
+
+    async def main():
+        # 每个 key 两个并发调用方：共享一次执行
+        pending = [
+            asyncio.ensure_future(flight.do(f"k{i}", lambda i=i: work(f"k{i}", i)))
+            for i in range(N) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        assert len(flight) == N
+        return await asyncio.gather(*pending, return_exceptions=True)
+
+    outs = asyncio.run(main())
+
+    assert len(flight) == 0
+    assert not any(flight.in_flight(f"k{i}") for i in range(N))
+    assert all(count == 1 for count in calls.values())
+    for i in range(N):
+        for out in outs[2 * i:2 * i + 2]:
+            if i % 3 == 1:
+                assert isinstance(out, _Boom)
+            else:
+                assert out == f"k{i}"
+
+
+def test_in_flight_map_is_empty_after_cancellation():
+    flight = SingleFlight()
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def work():
+            await gate.wait()
+
+        # 1) 调用方被取消：共享的执行继续，完成后移除
+        callers = [asyncio.create_task(flight.do(f"c{i}", work)) for i in range(N)]
+        await asyncio.sleep(0)
+        assert len(flight) == N
+        for c in callers:
+            c.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        assert all(flight.in_flight(f"c{i}") for i in range(N))
+        gate.set()
+        await asyncio.sleep(0.01)
+        assert len(flight) == 0
+
+        # 2) 执行本身被取消：所有调用方收到 CancelledError，条目同样移除
+        never = asyncio.Event()
+
+        async def stuck():
+            await never.wait()
+
+        tasks = [flight.start(f"s{i}", stuck) for i in range(N)]
+        waiters = [asyncio.create_task(flight.do(f"s{i}", stuck)) for i in range(N)]
+        await asyncio.sleep(0)
+        assert len(flight) == N
+        for t in tasks:
+            t.cancel()
+        outs = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(o, asyncio.CancelledError) for o in outs)
+        await asyncio.sleep(0)
+        assert len(flight) == 0
+
+    asyncio.run(main())
+    assert not any(flight.in_flight(f"s{i}") for i in range(N))
+
+
+def test_failed_key_can_run_again():
+    flight = SingleFlight()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise _Boom()
+        return "ok"
+
+    async def main():
+        with pytest.raises(_Boom):
+            await flight.do("k", flaky)
+        assert len(flight) == 0
+        return await flight.do("k", flaky)
+
+    assert asyncio.run(main()) == "ok"
+    assert len(attempts) == 2
+
+
+def test_memory_stays_bounded_over_a_million_keys():
+    """
+    10^6 个不同 key 分批执行（每 10 个有 1 个失败），每批之后注册表为空。
+    首批与末批分别在 tracemalloc 下执行：批次结束后仍存活的分配（泄漏）有上限，且末批不比首批多。
+    中间的批次不开 tracemalloc，否则整个测试要慢上数倍。
+    """
+    flight = SingleFlight()
+
+    async def ok():
+        return None
+
+    async def boom():
+        raise _Boom()
+
+    async def run_batch(start: int) -> None:
+        outs = await asyncio.gather(
+            *(flight.do(f"key-{i}", boom if i % 10 == 0 else ok) for i in range(start, start + BATCH)),
+            return_exceptions=True,
+        )
+        assert sum(isinstance(o, _Boom) for o in outs) == BATCH // 10
+        del outs
+
+    async def traced_batch(start: int) -> int:
+        """执行一批，返回批次结束后仍未释放的、本批分配的字节数。"""
+        gc.collect()
+        tracemalloc.start()
+        try:
+            await run_batch(start)
+            # 任务完成回调（SingleFlight._done 等）经 call_soon 排队，先让事件循环跑完
+            for _ in range(3):
+                await asyncio.sleep(0)
+            gc.collect()
+            return tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    async def main() -> tuple[int, int]:
+        batches = MILLION // BATCH
+        retained_first = await traced_batch(0)
+        assert len(flight) == 0
+        for b in range(1, batches - 1):
+            await run_batch(b * BATCH)
+            assert len(flight) == 0, b
+        retained_last = await traced_batch((batches - 1) * BATCH)
+        assert len(flight) == 0
+        return retained_first, retained_last
+
+    retained_first, retained_last = asyncio.run(main())
+
+    assert retained_last < MAX_RETAINED_BYTES, retained_last
+    assert retained_last - retained_first < MAX_GROWTH_BYTES, (retained_first, retained_last)
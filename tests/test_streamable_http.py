@@ -0,0 +1,94 @@
+"""
+Streamable HTTP 传输是无状态的：工具调用不依赖会话，可以落在任意副本/worker 上。
+
+这里起两个互相独立的应用实例（各自的上下文、工具缓存、session manager），
+在 A 上 initialize，之后不带 mcp-session-id 的工具调用轮流发往 A/B，两边都应直接应答。
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+from src.app.card_service import CardService
+from src.app.config import Config
+from src.app.context import AppContext
+from src.entrypoints.uvicorn_host import create_app
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+HEADERS = {
+    "Accept": "application/json, text/event-stream",
+    "Content-Type": "application/json",
+}
+
+
+@dataclass
+class _Bundle:
+    version: str
+    tables: dict = field(default_factory=dict)
+
+
+class _Repository:
+    """只提供工具用到的 get_bundle()；每个实例的术语表不同，用来区分应答的实例。"""
+
+    def __init__(self, instance: str):
+        self.bundle = _Bundle(version="v1", tables={"local_glossary": {f"instance-{instance}": instance}})
+
+    def get_bundle(self):
+        return self.bundle
+
+
+def _make_app(tmp_path: Path, instance: str):
+    cfg = Config(ProjectRoot=PROJECT_ROOT, ResourcePath=tmp_path / instance)
+
+    async def context_factory() -> AppContext:
+        return AppContext(cfg=cfg, data_repository=_Repository(instance), card_service=CardService(cfg))
+
+    return create_app(cfg, context_factory=context_factory, periodic_update=False)
+
+
+def _rpc(method: str, params: dict, id: int) -> dict:
+    return {"jsonrpc": "2.0", "id": id, "method": method, "params": params}
+
+
+async def _post(client: httpx.AsyncClient, body: dict) -> httpx.Response:
+    return await client.post("/mcp/http", json=body, headers=HEADERS)
+
+
+def test_stateless_tool_calls_are_answered_by_any_instance(tmp_path):
+    apps = {name: _make_app(tmp_path, name) for name in ("a", "b")}
+
+    async def main() -> list[str]:
+        clients = {
+            name: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+            for name, app in apps.items()
+        }
+        async with apps["a"].router.lifespan_context(apps["a"]), apps["b"].router.lifespan_context(apps["b"]):
+            init = await _post(clients["a"], _rpc("initialize", {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "test", "version": "0"},
+            }, 0))
+            assert init.status_code == 200, init.text
+            # 无状态模式不分配会话
+            assert "mcp-session-id" not in init.headers
+
+            answered = []
+            for i, target in enumerate(["b", "a", "b", "a"], start=1):
+                resp = await _post(clients[target], _rpc("tools/call", {
+                    "name": "get_glossary",
+                    "arguments": {"glossary_name": "instance"},
+                }, i))
+                assert resp.status_code == 200, resp.text
+                result = resp.json()["result"]
+                assert not result.get("isError"), result
+                answered.extend(json.loads(result["content"][0]["text"]).values())
+
+            for client in clients.values():
+                await client.aclose()
+            return answered
+
+    answered = asyncio.run(main())
+    assert answered == ["b", "a", "b", "a"]